@@ -1,12 +1,11 @@
+import argparse
 import logging
 from pathlib import Path
-import json
 
-from src.graph import KnowledgeGraph
-from src.pipeline import DocumentPipeline
-from src.reader import Reader
-from src.storage import LlamaStorage, add_file, enrich_document_chunks, add_communities_from_graph
-from src.summarize import OllamaClient, Summarizer
+from src.corpus import AsyncCorpusRunner, CorpusRunner
+from src.estimate import CostEstimator, format_report
+from src.graph import WDS_PARAMS, WDS_URL, KnowledgeGraph
+from src.harvest import MetadataHarvester
 
 LOG_DIR = Path("./logs")
 LOG_DIR.mkdir(exist_ok=True)
@@ -25,75 +24,194 @@ logger = logging.getLogger(__name__)
 logging.getLogger("__main__").setLevel(logging.DEBUG)  # for main.py
 logging.getLogger("src").setLevel(logging.DEBUG)
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run the World Bank KG pipeline over a corpus of documents."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=2,
+        help="Number of parse (MinerU) worker processes"
+    )
+    parser.add_argument(
+        "--nlp-workers",
+        type=int,
+        default=None,
+        help="Number of NLP worker processes (defaults to --workers)"
+    )
+    parser.add_argument(
+        "--docs",
+        nargs="+",
+        default=None,
+        help="Document IDs to process (defaults to all documents in the KG)"
+    )
+    parser.add_argument(
+        "--since",
+        type=str,
+        default=None,
+        help="Only process documents modified on or after this date (YYYY-MM-DD)"
+    )
+    parser.add_argument(
+        "--parse-batch-size",
+        type=int,
+        default=1,
+        help="Documents parsed per MinerU call (batches similar-sized PDFs)"
+    )
+    parser.add_argument(
+        "--shard-pages",
+        type=int,
+        default=None,
+        help="Parse PDFs longer than this many pages as parallel page-range shards"
+    )
+    parser.add_argument(
+        "--shard-workers",
+        type=int,
+        default=2,
+        help="Processes per document for sharded parsing"
+    )
+    parser.add_argument(
+        "--text-layer",
+        action="store_true",
+        help="Extract born-digital PDFs from their text layer; only scanned PDFs go to MinerU"
+    )
+    parser.add_argument(
+        "--debug-artifacts",
+        action="store_true",
+        help="Keep MinerU's bbox, origin PDF and model output files"
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Run NER chunk by chunk (bounded memory) instead of on the whole markdown"
+    )
+    parser.add_argument(
+        "--async",
+        dest="async_mode",
+        action="store_true",
+        help="Overlap downloads and Wikidata linking with parsing and NLP"
+    )
+    parser.add_argument(
+        "--pdf-concurrency",
+        type=int,
+        default=None,
+        help="Concurrent PDF downloads in --async mode"
+    )
+    parser.add_argument(
+        "--wikidata-concurrency",
+        type=int,
+        default=None,
+        help="Concurrent Wikidata requests in --async mode"
+    )
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=0,
+        help="Download PDFs this many parse jobs ahead of the parse workers (0 disables prefetching)"
+    )
+    parser.add_argument(
+        "--prefetch-concurrency",
+        type=int,
+        default=4,
+        help="Concurrent prefetch downloads"
+    )
+    parser.add_argument(
+        "--prefetch-mbps",
+        type=float,
+        default=None,
+        help="Bandwidth cap for prefetch downloads, in MB/s"
+    )
+    parser.add_argument(
+        "--cores",
+        type=int,
+        default=None,
+        help="Core budget split into intra-op threads per parse/NLP worker (defaults to all available cores)"
+    )
+    parser.add_argument(
+        "--harvest",
+        action="store_true",
+        help="Harvest all search results (only those modified since the last harvest) into output/metadata"
+    )
+    parser.add_argument(
+        "--harvest-concurrency",
+        type=int,
+        default=4,
+        help="Concurrent search page requests with --harvest"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Estimate pages, chunks, Wikidata and LLM calls and run time without running the pipeline"
+    )
+    args = parser.parse_args(argv)
+    if args.async_mode and (args.parse_batch_size > 1 or args.prefetch):
+        parser.error("--parse-batch-size and --prefetch are not supported with --async")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
     # Load or build the KG
     logger.info("Building Knowledge Graph...")
 
-    kg = KnowledgeGraph.load_or_build('world-bank-kg.ttl', rebuild=False)
+    harvester = None
+    if args.harvest:
+        harvester = MetadataHarvester(WDS_URL, WDS_PARAMS, max_concurrency=args.harvest_concurrency)
+
+    kg = KnowledgeGraph.load_or_build('world-bank-kg.ttl', rebuild=False, harvester=harvester)
 
     # Get list of docs to process
-    doc_ids = kg.get_document_ids()
-
-    logger.debug(f"Documents in KG: {doc_ids}")
-    
-    reader = Reader(
-        output_dir="output", 
-        f_dump_middle_json=False,
-        f_dump_model_output=False
-    )
-    
-    for doc_id in doc_ids:
-        doc_id = '10170637'  # TODO
-        url = kg.get_url_by_id(doc_id)
-
-        if not url:
-            logger.warning(f"No URL for doc {doc_id}")
-            continue 
-        
-        # Convert PDF to structured output
-        logger.info(f'Fetching doc {doc_id} at {url}')
-        # reader.process_doc(url, doc_id, lang="English")
-
-        # Chunk and store file
-        json_file_path = Path(f'output/{doc_id}/auto/{doc_id}_content_list.json')
-        storage = LlamaStorage()
-        add_file(json_file_path, kg_id=doc_id)
-    
-        # Run pipeline
-        pipeline = DocumentPipeline(doc_id)
-        results = pipeline.run()
-
-        # Add entities
-        entities = results['entities']
-        kg.add_entities(doc_id, entities)
-        
-        # Save updated knowledge graph
-        kg.save()
-
-        # Enrich document chunks
-        logger.info("Enriching document chunks...")
-        acronyms = results['acronyms']
-        enrich_document_chunks(doc_id, acronyms=acronyms, entities=entities)
-
-        logger.info(f"Pipeline ran without errors. See logs at {LOG_FILE}")
-
-        # TODO: make dir for each file
-        results_file = LOG_DIR / "pipeline_results.json"
-        results_file.write_text(json.dumps(results, indent=2, ensure_ascii=False))
-        logger.info(f"Saved results to {results_file}")
-
-        kg.add_text_chunks(doc_id=doc_id)
-
-        client = OllamaClient(model="llama3.2:latest")
-        summarizer = Summarizer(kg, client, backend='ollama')
-        chunk_graph = summarizer.build_chunk_graph()
-        chunk_to_comm, hc = summarizer.detect_communities_hierarchical_leiden(chunk_graph)
-        summarizer.add_communities_to_graph(chunk_to_comm)
-        summarizer.summarize_communities(chunk_to_comm)
-
-        add_communities_from_graph(kg)
-
-        break   # TODO
+    doc_ids = kg.get_document_ids(since=args.since)
+    if args.docs:
+        known_ids = set(doc_ids)
+        doc_ids = [doc_id for doc_id in args.docs if doc_id in known_ids]
+
+    logger.debug(f"Documents to process: {doc_ids}")
+
+    if args.dry_run:
+        estimator = CostEstimator(
+            kg,
+            output_dir="output",
+            parse_workers=args.workers,
+            nlp_workers=args.nlp_workers or args.workers)
+        print(format_report(estimator.estimate(doc_ids)))
+        return
+
+    runner_kwargs = dict(
+        parse_workers=args.workers,
+        parse_batch_size=args.parse_batch_size,
+        nlp_workers=args.nlp_workers or args.workers,
+        reader_kwargs={
+            "output_dir": "output",
+            "output_profile": "debug" if args.debug_artifacts else "production",
+            "shard_pages": args.shard_pages,
+            "shard_workers": args.shard_workers,
+            "text_layer": args.text_layer,
+        },
+        streaming=args.streaming,
+        cores=args.cores
+    )
+    if args.prefetch:
+        runner_kwargs.update(
+            prefetch=args.prefetch,
+            prefetch_concurrency=args.prefetch_concurrency,
+            prefetch_bandwidth=args.prefetch_mbps * 1e6 if args.prefetch_mbps else None)
+    if args.async_mode:
+        endpoint_limits = {
+            endpoint: limit for endpoint, limit in (
+                ("pdf", args.pdf_concurrency), ("wikidata", args.wikidata_concurrency))
+            if limit
+        }
+        runner = AsyncCorpusRunner(kg, endpoint_limits=endpoint_limits, **runner_kwargs)
+    else:
+        runner = CorpusRunner(kg, **runner_kwargs)
+    summary = runner.run(doc_ids)
+
+    if summary["failed"]:
+        logger.warning(f"Failed documents: {summary['failed']}")
+
+    logger.info(f"Pipeline finished. See logs at {LOG_FILE}")
 
 
 if __name__ == "__main__":
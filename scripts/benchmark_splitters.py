@@ -0,0 +1,92 @@
+"""
+Compare CustomParser's text splitter backends on MinerU content lists:
+throughput, chunk counts and chunk-boundary agreement with SentenceSplitter.
+
+Run with `python -m scripts.benchmark_splitters content_list.json [...]`,
+e.g. on the `*_content_list.json` files of a parse under output/.
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Set
+
+from src.parser import extract_sections
+from src.splitters import SPLITTERS, make_splitter
+
+BASELINE = "sentence"
+
+
+def load_sections(paths: List[Path]) -> List[str]:
+    sections = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            sections.extend(text for text, _ in extract_sections(json.load(f)))
+    return sections
+
+
+def boundaries(text: str, chunks: List[str]) -> Set[int]:
+    """Start offsets of the chunks in the section text."""
+    starts, pos = set(), 0
+    for chunk in chunks:
+        start = text.find(chunk[:50], pos)
+        if start >= 0:
+            starts.add(start)
+            pos = start + 1
+    return starts
+
+
+def run(name: str, sections: List[str], chunk_size: int, chunk_overlap: int, repeat: int) -> Dict:
+    best = float("inf")
+    for _ in range(repeat):
+        # A fresh splitter per run, so no cache carries over between runs
+        splitter = make_splitter(name, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        start = time.perf_counter()
+        chunks = [splitter.split_text(text) for text in sections]
+        best = min(best, time.perf_counter() - start)
+
+    n_chars = sum(len(text) for text in sections)
+    return {
+        "splitter": name,
+        "seconds": round(best, 4),
+        "sections_per_s": round(len(sections) / best, 1),
+        "mb_per_s": round(n_chars / best / 1e6, 2),
+        "chunks": sum(len(c) for c in chunks),
+        "_chunks": chunks,
+    }
+
+
+def agreement(sections: List[str], chunks: List[List[str]], baseline: List[List[str]]) -> Dict:
+    """Share of sections chunked identically, and Jaccard overlap of chunk starts."""
+    identical, jaccard = 0, 0.0
+    for text, ours, theirs in zip(sections, chunks, baseline):
+        identical += ours == theirs
+        a, b = boundaries(text, ours), boundaries(text, theirs)
+        jaccard += len(a & b) / len(a | b) if a | b else 1.0
+    n = max(len(sections), 1)
+    return {"identical_sections": round(identical / n, 4), "boundary_jaccard": round(jaccard / n, 4)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("paths", nargs="+", type=Path, help="MinerU content list JSON files")
+    parser.add_argument("--chunk-size", type=int, default=1024)
+    parser.add_argument("--chunk-overlap", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sections = load_sections(args.paths)
+    print(f"{len(sections)} sections, {sum(map(len, sections)) / 1e6:.2f} MB from {len(args.paths)} files")
+
+    results = [run(name, sections, args.chunk_size, args.chunk_overlap, args.repeat) for name in SPLITTERS]
+    baseline = next(r for r in results if r["splitter"] == BASELINE)
+    for result in results:
+        result.update(agreement(sections, result["_chunks"], baseline["_chunks"]))
+        result["speedup"] = round(baseline["seconds"] / result["seconds"], 2)
+
+    for result in results:
+        print(json.dumps({k: v for k, v in result.items() if not k.startswith("_")}))
+
+
+if __name__ == "__main__":
+    main()
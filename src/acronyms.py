@@ -8,6 +8,7 @@ import re
 from llama_index.core.vector_stores.types import MetadataFilters, ExactMatchFilter
 
 from src.storage import LlamaStorage
+from src.metrics import count_http, count_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -80,6 +81,9 @@ class AcronymExtractor:
                 messages=messages,
                 temperature=0,
             )
+            count_http()
+            if getattr(response, "usage", None):
+                count_tokens(response.usage.prompt_tokens, response.usage.completion_tokens)
             response_content = response.choices[0].message.content
 
         elif self.backend == "ollama":
@@ -190,12 +194,14 @@ class AcronymExtractor:
         return cleaned
 
     
-    def extract(self, text: str) -> Dict:
-        # extract and merge acronyms
+    def extract_primary(self) -> Dict:
+        """Extract acronyms from the document's acronym section only."""
         acronym_section = self._get_acronym_section()
-        primary_acronyms = self._extract_acronyms_with_llm(acronym_section)
-        secondary_acronyms = self._extract_inline_acronyms(text)
+        return self._extract_acronyms_with_llm(acronym_section)
 
+
+    def merge(self, primary_acronyms: dict, secondary_acronyms: dict) -> Dict:
+        """Merge primary and inline acronyms and store the result."""
         # get and store acronyms
         self.acronyms = self.merge_acronym_dicts(primary_acronyms, secondary_acronyms)
 
@@ -204,3 +210,11 @@ class AcronymExtractor:
         
         return self.acronyms
 
+    
+    def extract(self, text: str) -> Dict:
+        # extract and merge acronyms
+        primary_acronyms = self.extract_primary()
+        secondary_acronyms = self._extract_inline_acronyms(text)
+
+        return self.merge(primary_acronyms, secondary_acronyms)
+
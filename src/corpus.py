@@ -0,0 +1,593 @@
+import asyncio
+import logging
+from collections import deque
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+
+from rdflib import URIRef
+
+from src import models, threads
+from src.graph import KnowledgeGraph
+from src.manifest import StageManifest, hash_bytes, hash_file, hash_obj, parse_input
+from src.metrics import StageRecorder
+from src.ner import EntityExtractor
+from src.linker import Wikifier
+from src.pdf_cache import PDF_CACHE_DIR, PdfCache
+from src.pipeline import DocumentPipeline
+from src.prefetch import Prefetcher
+from src.reader import Reader
+from src.results import ResultsStore
+from src.storage import (
+    add_file, document_exists, enrich_document_chunks, add_communities_from_graph
+)
+from src.summarize import OllamaClient, Summarizer
+from src.threads import ThreadBudget
+
+logger = logging.getLogger(__name__)
+
+CORPUS_MANIFEST_ID = "_corpus"
+
+# Default concurrent requests per network endpoint in async mode
+ENDPOINT_LIMITS = {
+    "pdf": 4,       # World Bank document downloads
+    "wikidata": 2,  # Wikidata SPARQL / search API
+}
+
+
+def parse_document(doc_id: str, url: str, reader_kwargs: Dict, pdf_bytes: Optional[bytes] = None) -> str:
+    """
+    Worker: download and parse one PDF with MinerU. Returns the content list path.
+    If `pdf_bytes` is given the download is skipped.
+    """
+    manifest = StageManifest(doc_id, root=reader_kwargs.get("output_dir", "output"))
+    reader = Reader(**reader_kwargs)
+    if pdf_bytes is None:
+        pdf_bytes = reader.download(url).read_bytes()
+    pdf_input = parse_input(hash_bytes(pdf_bytes))
+
+    if manifest.is_current("parse", pdf_input):
+        logger.info(f"Skipping parse for doc {doc_id}; already parsed.")
+        return manifest.get("parse")["output"]
+
+    with StageRecorder(doc_id).stage("parse", items_in=1) as rec:
+        json_file_path = reader.parse_bytes(pdf_bytes, doc_id, lang="English")
+        rec["items_out"] = 1
+
+    manifest.record(
+        "parse", pdf_input,
+        output=str(json_file_path),
+        output_hash=hash_file(json_file_path))
+    return str(json_file_path)
+
+
+def parse_documents(docs: List[Tuple[str, str]], reader_kwargs: Dict) -> Dict[str, str]:
+    """
+    Worker: download and parse a batch of PDFs with one MinerU call per size
+    group. Returns content list paths by doc ID; failed documents are missing.
+    """
+    root = reader_kwargs.get("output_dir", "output")
+    paths: Dict[str, str] = {}
+    todo = []
+    inputs: Dict[str, str] = {}
+
+    reader = Reader(**reader_kwargs)
+    for doc_id, url in docs:
+        try:
+            inputs[doc_id] = parse_input(reader.download(url).stem)
+        except Exception as e:
+            logger.error(f"Failed to download doc {doc_id} from {url}: {e}")
+            continue
+
+        manifest = StageManifest(doc_id, root=root)
+        if manifest.is_current("parse", inputs[doc_id]):
+            logger.info(f"Skipping parse for doc {doc_id}; already parsed.")
+            paths[doc_id] = manifest.get("parse")["output"]
+        else:
+            todo.append((doc_id, url))
+
+    if not todo:
+        return paths
+
+    with StageRecorder(CORPUS_MANIFEST_ID).stage("parse_batch", items_in=len(todo)) as rec:
+        # The PDFs were just downloaded (or revalidated) above
+        reader = Reader(**{**reader_kwargs, "revalidate": False})
+        parsed = reader.process_docs([(url, doc_id) for doc_id, url in todo], lang="English")
+        rec["items_out"] = len(parsed)
+
+    for doc_id, url in todo:
+        if doc_id not in parsed:
+            continue
+        StageManifest(doc_id, root=root).record(
+            "parse", inputs[doc_id],
+            output=str(parsed[doc_id]),
+            output_hash=hash_file(parsed[doc_id]))
+        paths[doc_id] = str(parsed[doc_id])
+
+    return paths
+
+
+def annotate_document(doc_id: str, output_dir: str = "output", streaming: bool = False, link: bool = True) -> Dict:
+    """Worker: run acronym extraction, NER and linking for one stored document."""
+    pipeline = DocumentPipeline(doc_id)
+    return pipeline.run(
+        manifest=StageManifest(doc_id, root=output_dir), streaming=streaming, link=link)
+
+
+def link_document(doc_id: str, entities: List[Dict], output_dir: str = "output") -> List[Dict]:
+    """Link one document's entities to Wikidata, skipping if the manifest is current."""
+    manifest = StageManifest(doc_id, root=output_dir)
+    linking_input = hash_obj(entities)
+
+    cleaned_entities = manifest.load_output("linking", linking_input)
+    if cleaned_entities is not None:
+        return cleaned_entities
+
+    with StageRecorder(doc_id).stage("wikifier", items_in=len(entities)) as rec:
+        linked_entities = Wikifier().wikify(entities)
+        cleaned_entities = EntityExtractor()._normalize_entities(linked_entities)
+        rec["items_out"] = len(cleaned_entities)
+
+    manifest.save_output("linking", linking_input, cleaned_entities)
+    return cleaned_entities
+
+
+class CorpusRunner:
+    """
+    Runs the document pipeline over many documents.
+
+    CPU-heavy stages run on process pools with a bounded number of workers
+    per stage:
+        parse    Reader.process_doc (download + MinerU)
+        nlp      DocumentPipeline.run (acronyms, NER, linking)
+
+    Stages that write shared state (the docstore and the knowledge graph)
+    run in the main process as soon as each document's worker result arrives:
+        add_file, enrich_document_chunks, kg.add_entities, kg.add_text_chunks
+
+    KG changes are committed to the delta journal after each document and
+    checkpointed to Turtle periodically and at the end of the run.
+
+    Community detection and summarization run once after all documents.
+
+    Every stage is recorded in a per-document StageManifest, so a rerun
+    skips stages whose inputs have not changed.
+
+    Args:
+        kg (KnowledgeGraph): loaded knowledge graph
+        parse_workers (int): number of MinerU worker processes
+        nlp_workers (int): number of NLP worker processes
+        reader_kwargs (dict): keyword arguments passed to Reader in each worker
+        nlp_models (tuple): spaCy models preloaded once in each NLP worker
+        streaming (bool): run NER chunk by chunk instead of on the whole markdown
+        parse_batch_size (int): documents per MinerU call; above 1, documents
+            are sorted by PDF size and parsed in batches with Reader.process_docs
+        cores (int): core budget shared by the worker pools (see ThreadBudget);
+            defaults to the cores available to this process
+        prefetch (int): if set, PDFs are downloaded on a thread pool this many
+            parse jobs ahead of the busy parse workers, and parse workers read
+            them from the cache without any network request
+        prefetch_concurrency (int): concurrent prefetch downloads
+        prefetch_bandwidth (float): bandwidth cap for prefetching, in bytes/s
+    """
+    def __init__(
+            self,
+            kg: KnowledgeGraph,
+            parse_workers: int = 2,
+            nlp_workers: int = 2,
+            reader_kwargs: Optional[Dict] = None,
+            nlp_models: tuple = ("en_core_web_sm",),
+            streaming: bool = False,
+            parse_batch_size: int = 1,
+            cores: Optional[int] = None,
+            prefetch: int = 0,
+            prefetch_concurrency: int = 4,
+            prefetch_bandwidth: Optional[float] = None
+        ):
+        self.kg = kg
+        self.parse_workers = parse_workers
+        self.nlp_workers = nlp_workers
+        self.reader_kwargs = reader_kwargs or {
+            "output_dir": "output",
+            "output_profile": "production",
+        }
+        self.output_dir = self.reader_kwargs.get("output_dir", "output")
+        self.pdf_cache = PdfCache(root=self.reader_kwargs.get("cache_dir", PDF_CACHE_DIR))
+        self.results = ResultsStore(root=str(Path(self.output_dir) / "results"))
+        self.nlp_models = nlp_models
+        self.streaming = streaming
+        self.parse_batch_size = parse_batch_size
+        self.thread_budget = ThreadBudget({"parse": parse_workers, "nlp": nlp_workers}, cores=cores)
+        logger.info(f"Intra-op threads per worker: {self.thread_budget.threads}")
+        self.prefetch = prefetch
+        self.prefetch_concurrency = prefetch_concurrency
+        self.prefetch_bandwidth = prefetch_bandwidth
+        self._units_ahead = 0
+        self.failed: Dict[str, str] = {}
+        self.completed: List[str] = []
+
+
+    def _manifest(self, doc_id: str) -> StageManifest:
+        return StageManifest(doc_id, root=self.output_dir)
+
+
+    def _parse_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.parse_workers,
+            initializer=threads.init_worker,
+            initargs=(self.thread_budget.threads["parse"], "parse"))
+
+
+    def _nlp_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.nlp_workers,
+            initializer=threads.init_worker,
+            initargs=(self.thread_budget.threads["nlp"], "nlp", models.preload, (self.nlp_models,)))
+
+
+    def _prefetcher(self):
+        if not self.prefetch:
+            return nullcontext()
+        return Prefetcher(
+            cache_dir=str(self.pdf_cache.root),
+            max_concurrency=self.prefetch_concurrency,
+            max_bytes_per_s=self.prefetch_bandwidth)
+
+
+    def _submit_parse(self, unit: List[Tuple[str, str]], parse_pool, pending: Dict, reader_kwargs: Dict):
+        if self.parse_batch_size > 1:
+            future = parse_pool.submit(parse_documents, unit, reader_kwargs)
+            pending[future] = ("parse_batch", [doc_id for doc_id, _ in unit])
+        else:
+            doc_id, url = unit[0]
+            future = parse_pool.submit(parse_document, doc_id, url, reader_kwargs)
+            pending[future] = ("parse", doc_id)
+
+
+    def _queue_units(self, units: deque, parse_pool, prefetcher, pending: Dict):
+        """
+        Submit queued parse jobs. With a prefetcher, their PDFs are downloaded
+        first, keeping at most `parse_workers + prefetch` jobs between the
+        start of their download and the end of their parse.
+        """
+        while units and (prefetcher is None or self._units_ahead < self.parse_workers + self.prefetch):
+            unit = units.popleft()
+            if prefetcher is None:
+                self._submit_parse(unit, parse_pool, pending, self.reader_kwargs)
+                continue
+
+            self._units_ahead += 1
+            to_fetch = [(doc_id, url) for doc_id, url in unit if not self._is_parsed(doc_id, url)]
+            state = {"unit": list(unit), "remaining": len(to_fetch)}
+            if not to_fetch:
+                self._submit_parse(unit, parse_pool, pending, self._prefetched_kwargs())
+            for doc_id, url in to_fetch:
+                pending[prefetcher.submit(url, doc_id)] = ("download", (doc_id, state))
+
+
+    def _by_size(self, docs: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """
+        Documents ordered by PDF size (from the cache, else a HEAD request;
+        unknown sizes last), so each parse batch holds PDFs of similar size.
+        """
+        with ThreadPoolExecutor(max_workers=self.prefetch_concurrency) as pool:
+            sizes = list(pool.map(self.pdf_cache.content_length, [url for _, url in docs]))
+        order = sorted(range(len(docs)), key=lambda i: (sizes[i] is None, sizes[i] or 0))
+        return [docs[i] for i in order]
+
+
+    def _is_parsed(self, doc_id: str, url: str) -> bool:
+        """Whether the cached PDF for `url` was parsed already (no network request)."""
+        sha256 = self.pdf_cache.content_hash(url)
+        return sha256 is not None and self._manifest(doc_id).is_current("parse", parse_input(sha256))
+
+
+    def _prefetched_kwargs(self) -> Dict:
+        return {**self.reader_kwargs, "revalidate": False}
+
+
+    def _after_download(self, future: Future, doc_id: str, state: Dict, parse_pool, pending: Dict):
+        """Submit a parse job once every PDF it needs is in the cache."""
+        try:
+            future.result()
+        except Exception as e:
+            self.failed[doc_id] = f"download: {e}"
+            state["unit"] = [(d, url) for d, url in state["unit"] if d != doc_id]
+
+        state["remaining"] -= 1
+        if state["remaining"] == 0:
+            if state["unit"]:
+                self._submit_parse(state["unit"], parse_pool, pending, self._prefetched_kwargs())
+            else:
+                self._units_ahead -= 1
+
+
+    def run(self, doc_ids: List[str], summarize: bool = True) -> Dict:
+        """Process all documents and return a summary of completed and failed IDs."""
+        pending: Dict[Future, tuple] = {}
+
+        with self._parse_pool() as parse_pool, self._nlp_pool() as nlp_pool, \
+             self._prefetcher() as prefetcher:
+
+            docs = []
+            for doc_id in doc_ids:
+                url = self.kg.get_url_by_id(doc_id)
+                if not url:
+                    logger.warning(f"No URL for doc {doc_id}")
+                    continue
+
+                logger.info(f'Queued doc {doc_id} at {url}')
+                docs.append((doc_id, url))
+
+            size = max(self.parse_batch_size, 1)
+            if size > 1:
+                docs = self._by_size(docs)
+            units = deque(docs[i:i + size] for i in range(0, len(docs), size))
+            self._units_ahead = 0
+            self._queue_units(units, parse_pool, prefetcher, pending)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, key = pending.pop(future)
+                    if stage == "download":
+                        self._after_download(future, *key, parse_pool, pending)
+                        self._queue_units(units, parse_pool, prefetcher, pending)
+                        continue
+                    if stage in ("parse", "parse_batch") and prefetcher is not None:
+                        self._units_ahead -= 1
+                        self._queue_units(units, parse_pool, prefetcher, pending)
+
+                    batch_ids = key if stage == "parse_batch" else [key]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        for doc_id in batch_ids:
+                            logger.exception(f"Stage '{stage}' failed for doc {doc_id}: {e}")
+                            self.failed[doc_id] = f"{stage}: {e}"
+                        continue
+
+                    if stage == "parse_batch":
+                        for doc_id in batch_ids:
+                            if doc_id in result:
+                                self._after_parse(doc_id, result[doc_id], nlp_pool, pending)
+                            else:
+                                self.failed[doc_id] = "parse: MinerU produced no output"
+                    elif stage == "parse":
+                        self._after_parse(key, result, nlp_pool, pending)
+                    elif stage == "nlp":
+                        try:
+                            self._add_results(key, result)
+                            self.completed.append(key)
+                        except Exception as e:
+                            logger.exception(f"Post-processing of '{stage}' failed for doc {key}: {e}")
+                            self.failed[key] = f"{stage}: {e}"
+
+        if summarize and self.completed:
+            self._summarize()
+
+        # Final checkpoint so the Turtle file reflects the whole run
+        self.kg.commit(force=True)
+
+        logger.info(
+            f"Processed {len(self.completed)} documents; {len(self.failed)} failed.")
+
+        return {"completed": self.completed, "failed": self.failed}
+
+
+    def _after_parse(self, doc_id: str, json_file_path: str, nlp_pool, pending: Dict):
+        """Store a parsed document and queue it for NLP."""
+        try:
+            self._store_document(doc_id, json_file_path)
+        except Exception as e:
+            logger.exception(f"Post-processing of 'parse' failed for doc {doc_id}: {e}")
+            self.failed[doc_id] = f"parse: {e}"
+            return
+
+        future = nlp_pool.submit(annotate_document, doc_id, self.output_dir, self.streaming)
+        pending[future] = ("nlp", doc_id)
+
+
+    def _store_document(self, doc_id: str, json_file_path: str):
+        """Chunk and store the parsed file."""
+        manifest = self._manifest(doc_id)
+        chunk_input = manifest.output_hash("parse") or hash_file(json_file_path)
+
+        if manifest.is_current("chunk_embed", chunk_input) and document_exists(doc_id):
+            logger.info(f"Skipping chunk/embed for doc {doc_id}; content unchanged.")
+            return
+
+        # Updates a stored document in place: only changed chunks are re-embedded
+        with StageRecorder(doc_id).stage("add_file", items_in=1):
+            add_file(json_file_path, kg_id=doc_id)
+        manifest.record(
+            "chunk_embed", chunk_input,
+            output=f"docstore:{doc_id}",
+            output_hash=chunk_input)
+
+
+    def _add_results(self, doc_id: str, results: Dict):
+        """Write a document's NLP results to the docstore and KG."""
+        manifest = self._manifest(doc_id)
+        recorder = StageRecorder(doc_id)
+        entities = results['entities']
+        acronyms = results['acronyms']
+
+        results_input = hash_obj([manifest.output_hash("chunk_embed"), acronyms, entities])
+
+        if manifest.is_current("chunk_enrichment", results_input):
+            logger.info(f"Skipping chunk enrichment for doc {doc_id}; results unchanged.")
+        else:
+            logger.info(f"Enriching document chunks for doc {doc_id}...")
+            with recorder.stage("annotate", items_in=len(entities)):
+                enrich_document_chunks(doc_id, acronyms=acronyms, entities=entities)
+            manifest.record("chunk_enrichment", results_input, output=f"docstore:{doc_id}")
+
+        self.results.write(doc_id, results)
+
+        if manifest.is_current("chunk_kg", results_input):
+            logger.info(f"Skipping KG update for doc {doc_id}; results unchanged.")
+            return
+
+        with recorder.stage("add_entities", items_in=len(entities)):
+            self.kg.add_entities(doc_id, entities)
+        with recorder.stage("add_text_chunks"):
+            self.kg.add_text_chunks(doc_id=doc_id)
+        with recorder.stage("kg_commit"):
+            self.kg.commit()
+        manifest.record("chunk_kg", results_input, output=f"kg:{self.kg.ttl_path}")
+
+
+    def _summarize(self):
+        """Detect communities over the chunk graph and summarize them."""
+        manifest = self._manifest(CORPUS_MANIFEST_ID)
+        recorder = StageRecorder(CORPUS_MANIFEST_ID)
+
+        # The worker pools are shut down by now, so NumPy/BLAS may use every core
+        threads.limit_threads(self.thread_budget.threads["summarize"], "summarize")
+
+        client = OllamaClient(model="llama3.2:latest")
+        summarizer = Summarizer(self.kg, client, backend='ollama')
+        chunk_graph = summarizer.build_chunk_graph()
+
+        communities_input = hash_obj(sorted(
+            (str(u), str(v), d.get("weight")) for u, v, d in chunk_graph.edges(data=True)))
+        communities = manifest.load_output("communities", communities_input)
+
+        if communities is None:
+            with recorder.stage("leiden", items_in=chunk_graph.number_of_nodes()) as rec:
+                chunk_to_comm, hc = summarizer.detect_communities_hierarchical_leiden(chunk_graph)
+                rec["items_out"] = len(set(chunk_to_comm.values()))
+            summarizer.add_communities_to_graph(chunk_to_comm)
+            communities = {str(uri): comm_id for uri, comm_id in chunk_to_comm.items()}
+            manifest.save_output("communities", communities_input, communities)
+
+        summaries_input = manifest.output_hash("communities")
+        if manifest.is_current("summaries", summaries_input):
+            logger.info("Skipping community summaries; communities unchanged.")
+            return
+
+        chunk_to_comm = {URIRef(uri): comm_id for uri, comm_id in communities.items()}
+        with recorder.stage("summarization", items_in=len(set(chunk_to_comm.values()))):
+            summarizer.summarize_communities(chunk_to_comm)
+
+        with recorder.stage("add_communities"):
+            add_communities_from_graph(self.kg)
+        manifest.record("summaries", summaries_input, output=f"kg:{self.kg.ttl_path}")
+
+
+class AsyncCorpusRunner(CorpusRunner):
+    """
+    Variant of CorpusRunner that overlaps network-bound and CPU-bound stages.
+
+    Each document runs as an asyncio task:
+        download   Reader.read_fn in a thread         (limit: endpoint "pdf")
+        parse      MinerU on the parse process pool
+        store      add_file in a thread               (serialized)
+        nlp        acronyms + NER on the NLP process pool
+        linking    Wikifier in a thread               (limit: endpoint "wikidata")
+        results    enrichment + KG commit in a thread (serialized)
+
+    So while document N is parsed or annotated, document N+1 is downloading
+    or being linked. Writes to the docstore and KG are serialized by a lock.
+
+    Args:
+        endpoint_limits (dict): concurrent requests per endpoint; merged over ENDPOINT_LIMITS
+        max_in_flight (int): documents in progress at once, bounding the PDF
+            bytes held in memory; defaults to twice the parse workers
+        **kwargs: passed to CorpusRunner, except `parse_batch_size` and
+            `prefetch`: documents are parsed one task at a time, and their
+            downloads already overlap parsing (up to `max_in_flight`)
+    """
+    def __init__(
+            self,
+            kg: KnowledgeGraph,
+            endpoint_limits: Optional[Dict[str, int]] = None,
+            max_in_flight: Optional[int] = None,
+            **kwargs
+        ):
+        super().__init__(kg, **kwargs)
+        if self.parse_batch_size > 1 or self.prefetch:
+            raise ValueError("AsyncCorpusRunner does not support parse_batch_size > 1 or prefetch")
+        self.endpoint_limits = {**ENDPOINT_LIMITS, **(endpoint_limits or {})}
+        self.max_in_flight = max_in_flight or 2 * self.parse_workers
+
+
+    def run(self, doc_ids: List[str], summarize: bool = True) -> Dict:
+        """Process all documents and return a summary of completed and failed IDs."""
+        asyncio.run(self._run_all(doc_ids))
+
+        if summarize and self.completed:
+            self._summarize()
+
+        self.kg.commit(force=True)
+
+        logger.info(
+            f"Processed {len(self.completed)} documents; {len(self.failed)} failed.")
+
+        return {"completed": self.completed, "failed": self.failed}
+
+
+    async def _run_all(self, doc_ids: List[str]):
+        self._limits = {
+            endpoint: asyncio.Semaphore(limit) for endpoint, limit in self.endpoint_limits.items()}
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        self._store_lock = asyncio.Lock()
+
+        with self._parse_pool() as parse_pool, self._nlp_pool() as nlp_pool:
+
+            tasks = []
+            for doc_id in doc_ids:
+                url = self.kg.get_url_by_id(doc_id)
+                if not url:
+                    logger.warning(f"No URL for doc {doc_id}")
+                    continue
+
+                logger.info(f'Queued doc {doc_id} at {url}')
+                tasks.append(self._process_document(doc_id, url, parse_pool, nlp_pool))
+
+            await asyncio.gather(*tasks)
+
+
+    async def _process_document(self, doc_id: str, url: str, parse_pool, nlp_pool):
+        loop = asyncio.get_running_loop()
+        stage = "download"
+
+        async with self._in_flight:
+            try:
+                pdf_bytes = None
+                # Already parsed PDFs are read back from the cache, outside the pdf limit
+                parse_kwargs = self._prefetched_kwargs()
+                if not self._is_parsed(doc_id, url):
+                    async with self._limits["pdf"]:
+                        reader = Reader(**self.reader_kwargs)
+                        pdf_bytes = await asyncio.to_thread(reader.read_fn, url)
+
+                stage = "parse"
+                json_file_path = await loop.run_in_executor(
+                    parse_pool, parse_document, doc_id, url, parse_kwargs, pdf_bytes)
+                del pdf_bytes
+
+                stage = "store"
+                async with self._store_lock:
+                    await asyncio.to_thread(self._store_document, doc_id, json_file_path)
+
+                stage = "nlp"
+                results = await loop.run_in_executor(
+                    nlp_pool, annotate_document, doc_id, self.output_dir, self.streaming, False)
+
+                stage = "linking"
+                async with self._limits["wikidata"]:
+                    results["entities"] = await asyncio.to_thread(
+                        link_document, doc_id, results["entities"], self.output_dir)
+
+                stage = "results"
+                async with self._store_lock:
+                    await asyncio.to_thread(self._add_results, doc_id, results)
+
+                self.completed.append(doc_id)
+
+            except Exception as e:
+                logger.exception(f"Stage '{stage}' failed for doc {doc_id}: {e}")
+                self.failed[doc_id] = f"{stage}: {e}"
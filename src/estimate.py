@@ -0,0 +1,192 @@
+import json
+import logging
+import math
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.linker import CACHE_FILE as WIKIDATA_CACHE_FILE, ONE_SECOND
+from src.manifest import StageManifest, parse_input
+from src.pdf_cache import PdfCache
+from src.results import ResultsStore
+from src.storage import document_exists
+
+logger = logging.getLogger(__name__)
+
+# Heuristics used where a document has not been processed yet. Override any
+# of them with the `rates` argument, e.g. from timings in logs/stage_metrics.jsonl.
+DEFAULT_RATES = {
+    "bytes_per_page": 60_000,         # World Bank PDFs average roughly 40-80 KB per page
+    "default_pages": 80,              # when the PDF size is unknown
+    "chars_per_page": 3_000,
+    "chars_per_token": 4,
+    "chunk_tokens": 1_024,            # CustomParser chunk_size
+    "entities_per_page": 6,           # unique entities per page after NER
+    "new_entity_ratio": 0.5,          # share of those not yet in the Wikidata cache
+    "sparql_calls_per_entity": 2,     # exact match, then fuzzy search/type check
+    "wikidata_calls_per_second": 1 / ONE_SECOND,  # Wikifier.get_qid rate limit
+    "acronym_prompt_tokens": 2_600,   # acronym section is truncated to 10k chars
+    "acronym_completion_tokens": 400,
+    "chunks_per_community": 20,
+    "summary_prompt_tokens": 6_000,   # Summarizer max_tokens_per_summary
+    "summary_completion_tokens": 300,
+    "parse_s_per_page": 1.5,          # MinerU pipeline backend on CPU
+    "embed_s_per_chunk": 0.15,
+    "llm_tokens_per_s": 400,          # local Ollama prompt + generation throughput
+}
+
+
+class CostEstimator:
+    """
+    Dry run that estimates the work and wall-clock time of a corpus run
+    without downloading or parsing anything.
+
+    Page counts come from existing MinerU output when a document was already
+    parsed, otherwise from the size of the cached PDF or the size reported by
+    a HEAD request. Stages that are current in a document's manifest, chunks
+    already in the docstore, and entities already in the Wikidata cache are
+    not counted.
+
+    Args:
+        kg (KnowledgeGraph): loaded knowledge graph (for PDF URLs)
+        output_dir (str): MinerU output and manifest root
+        parse_workers (int): MinerU worker processes of the planned run
+        nlp_workers (int): NLP worker processes of the planned run
+        rates (dict): overrides for DEFAULT_RATES
+    """
+    def __init__(
+            self,
+            kg,
+            output_dir: str = "output",
+            parse_workers: int = 2,
+            nlp_workers: int = 2,
+            rates: Optional[Dict] = None
+        ):
+        self.kg = kg
+        self.output_dir = output_dir
+        self.parse_workers = parse_workers
+        self.nlp_workers = nlp_workers
+        self.rates = {**DEFAULT_RATES, **(rates or {})}
+        self.results = ResultsStore(root=str(Path(output_dir) / "results"))
+        self.wikidata_cache = self._load_wikidata_cache()
+        self.pdf_cache = PdfCache()
+
+
+    def _load_wikidata_cache(self) -> set:
+        path = Path(WIKIDATA_CACHE_FILE)
+        if not path.exists():
+            return set()
+        with open(path, "r") as f:
+            return set(json.load(f).get("entities", {}))
+
+
+    def _content_list_path(self, doc_id: str) -> Path:
+        return Path(self.output_dir) / doc_id / "auto" / f"{doc_id}_content_list.json"
+
+
+    def estimate_document(self, doc_id: str, url: str) -> Dict:
+        """Expected work for a single document."""
+        r = self.rates
+        manifest = StageManifest(doc_id, root=self.output_dir)
+        pdf_sha256 = self.pdf_cache.content_hash(url)
+        parsed = pdf_sha256 is not None and manifest.is_current("parse", parse_input(pdf_sha256))
+
+        content_list = self._content_list_path(doc_id)
+        if content_list.exists():
+            with open(content_list, "r", encoding="utf-8") as f:
+                blocks = json.load(f)
+            pages = max((b.get("page_idx", 0) for b in blocks), default=0) + 1
+            chars = sum(len(b.get("text", "")) for b in blocks)
+        else:
+            size = self.pdf_cache.content_length(url)
+            pages = math.ceil(size / r["bytes_per_page"]) if size else r["default_pages"]
+            chars = pages * r["chars_per_page"]
+
+        chunks = math.ceil(chars / r["chars_per_token"] / r["chunk_tokens"])
+        embedded = manifest.get("chunk_embed") is not None and document_exists(doc_id)
+
+        stored = self.results.read(doc_id)
+        if stored is not None:
+            keys = {
+                f"{e['surface'].lower()}|{e['label'].lower()}"
+                for e in stored["entities"] if e.get("surface") and e.get("label")}
+            new_entities = len(keys - self.wikidata_cache)
+            annotated = True
+        else:
+            new_entities = round(pages * r["entities_per_page"] * r["new_entity_ratio"])
+            annotated = False
+
+        return {
+            "doc_id": doc_id,
+            "pages": pages,
+            "pages_to_parse": 0 if parsed else pages,
+            "chunks": chunks,
+            "chunks_to_embed": 0 if embedded else chunks,
+            "new_entities": new_entities,
+            "acronym_calls": 0 if annotated else 1,
+        }
+
+
+    def estimate(self, doc_ids: List[str]) -> Dict:
+        """Expected work and wall-clock time for running the pipeline over `doc_ids`."""
+        r = self.rates
+        documents = []
+        for doc_id in doc_ids:
+            url = self.kg.get_url_by_id(doc_id)
+            if not url:
+                logger.warning(f"No URL for doc {doc_id}")
+                continue
+            documents.append(self.estimate_document(str(doc_id), url))
+
+        totals = {
+            key: sum(d[key] for d in documents)
+            for key in ("pages", "pages_to_parse", "chunks", "chunks_to_embed",
+                        "new_entities", "acronym_calls")
+        }
+        sparql_calls = totals["new_entities"] * r["sparql_calls_per_entity"]
+        summary_calls = math.ceil(totals["chunks"] / r["chunks_per_community"])
+
+        llm = {
+            "acronym_calls": totals["acronym_calls"],
+            "acronym_tokens": totals["acronym_calls"] * (
+                r["acronym_prompt_tokens"] + r["acronym_completion_tokens"]),
+            "summary_calls": summary_calls,
+            "summary_tokens": summary_calls * (
+                r["summary_prompt_tokens"] + r["summary_completion_tokens"]),
+        }
+
+        wall_clock_s = {
+            "parse": totals["pages_to_parse"] * r["parse_s_per_page"] / self.parse_workers,
+            "chunk_embed": totals["chunks_to_embed"] * r["embed_s_per_chunk"],
+            "acronym_llm": llm["acronym_tokens"] / r["llm_tokens_per_s"] / self.nlp_workers,
+            # The rate limit applies per entity (one get_qid), not per SPARQL call
+            "wikifier": totals["new_entities"] / r["wikidata_calls_per_second"],
+            "summarization": llm["summary_tokens"] / r["llm_tokens_per_s"],
+        }
+
+        return {
+            "documents": len(documents),
+            **totals,
+            "sparql_calls": sparql_calls,
+            "llm": llm,
+            "wall_clock_s": {stage: round(s, 1) for stage, s in wall_clock_s.items()},
+            "per_document": documents,
+        }
+
+
+def format_report(report: Dict) -> str:
+    """Human-readable summary of an `estimate` report."""
+    wall = report["wall_clock_s"]
+    llm = report["llm"]
+    lines = [
+        f"Documents:               {report['documents']}",
+        f"PDF pages to parse:      {report['pages_to_parse']} of {report['pages']}",
+        f"Chunks to embed:         {report['chunks_to_embed']} of {report['chunks']}",
+        f"New Wikidata entities:   {report['new_entities']} (~{report['sparql_calls']} SPARQL calls)",
+        f"Acronym LLM calls:       {llm['acronym_calls']} (~{llm['acronym_tokens']} tokens)",
+        f"Community summaries:     {llm['summary_calls']} (~{llm['summary_tokens']} tokens)",
+        "Projected wall clock:",
+    ]
+    for stage, seconds in wall.items():
+        lines.append(f"  {stage:<22} {seconds / 3600:8.2f} h")
+    lines.append(f"  {'total (sequential)':<22} {sum(wall.values()) / 3600:8.2f} h")
+    return "\n".join(lines)
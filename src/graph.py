@@ -1,5 +1,5 @@
-import requests
 import json
+import time
 import pandas as pd
 import numpy as np
 import unidecode
@@ -10,17 +10,38 @@ from collections import defaultdict
 from pathlib import Path
 
 from rdflib import Graph, RDF, RDFS, Namespace, URIRef, Literal
+from rdflib.events import Event
+from rdflib.store import TripleAddedEvent
 from rdflib.namespace import SKOS, XSD
 from SPARQLWrapper import SPARQLWrapper, JSON
 from tqdm import tqdm
 
 from src.linker import Wikifier
 from src.storage import LlamaStorage
+from src import http_client
 
 logger = logging.getLogger(__name__)
 
 CACHE_FILE = "cache/wikidata_cache.json"
 
+# Full Turtle checkpoints are written at most this often...
+COMMIT_INTERVAL = 600  # seconds
+# ...unless the delta journal grows past this many triples
+COMMIT_TRIPLES = 200_000
+
+WDS_URL = 'https://search.worldbank.org/api/v2/wds'  # TODO: update to v3
+WDS_PARAMS = {
+    'format': 'json',
+    'docty': 'Project Appraisal Document',
+    'qterm': 'wind turbine',
+    'fl': ','.join(
+        ['id', 'display_title', 'count', 'trustfund', 'trustfund_key', 'projn', 
+         'projectid', 'display_title', 'owner', 'pdfurl', 'year', 'last_modified_date', ''
+         'docty']),
+    'rows': 20,
+    'page':1
+}
+
 COLUMN_TO_SCHEMA = {
     "id": "identifier",
     "display_title": "name",
@@ -32,6 +53,9 @@ COLUMN_TO_SCHEMA = {
     "owner": "creator"  # TODO: add owner as schema:Organization
 }
 
+# Metadata columns attached to each document as schema:* literals
+DOCUMENT_COLUMNS = ['pdfurl', 'last_modified_date', 'docty', 'owner']
+
 COUNTRY_PROPERTY_MAP = {
     "continent": "P30",
     "form_of_government": "P122",
@@ -54,8 +78,31 @@ PROPERTY_TYPE_MAP = {
 
 
 class KnowledgeGraph():
-    def __init__(self, ttl_path='world-bank-kg.ttl'):
+    """
+    World Bank knowledge graph persisted as Turtle.
+
+    Changes are committed in batches: `commit()` appends the triples added
+    since the last commit to an N-Triples delta journal next to the Turtle
+    file, and only rewrites the full Turtle file (a checkpoint) once
+    `commit_interval` seconds have passed or the journal holds
+    `commit_triples` triples. On load, any journal left by an interrupted
+    run is replayed on top of the Turtle file.
+
+    Args:
+        ttl_path (str): path of the Turtle file
+        commit_interval (float): minimum seconds between Turtle checkpoints
+        commit_triples (int): journal size (triples) that forces a checkpoint
+    """
+    def __init__(
+            self,
+            ttl_path='world-bank-kg.ttl',
+            commit_interval: float = COMMIT_INTERVAL,
+            commit_triples: int = COMMIT_TRIPLES
+        ):
         self.ttl_path = Path(ttl_path)
+        self.journal_path = self.ttl_path.with_suffix(".journal.nt")
+        self.commit_interval = commit_interval
+        self.commit_triples = commit_triples
         self.g = Graph()
         self.loaded = False
         self.linker = Wikifier()
@@ -69,21 +116,19 @@ class KnowledgeGraph():
         else:
             logger.info("Initializing KG.")
 
+        self._journal_size = 0
+        if self.journal_path.exists():
+            before = len(self.g)
+            self.g.parse(self.journal_path, format="nt")
+            self._journal_size = sum(1 for _ in open(self.journal_path, encoding="utf-8"))
+            self.loaded = True
+            logger.info(f"Replayed {len(self.g) - before} triples from {self.journal_path}")
+
         self.schema = Namespace("http://schema.org/")
         self.wd = Namespace('http://www.wikidata.org/entity/')
         self.ex = Namespace("http://worldbank.example.org/")
-        self.url = 'https://search.worldbank.org/api/v2/wds'  # TODO: update to v3
-        self.params = {
-            'format': 'json',
-            'docty': 'Project Appraisal Document',
-            'qterm': 'wind turbine',
-            'fl': ','.join(
-                ['id', 'display_title', 'count', 'trustfund', 'trustfund_key', 'projn', 
-                 'projectid', 'display_title', 'owner', 'pdfurl', 'year', 'last_modified_date', ''
-                 'docty']),
-            'rows': 20,
-            'page':1
-        }
+        self.url = WDS_URL
+        self.params = dict(WDS_PARAMS)
 
         self.prefixes = {
             'schema': self.schema,
@@ -99,6 +144,12 @@ class KnowledgeGraph():
         self.g.add((self.schema.identifier, RDF.type, RDF.Property))
         self.g.add((self.schema.identifier, RDFS.label, Literal("Identifier")))
 
+        # Track triples added from here on for the delta journal
+        self._pending: List[Tuple] = []
+        self._needs_checkpoint = False
+        self._last_checkpoint = time.monotonic()
+        self.g.store.dispatcher.subscribe(TripleAddedEvent, self._on_triple_added)
+
 
     def __repr__(self):
         triples_by_subject = defaultdict(list)
@@ -156,7 +207,7 @@ class KnowledgeGraph():
         self.params['page'] = 1
 
         for _ in range(max_pages):
-            response = requests.get(self.url, params=self.params)
+            response = http_client.get(self.url, params=self.params)
             response.raise_for_status()
             data = json.loads(response.content)
 
@@ -180,8 +231,16 @@ class KnowledgeGraph():
 
             self.params["page"] += 1
 
-        df = pd.DataFrame(metadata_list)
+        df = self._prepare_metadata(pd.DataFrame(metadata_list))
+
+        df.to_csv('output/raw.csv', index=False)
+
+        self.metadata = df
 
+        return self.metadata
+
+
+    def _prepare_metadata(self, df: pd.DataFrame) -> pd.DataFrame:
         # Drop older versions of same document
         df = (
             df.assign(last_modified_date=pd.to_datetime(df["last_modified_date"]))
@@ -197,12 +256,43 @@ class KnowledgeGraph():
         df[columns_to_sanitize] = df[columns_to_sanitize].apply(
             self._sanitize_column
         )
+        return df
 
-        df.to_csv('output/raw.csv', index=False)
 
-        self.metadata = df
+    def sync_metadata(self, harvester) -> int:
+        """
+        Harvest documents modified since the last sync (see
+        `harvest.MetadataHarvester`) and add only those to the graph,
+        replacing the metadata literals of documents already in it.
 
-        return self.metadata
+        The changes are committed with a full checkpoint before the
+        harvester's watermark moves, so an interrupted sync is repeated.
+        Returns the number of new or updated documents.
+        """
+        changed = harvester.sync(advance=False)
+        if changed.empty:
+            return 0
+        self.metadata = self._prepare_metadata(changed)
+        self._remove_document_metadata(self.metadata['id'])
+        self._add_metadata()
+        self.commit(force=True)
+        harvester.advance_watermark(changed)
+        return len(changed)
+
+
+    def _remove_document_metadata(self, doc_ids):
+        """Drop the title and metadata literals of documents about to be re-added."""
+        props = [self.schema.name] + [
+            getattr(self.schema, COLUMN_TO_SCHEMA.get(col, col)) for col in DOCUMENT_COLUMNS]
+        for doc_id in doc_ids:
+            if not isinstance(doc_id, str):
+                continue
+            doc_uri = URIRef(self.ex + f"document/{doc_id.strip()}")
+            for prop in props:
+                if (doc_uri, prop, None) in self.g:
+                    self.g.remove((doc_uri, prop, None))
+                    # The journal only records additions
+                    self._needs_checkpoint = True
     
 
     def _create_new_class(
@@ -642,10 +732,27 @@ class KnowledgeGraph():
         )
 
 
-    def get_document_ids(self) -> List[str]:
-        """Return a list of document nodes in the graph."""
+    def get_document_ids(self, since: Optional[str] = None) -> List[str]:
+        """
+        Return a list of document nodes in the graph.
+        If `since` is given (e.g., '2024-01-01'), only documents with a
+        schema:dateModified on or after that date are returned.
+        """
+        since_ts = pd.to_datetime(since, utc=True) if since else None
+
         ids = []
         for s, p, o in self.g.triples((None, self.schema.identifier, None)):
+            if since_ts is not None:
+                modified = next(self.g.objects(s, self.schema.dateModified), None)
+                if modified is None:
+                    continue
+                try:
+                    modified_ts = pd.to_datetime(str(modified), utc=True)
+                except (ValueError, TypeError):
+                    logger.debug(f"Skipping {o}: unparseable dateModified {modified}")
+                    continue
+                if modified_ts < since_ts:
+                    continue
             ids.append(str(o))
         return ids
     
@@ -752,30 +859,91 @@ class KnowledgeGraph():
         logger.info(f"Added {len(nodes)} chunks for document {doc_id}.")
 
 
-    def build(self):
-        """Builds knowledge graph from metadata."""
-        self.get_metadata()
+    def build(self, harvester=None):
+        """
+        Builds knowledge graph from metadata: a single search page, or all
+        documents harvested by `harvester` (a `harvest.MetadataHarvester`).
+        """
+        if harvester is None:
+            self.get_metadata()
+        else:
+            harvester.sync()
+            self.metadata = self._prepare_metadata(harvester.load())
+        self._add_metadata()
+
+        # Update loaded flag
+        self.loaded = True
+
+
+    def _add_metadata(self):
         self.add_countries()
-        self.add_world_bank_documents(
-            extra_columns=['pdfurl', 'last_modified_date', 'docty', 'owner'])
+        self.add_world_bank_documents(extra_columns=DOCUMENT_COLUMNS)
         self.add_trustfunds()
         self.add_projects()
         self.link_documents_to_countries()
         self.link_documents_to_projects()
         self.link_documents_to_trustfunds()
-
-        # Update loaded flag
-        self.loaded = True
     
 
+    def _on_triple_added(self, event: Event):
+        # Fired before the store inserts the triple, so duplicates can be skipped
+        if event.triple not in self.g:
+            self._pending.append(event.triple)
+
+
+    def commit(self, force: bool = False):
+        """
+        Persist changes made since the last commit.
+
+        New triples are appended to the delta journal (cost proportional to
+        the change, not the graph). The full Turtle file is rewritten only when
+        `force` is set or the checkpoint interval or journal size is reached.
+        Removed triples cannot be journaled, so they are only persisted by the
+        next checkpoint.
+        """
+        if self._pending:
+            delta = Graph()
+            for triple in self._pending:
+                delta.add(triple)
+
+            with open(self.journal_path, "ab") as f:
+                f.write(delta.serialize(format="nt", encoding="utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._journal_size += len(self._pending)
+            logger.debug(f"Journaled {len(self._pending)} triples to {self.journal_path}")
+            self._pending = []
+
+        due = (
+            time.monotonic() - self._last_checkpoint >= self.commit_interval
+            or self._journal_size >= self.commit_triples
+        )
+        if (self._journal_size or self._needs_checkpoint) and (force or due):
+            self.save()
+
+
     def save(self):
-        """Save graph to file. Ensure format and file extension are compatible."""
+        """
+        Write a full Turtle checkpoint and clear the delta journal.
+        Ensure format and file extension are compatible.
+        """
+        tmp_path = self.ttl_path.with_name(f"{self.ttl_path.name}.tmp")
         self.g.serialize(
-            destination=self.ttl_path, 
+            destination=tmp_path, 
             format='turtle', 
             prefixes=self.prefixes, 
             encoding='utf-8'
         )
+        os.replace(tmp_path, self.ttl_path)
+
+        # The checkpoint holds everything pending or journaled
+        self._pending = []
+        self._journal_size = 0
+        self._needs_checkpoint = False
+        self._last_checkpoint = time.monotonic()
+        self.journal_path.unlink(missing_ok=True)
+
         logger.info(f"Knowledge graph saved to {self.ttl_path}")
 
 
@@ -783,11 +951,14 @@ class KnowledgeGraph():
     def load_or_build(
         cls, 
         ttl_path="world-bank-kg.ttl", 
-        rebuild: bool = False
+        rebuild: bool = False,
+        harvester=None
     ):
         """
         Load existing KG if available, otherwise build a new one.
         If rebuild=True, overwrite any existing file and force a rebuild.
+        With a `harvester`, a loaded KG is synced with documents modified
+        since the last harvest instead.
         """
         ttl_file = Path(ttl_path)
 
@@ -795,6 +966,7 @@ class KnowledgeGraph():
             if ttl_file.exists():
                 logger.warning(f"Rebuilding KG, removing existing file at {ttl_file}")
                 ttl_file.unlink()
+            ttl_file.with_suffix(".journal.nt").unlink(missing_ok=True)
         
             cache_path = Path(CACHE_FILE)
             if cache_path.exists():
@@ -805,8 +977,10 @@ class KnowledgeGraph():
         logger.info(f"Loaded KG with {len(kg.g)} triples")
         
         if rebuild or not kg.loaded:
-            kg.build()
+            kg.build(harvester=harvester)
             kg.save()
+        elif harvester is not None:
+            kg.sync_metadata(harvester)
 
         return kg
 
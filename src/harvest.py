@@ -0,0 +1,188 @@
+import json
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src import http_client
+
+logger = logging.getLogger(__name__)
+
+METADATA_DIR = "output/metadata"
+SYNC_FILE = "_sync.json"
+PARTITION_COLS = ["year", "docty"]
+UNKNOWN_PARTITION = "unknown"
+
+# Newest first, so an incremental sync can stop once it reaches known documents
+SORT_PARAMS = {"srt": "last_modified_date", "order": "desc"}
+
+
+class MetadataHarvester:
+    """
+    Incremental, concurrent harvester for World Bank Documents & Reports (WDS)
+    search results, stored as Parquet partitioned by year and document type.
+
+    The first page reports the total hit count; the remaining pages are then
+    fetched in waves of `max_concurrency` concurrent requests. Results are
+    requested newest-modified first, and a sync only keeps documents whose
+    `last_modified_date` is newer than the previous sync (the watermark in
+    `{root}/_sync.json`). If the API returns pages in that order, the sync
+    stops after the first wave that reaches the watermark; otherwise every
+    page is fetched and filtered.
+
+    Each sync appends new Parquet files under `{root}/year=.../docty=.../`;
+    `load()` reads the dataset back and keeps the latest version of each
+    document.
+
+    Usage:
+        harvester = MetadataHarvester(kg.url, kg.params)
+        changed = harvester.sync()
+        metadata = harvester.load()
+
+    Args:
+        url (str): WDS search endpoint
+        params (dict): search parameters (query, fields, filters)
+        root (str): Parquet dataset directory
+        max_concurrency (int): concurrent page requests
+        rows (int): documents per page
+    """
+    def __init__(
+            self,
+            url: str,
+            params: Dict,
+            root: str = METADATA_DIR,
+            max_concurrency: int = 4,
+            rows: int = 100
+        ):
+        self.url = url
+        self.params = {**params, **SORT_PARAMS, "rows": rows}
+        self.params.pop("page", None)
+        self.root = Path(root)
+        self.sync_path = self.root / SYNC_FILE
+        self.max_concurrency = max_concurrency
+        self.rows = rows
+
+
+    def watermark(self) -> Optional[pd.Timestamp]:
+        """`last_modified_date` of the newest document harvested so far."""
+        if not self.sync_path.exists():
+            return None
+        state = json.loads(self.sync_path.read_text())
+        return pd.to_datetime(state["last_modified_date"], utc=True) if state.get("last_modified_date") else None
+
+
+    def _fetch_page(self, page: int) -> Tuple[List[Dict], int]:
+        """Documents on one result page and the total hit count."""
+        response = http_client.get(self.url, params={**self.params, "page": page})
+        response.raise_for_status()
+        data = json.loads(response.content)
+
+        documents = [
+            metadata for metadata in data.get("documents", {}).values()
+            # Skip 'facets' and malformed docs with no 'id'
+            if isinstance(metadata, dict) and "id" in metadata
+        ]
+        return documents, int(data.get("total") or 0)
+
+
+    def harvest(self, since: Optional[pd.Timestamp] = None, max_pages: Optional[int] = None) -> pd.DataFrame:
+        """Fetch documents modified after `since` (all documents if None)."""
+        documents, total = self._fetch_page(1)
+        n_pages = math.ceil(total / self.rows) if total else 1
+        if max_pages:
+            n_pages = min(n_pages, max_pages)
+        logger.info(f"Harvesting up to {n_pages} pages of {self.rows} documents ({total} total).")
+
+        pages = [documents]
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            next_page = 2
+            while next_page <= n_pages and not self._reached(pages, since):
+                wave = range(next_page, min(next_page + self.max_concurrency, n_pages + 1))
+                pages.extend(docs for docs, _ in pool.map(self._fetch_page, wave))
+                next_page = wave.stop
+
+        df = pd.DataFrame([doc for page in pages for doc in page])
+        if df.empty:
+            return df
+
+        df["last_modified_date"] = pd.to_datetime(df["last_modified_date"], errors="coerce", utc=True)
+        if since is not None:
+            df = df[df["last_modified_date"] > since]
+        return _latest_versions(df)
+
+
+    def _reached(self, pages: List[List[Dict]], since: Optional[pd.Timestamp]) -> bool:
+        """Whether pages fetched so far are newest-first and already reach `since`."""
+        if since is None:
+            return False
+        dates = pd.to_datetime(
+            [doc.get("last_modified_date") for page in pages for doc in page], errors="coerce", utc=True)
+        dates = dates.dropna()
+        if len(dates) == 0 or not dates.is_monotonic_decreasing:
+            return False
+        return dates[-1] <= since
+
+
+    def sync(self, max_pages: Optional[int] = None, advance: bool = True) -> pd.DataFrame:
+        """
+        Harvest documents modified since the last sync, persist them and return them.
+
+        With `advance=False` the watermark stays where it is until
+        `advance_watermark` is called, e.g. once the documents are committed
+        to the knowledge graph; until then the next sync fetches them again.
+        """
+        since = self.watermark()
+        changed = self.harvest(since=since, max_pages=max_pages)
+        if changed.empty:
+            logger.info(f"No documents modified since {since}.")
+            return changed
+
+        self._write(changed)
+        logger.info(
+            f"Harvested {len(changed)} new or updated documents "
+            f"(modified up to {changed['last_modified_date'].max()}).")
+        if advance:
+            self.advance_watermark(changed)
+        return changed
+
+
+    def advance_watermark(self, changed: pd.DataFrame):
+        """Record the newest `last_modified_date` in `changed` as the sync watermark."""
+        if changed.empty:
+            return
+        newest = changed["last_modified_date"].max()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.sync_path.write_text(json.dumps({"last_modified_date": newest.isoformat()}))
+
+
+    def _write(self, df: pd.DataFrame):
+        self.root.mkdir(parents=True, exist_ok=True)
+        df = df.copy()
+        for col in PARTITION_COLS:
+            if col not in df:
+                df[col] = None
+            df[col] = df[col].fillna(UNKNOWN_PARTITION).astype(str).replace("", UNKNOWN_PARTITION)
+        df.to_parquet(self.root, partition_cols=PARTITION_COLS, index=False)
+
+
+    def load(self) -> pd.DataFrame:
+        """All harvested documents, latest version of each."""
+        if not any(self.root.glob("*=*")):
+            return pd.DataFrame()
+        df = pd.read_parquet(self.root)
+        for col in PARTITION_COLS:
+            # Partition values come back as categories
+            df[col] = df[col].astype(str).replace(UNKNOWN_PARTITION, None)
+        return _latest_versions(df)
+
+
+def _latest_versions(df: pd.DataFrame) -> pd.DataFrame:
+    """Drop older versions of the same document."""
+    return (
+        df.sort_values("last_modified_date", ascending=False)
+        .drop_duplicates(subset="id", keep="first")
+        .reset_index(drop=True)
+    )
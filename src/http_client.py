@@ -0,0 +1,117 @@
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.metrics import count_http
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "WorldBankKGBot/1.0 (eriktuck@gmail.com)"
+
+# (connect, read) timeout in seconds, used unless a call passes its own
+DEFAULT_TIMEOUT = (10, 120)
+
+# Connection pools kept per host, and connections kept alive per pool
+POOL_HOSTS = 16
+POOL_MAXSIZE = 16
+
+# Only idempotent methods are retried after a read error or retryable
+# status; a POST (e.g. an Ollama generation) is never sent twice
+RETRY = Retry(
+    total=4,
+    backoff_factor=0.5,  # 0.5s, 1s, 2s, 4s
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=("GET", "HEAD"),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+_session: Optional[requests.Session] = None
+_session_pid: Optional[int] = None
+_lock = threading.Lock()
+
+_host_metrics: Dict[str, Dict] = defaultdict(
+    lambda: {"requests": 0, "errors": 0, "bytes": 0, "seconds": 0.0})
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_HOSTS, pool_maxsize=POOL_MAXSIZE, max_retries=RETRY)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    # requests already negotiates gzip/deflate; set it explicitly for clarity
+    session.headers.update({"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"})
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Keep-alive session shared by every module in this process.
+
+    A new session is created after a fork so worker processes never share
+    sockets with their parent.
+    """
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        with _lock:
+            if _session is None or _session_pid != os.getpid():
+                _session = _build_session()
+                _session_pid = os.getpid()
+    return _session
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """
+    Send a request through the shared session with the default timeout and
+    retry policy, recording per-host metrics.
+    """
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    host = urlsplit(url).netloc
+    start = time.perf_counter()
+    try:
+        response = get_session().request(method, url, **kwargs)
+    except requests.RequestException:
+        with _lock:
+            _host_metrics[host]["errors"] += 1
+        raise
+    finally:
+        count_http()
+        with _lock:
+            stats = _host_metrics[host]
+            stats["requests"] += 1
+            stats["seconds"] += time.perf_counter() - start
+
+    if not kwargs.get("stream"):
+        with _lock:
+            _host_metrics[host]["bytes"] += len(response.content)
+    if response.status_code >= 400:
+        with _lock:
+            _host_metrics[host]["errors"] += 1
+    return response
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def head(url: str, **kwargs) -> requests.Response:
+    return request("HEAD", url, **kwargs)
+
+
+def host_metrics() -> Dict[str, Dict]:
+    """Requests, errors, response bytes and total seconds per host in this process."""
+    with _lock:
+        return {host: dict(stats) for host, stats in _host_metrics.items()}
@@ -1,15 +1,19 @@
 from typing import List, Tuple, Optional, Any, Dict
 from SPARQLWrapper import SPARQLWrapper, JSON
 from tqdm import tqdm
-import requests
 from openai import OpenAI
 import json
 import logging
-from ratelimit import limits, sleep_and_retry
 import os
+import tempfile
+import threading
+import time
 
 from src.prompts import entity_linker_prompt
 from src.utils import sanitize_for_sparql, num_tokens
+from src.metrics import count_http, count_tokens
+from src.locks import file_lock
+from src import http_client
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +23,15 @@ EMAIL_ADDRESS = "eriktuck@gmail.com"
 
 CACHE_FILE = 'cache/wikidata_cache.json'  # TODO: move centrally
 
+# Time of the last Wikidata lookup by any process on this machine, shared
+# so the rate limit holds across worker processes
+RATE_LIMIT_FILE = 'cache/wikidata_rate_limit'
+
+# Serializes cache rewrites between threads of one process (the async
+# corpus runner links several documents at once); the file lock in
+# `locks.file_lock` serializes them between processes
+_CACHE_LOCK = threading.Lock()
+
 TYPE_QID_MAP = {
     "CARDINAL": ["wd:Q11229"],                # number
     "DATE": ["wd:Q205892"],                   # point in time
@@ -41,9 +54,35 @@ TYPE_QID_MAP = {
 }
 
 
+def wait_for_rate_limit(period: float = ONE_SECOND):
+    """
+    Block until `period` seconds have passed since the last call from any
+    process or thread on this machine, then record this call.
+    """
+    with file_lock(RATE_LIMIT_FILE):
+        last = None
+        if os.path.exists(RATE_LIMIT_FILE):
+            with open(RATE_LIMIT_FILE, "r") as f:
+                last = f.read().strip()
+        wait = (float(last) if last else 0.0) + period - time.time()
+        if wait > 0:
+            time.sleep(wait)
+        with open(RATE_LIMIT_FILE, "w") as f:
+            f.write(repr(time.time()))
+
+
 class Wikifier:
+    """
+    Links entities to Wikidata QIDs, with a shared on-disk cache of results.
+
+    Workers each hold a snapshot of the cache and record their new lookups
+    separately; `_write_cache` merges those into the current file, so
+    concurrent workers never drop each other's results. Lookups are limited
+    to one per second across all processes (see `wait_for_rate_limit`).
+    """
     def __init__(self):
         self.cache = self._load_cache()
+        self._updates: Dict[str, Dict] = {}
 
     def _load_cache(self) -> Dict:
         if os.path.exists(CACHE_FILE):
@@ -115,12 +154,11 @@ class Wikifier:
 
             if qid:
                 qid_url = f'https://www.wikidata.org/wiki/{qid}'
-                self.cache['entities'][cache_key] = qid_url
                 logger.debug(f"{entity_name}: {qid}")
             else:
                 logger.debug(f"{entity_name}: has no QID")
-                self.cache['entities'][cache_key] = None
                 qid_url = None
+            self._cache_entry("entities", cache_key, qid_url)
 
             entities_with_qid.append({
                 "surface": entity_name,
@@ -129,15 +167,45 @@ class Wikifier:
                 "qid": qid,
             })
 
-        with open(CACHE_FILE, 'w') as f:
-            json.dump(self.cache, f, ensure_ascii=False, indent=4)
+        self._write_cache()
 
         return entities_with_qid
 
 
-    @sleep_and_retry
-    @limits(calls=1, period=ONE_SECOND)
+    def _cache_entry(self, section: str, key: str, value: Optional[str]):
+        """Add a lookup result to the cache and to the updates for `_write_cache`."""
+        self.cache.setdefault(section, {})[key] = value
+        self._updates.setdefault(section, {})[key] = value
+
+
+    def _write_cache(self):
+        """
+        Merge this instance's new lookups into the cache file as it is now
+        (other workers may have written since it was loaded), under a lock
+        held across threads and processes. The file is replaced via a
+        uniquely named temp file so it is never left half-written.
+        """
+        cache_dir = os.path.dirname(CACHE_FILE) or "."
+        with _CACHE_LOCK, file_lock(CACHE_FILE):
+            cache = self._load_cache()
+            for section, entries in self._updates.items():
+                cache.setdefault(section, {}).update(entries)
+
+            fd, tmp_file = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(cache, f, ensure_ascii=False, indent=4)
+                os.replace(tmp_file, CACHE_FILE)
+            except BaseException:
+                os.unlink(tmp_file)
+                raise
+
+        self.cache = cache
+        self._updates = {}
+
+
     def get_qid(self, entity_name: str, entity_type:str = None) -> str:
+        wait_for_rate_limit()
         exact_match_qid = self.get_qid_via_exact_match(entity_name, entity_type)
         if exact_match_qid:
             return exact_match_qid
@@ -187,7 +255,7 @@ class Wikifier:
         headers = {"User-Agent": f"WorldBankKGBot/1.0 ({EMAIL_ADDRESS})"}
         params = {"query": query, "format": "json"}
 
-        response = requests.get(endpoint_url, headers=headers, params=params)
+        response = http_client.get(endpoint_url, headers=headers, params=params)
         response.raise_for_status()
         results = response.json()
 
@@ -220,7 +288,7 @@ class Wikifier:
             "type": "item",
             "limit": limit,
         }
-        r = requests.get("https://www.wikidata.org/w/api.php", params=params, headers=headers)
+        r = http_client.get("https://www.wikidata.org/w/api.php", params=params, headers=headers)
         r.raise_for_status()
         results = r.json().get("search", [])
 
@@ -235,7 +303,7 @@ class Wikifier:
                 "srlimit": limit,
                 "format": "json",
             }
-            r = requests.get("https://www.wikidata.org/w/api.php", params=params, headers=headers)
+            r = http_client.get("https://www.wikidata.org/w/api.php", params=params, headers=headers)
             r.raise_for_status()
             cirrus_results = r.json().get("query", {}).get("search", [])
             if cirrus_results:
@@ -323,6 +391,9 @@ class Wikifier:
             # temperature=0,
             response_format={"type": "json_object"}
         )
+        count_http()
+        if getattr(response, "usage", None):
+            count_tokens(response.usage.prompt_tokens, response.usage.completion_tokens)
 
         logger.info("Raw response object: %s", response)
         logger.info("Raw message content: %s", response.choices[0].message.content)
@@ -0,0 +1,15 @@
+import os
+from contextlib import contextmanager
+
+from filelock import FileLock
+
+
+@contextmanager
+def file_lock(path: str):
+    """
+    Exclusive lock on the file `{path}.lock`, held across threads and
+    processes on this machine (portable, via `filelock`).
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with FileLock(f"{path}.lock"):
+        yield
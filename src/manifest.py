@@ -0,0 +1,173 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+
+# Outputs that live in a store rather than a local file
+LOCATION_SCHEMES = ("docstore:", "kg:")
+
+STAGES = [
+    "parse",
+    "chunk_embed",
+    "acronyms",
+    "ner",
+    "linking",
+    "chunk_enrichment",
+    "chunk_kg",
+    "communities",
+    "summaries",
+]
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_text(text: str) -> str:
+    return hash_bytes(text.encode("utf-8"))
+
+
+def hash_file(path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_obj(obj: Any) -> str:
+    """SHA-256 of a JSON-serializable object (key order independent)."""
+    return hash_text(json.dumps(obj, sort_keys=True, ensure_ascii=False, default=str))
+
+
+def parse_input(pdf_sha256: str) -> str:
+    """Input hash of the parse stage: the PDF content (its SHA-256 in the PDF cache), not its URL."""
+    return hash_obj({"sha256": pdf_sha256})
+
+
+class StageManifest:
+    """
+    Per-document record of completed pipeline stages.
+
+    Each stage entry stores the hash of the stage inputs, the output location
+    and the hash of the output. A stage is current when its recorded input hash
+    matches the hash of the inputs for this run and its output still exists;
+    reruns skip current stages. Because downstream input hashes are built from
+    upstream outputs, a change anywhere invalidates every later stage.
+
+    The manifest lives at `{root}/{doc_id}/manifest.json`; JSON outputs written
+    through `save_output` go to `{root}/{doc_id}/stages/{stage}.json`.
+
+    Args:
+        doc_id (str): document ID (or '_corpus' for corpus-level stages)
+        root (str): root output directory
+    """
+    def __init__(self, doc_id: str, root: str = "output"):
+        self.doc_id = str(doc_id)
+        self.dir = Path(root) / self.doc_id
+        self.path = self.dir / MANIFEST_FILE
+        self.stages: Dict[str, Dict] = self._load()
+
+
+    def _load(self) -> Dict[str, Dict]:
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    return json.load(f).get("stages", {})
+            except json.JSONDecodeError:
+                logger.warning(f"Ignoring corrupt manifest at {self.path}")
+        return {}
+
+
+    def _write(self):
+        """Write via a temp file so a crash never leaves a partial manifest."""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"doc_id": self.doc_id, "stages": self.stages}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+    @staticmethod
+    def _output_exists(output: Optional[str]) -> bool:
+        """Local paths must exist; store locations (e.g. 'docstore:<id>') are trusted."""
+        if not output or output.startswith(LOCATION_SCHEMES):
+            return True
+        return Path(output).exists()
+
+
+    def get(self, stage: str) -> Optional[Dict]:
+        return self.stages.get(stage)
+
+
+    def input_hash(self, stage: str) -> Optional[str]:
+        entry = self.get(stage)
+        return entry["input_hash"] if entry else None
+
+
+    def output_hash(self, stage: str) -> Optional[str]:
+        entry = self.get(stage)
+        return entry.get("output_hash") if entry else None
+
+
+    def is_current(self, stage: str, input_hash: str) -> bool:
+        """True if the stage ran on identical inputs and its output is still present."""
+        entry = self.get(stage)
+        if not entry or entry.get("input_hash") != input_hash:
+            return False
+        return self._output_exists(entry.get("output"))
+
+
+    def record(
+            self,
+            stage: str,
+            input_hash: str,
+            output: Optional[str] = None,
+            output_hash: Optional[str] = None
+        ):
+        """Mark a stage as completed for the given inputs."""
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage: {stage}")
+
+        # Other processes may have recorded stages for this document meanwhile
+        self.stages = self._load()
+        self.stages[stage] = {
+            "input_hash": input_hash,
+            "output": str(output) if output is not None else None,
+            "output_hash": output_hash,
+            "completed_at": datetime.now(timezone.utc).isoformat(),
+        }
+        self._write()
+        logger.debug(f"Recorded stage '{stage}' for doc {self.doc_id}")
+
+
+    def stage_output_path(self, stage: str) -> Path:
+        return self.dir / "stages" / f"{stage}.json"
+
+
+    def load_output(self, stage: str, input_hash: str) -> Optional[Any]:
+        """Return the stored JSON output of a current stage, else None."""
+        if not self.is_current(stage, input_hash):
+            return None
+        output = self.get(stage).get("output")
+        with open(output, "r", encoding="utf-8") as f:
+            logger.info(f"Skipping stage '{stage}' for doc {self.doc_id}; inputs unchanged.")
+            return json.load(f)
+
+
+    def save_output(self, stage: str, input_hash: str, data: Any) -> Path:
+        """Store a stage's JSON output and record the stage."""
+        path = self.stage_output_path(stage)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        text = json.dumps(data, ensure_ascii=False)
+        path.write_text(text, encoding="utf-8")
+        self.record(stage, input_hash, output=str(path), output_hash=hash_text(text))
+        return path
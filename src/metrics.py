@@ -0,0 +1,108 @@
+import contextvars
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+METRICS_FILE = Path("logs/stage_metrics.jsonl")
+
+# Records of the stages currently running in this context (outermost first)
+_active: contextvars.ContextVar = contextvars.ContextVar("active_stages", default=())
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def count_http(n: int = 1):
+    """Count outbound HTTP requests against every active stage."""
+    for record in _active.get():
+        record["http_calls"] += n
+
+
+def count_tokens(prompt_tokens: Optional[int] = 0, completion_tokens: Optional[int] = 0):
+    """Count LLM prompt/completion tokens against every active stage."""
+    for record in _active.get():
+        record["prompt_tokens"] += prompt_tokens or 0
+        record["completion_tokens"] += completion_tokens or 0
+
+
+class StageRecorder:
+    """
+    Emits one structured record per pipeline stage per document.
+
+    Each record holds wall time, CPU time, peak RSS of the process, HTTP calls
+    made, LLM prompt/completion tokens, and items in/out, and is appended as a
+    JSON line to `logs/stage_metrics.jsonl` (one line per write, so several
+    worker processes can share the file).
+
+    Usage:
+        recorder = StageRecorder(doc_id)
+        with recorder.stage("spacy", items_in=len(text)) as rec:
+            doc = nlp(text)
+            rec["items_out"] = len(doc.ents)
+
+    Args:
+        doc_id (str): document the stages belong to ('_corpus' for corpus-level stages)
+        path (Path): JSONL output file; defaults to METRICS_FILE
+    """
+    def __init__(self, doc_id: str, path: Optional[Path] = None):
+        self.doc_id = str(doc_id)
+        self.path = Path(path) if path else METRICS_FILE
+
+
+    @contextmanager
+    def stage(self, name: str, items_in: Optional[int] = None):
+        record = {
+            "doc_id": self.doc_id,
+            "stage": name,
+            "pid": os.getpid(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "items_in": items_in,
+            "items_out": None,
+            "http_calls": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+        }
+        token = _active.set(_active.get() + (record,))
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        status = "ok"
+        try:
+            yield record
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            _active.reset(token)
+            record["wall_s"] = round(time.perf_counter() - wall_start, 4)
+            record["cpu_s"] = round(time.process_time() - cpu_start, 4)
+            record["peak_rss_mb"] = _peak_rss_mb()
+            record["status"] = status
+            self._write(record)
+
+
+    def _write(self, record: Dict):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not write stage metrics to {self.path}: {e}")
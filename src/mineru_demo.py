@@ -38,9 +38,12 @@ def do_parse(
     f_dump_orig_pdf=True,  # Whether to dump original PDF files
     f_dump_content_list=True,  # Whether to dump content list files
     f_make_md_mode=MakeMode.MM_MD,  # The mode for making markdown content, default is MM_MD
+    f_compact_json=False,  # Whether to stream JSON outputs without indentation
     start_page_id=0,  # Start page ID for parsing, default is 0
     end_page_id=None,  # End page ID for parsing, default is None (parse all pages until the end of the document)
 ):
+    """Returns the content list of each PDF by file name, whether or not it is dumped to disk."""
+    content_lists = {}
 
     if backend == "pipeline":
         for idx, pdf_bytes in enumerate(pdf_bytes_list):
@@ -64,11 +67,12 @@ def do_parse(
             pdf_info = middle_json["pdf_info"]
 
             pdf_bytes = pdf_bytes_list[idx]
-            _process_output(
+            content_lists[pdf_file_name] = _process_output(
                 pdf_info, pdf_bytes, pdf_file_name, local_md_dir, local_image_dir,
                 md_writer, f_draw_layout_bbox, f_draw_span_bbox, f_dump_orig_pdf,
                 f_dump_md, f_dump_content_list, f_dump_middle_json, f_dump_model_output,
-                f_make_md_mode, middle_json, model_json, is_pipeline=True
+                f_make_md_mode, middle_json, model_json, is_pipeline=True,
+                f_compact_json=f_compact_json
             )
     else:
         if backend.startswith("vlm-"):
@@ -85,13 +89,16 @@ def do_parse(
 
             pdf_info = middle_json["pdf_info"]
 
-            _process_output(
+            content_lists[pdf_file_name] = _process_output(
                 pdf_info, pdf_bytes, pdf_file_name, local_md_dir, local_image_dir,
                 md_writer, f_draw_layout_bbox, f_draw_span_bbox, f_dump_orig_pdf,
                 f_dump_md, f_dump_content_list, f_dump_middle_json, f_dump_model_output,
-                f_make_md_mode, middle_json, infer_result, is_pipeline=False
+                f_make_md_mode, middle_json, infer_result, is_pipeline=False,
+                f_compact_json=f_compact_json
             )
 
+    return content_lists
+
 
 def _process_output(
         pdf_info,
@@ -110,9 +117,16 @@ def _process_output(
         f_make_md_mode,
         middle_json,
         model_output=None,
-        is_pipeline=True
+        is_pipeline=True,
+        f_compact_json=False
 ):
     """处理输出文件"""
+    def dump_json(file_name, obj):
+        if f_compact_json:
+            _write_json_compact(os.path.join(local_md_dir, file_name), obj)
+        else:
+            md_writer.write_string(file_name, json.dumps(obj, ensure_ascii=False, indent=4))
+
     if f_draw_layout_bbox:
         draw_layout_bbox(pdf_info, pdf_bytes, local_md_dir, f"{pdf_file_name}_layout.pdf")
 
@@ -135,27 +149,43 @@ def _process_output(
             md_content_str,
         )
 
+    # Always built: callers can take the content list in memory instead of from disk
+    make_func = pipeline_union_make if is_pipeline else vlm_union_make
+    content_list = make_func(pdf_info, MakeMode.CONTENT_LIST, image_dir)
     if f_dump_content_list:
-        make_func = pipeline_union_make if is_pipeline else vlm_union_make
-        content_list = make_func(pdf_info, MakeMode.CONTENT_LIST, image_dir)
-        md_writer.write_string(
-            f"{pdf_file_name}_content_list.json",
-            json.dumps(content_list, ensure_ascii=False, indent=4),
-        )
+        dump_json(f"{pdf_file_name}_content_list.json", content_list)
 
     if f_dump_middle_json:
-        md_writer.write_string(
-            f"{pdf_file_name}_middle.json",
-            json.dumps(middle_json, ensure_ascii=False, indent=4),
-        )
+        dump_json(f"{pdf_file_name}_middle.json", middle_json)
 
     if f_dump_model_output:
-        md_writer.write_string(
-            f"{pdf_file_name}_model.json",
-            json.dumps(model_output, ensure_ascii=False, indent=4),
-        )
+        dump_json(f"{pdf_file_name}_model.json", model_output)
 
     logger.info(f"local output dir is {local_md_dir}")
+    return content_list
+
+
+def _write_json_compact(path, obj):
+    """Serialize `obj` to `path` chunk by chunk, without building the whole string."""
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk in encoder.iterencode(obj):
+            f.write(chunk)
+
+
+def render_debug_artifacts(local_md_dir, pdf_file_name, pdf_bytes, start_page_id=0, end_page_id=None):
+    """
+    Regenerate the layout/span bbox PDFs and the origin PDF of a parse from its
+    stored middle JSON, for documents parsed without debug artifacts.
+    """
+    with open(os.path.join(local_md_dir, f"{pdf_file_name}_middle.json"), "r", encoding="utf-8") as f:
+        pdf_info = json.load(f)["pdf_info"]
+
+    pdf_bytes = convert_pdf_bytes_to_bytes_by_pypdfium2(pdf_bytes, start_page_id, end_page_id)
+    draw_layout_bbox(pdf_info, pdf_bytes, local_md_dir, f"{pdf_file_name}_layout.pdf")
+    draw_span_bbox(pdf_info, pdf_bytes, local_md_dir, f"{pdf_file_name}_span.pdf")
+    FileBasedDataWriter(local_md_dir).write(f"{pdf_file_name}_origin.pdf", pdf_bytes)
+    logger.info(f"Rendered debug artifacts for {pdf_file_name} in {local_md_dir}")
 
 
 def parse_doc(
@@ -0,0 +1,78 @@
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterable
+
+import spacy
+from spacy.language import Language
+from scispacy.abbreviation import AbbreviationDetector  # used to add "abbreviation_detector" in nlp pipeline
+
+from src.ner import EntityExtractor
+
+logger = logging.getLogger(__name__)
+
+UNBIS_VOCAB_FILE = 'cache/unbis_vocab.json'
+
+_NLP_CACHE: Dict[str, Language] = {}
+_LOCK = threading.Lock()
+
+
+def _load_unbis_terms(path: str = UNBIS_VOCAB_FILE) -> Dict[str, str]:
+    if not os.path.exists(path):
+        logger.warning(f"UNBIS vocabulary not found at {path}; run scripts/download_unbis_vocab.py.")
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.loads(f.read())
+
+
+def _build_nlp(model: str) -> Language:
+    """Load a spaCy model and attach the static pipeline components."""
+    logger.info(f"Loading spaCy model '{model}'...")
+    nlp = spacy.load(model)
+
+    # Add abbreviation detector
+    if "abbreviation_detector" not in nlp.pipe_names:
+        nlp.add_pipe("abbreviation_detector", first=True)
+
+    # Add entity ruler with UNBIS patterns (before NER)
+    if "entity_ruler" not in nlp.pipe_names:
+        entity_ruler = nlp.add_pipe("entity_ruler", before="ner", config={"phrase_matcher_attr": "LOWER"})
+        entity_extractor = EntityExtractor()
+        entity_extractor.add_unbis_patterns(_load_unbis_terms())
+        if entity_extractor.patterns:
+            entity_ruler.add_patterns(entity_extractor.patterns)
+            logger.debug(f"Added {len(entity_extractor.patterns)} UNBIS patterns to EntityRuler.")
+
+    return nlp
+
+
+def get_nlp(model: str = "en_core_web_sm") -> Language:
+    """
+    Return a ready `nlp` object for the given model.
+
+    Each model is loaded once per process with the abbreviation detector and
+    the UNBIS EntityRuler pre-attached, then kept warm for later documents.
+    Per-document components (e.g. acronym patterns) must not be added to the
+    shared pipeline.
+    """
+    nlp = _NLP_CACHE.get(model)
+    if nlp is not None:
+        return nlp
+
+    with _LOCK:
+        if model not in _NLP_CACHE:
+            _NLP_CACHE[model] = _build_nlp(model)
+        return _NLP_CACHE[model]
+
+
+def preload(models: Iterable[str] = ("en_core_web_sm",)):
+    """Warm the registry, e.g. as a process pool initializer."""
+    for model in models:
+        get_nlp(model)
+
+
+def clear():
+    """Drop all cached models."""
+    with _LOCK:
+        _NLP_CACHE.clear()
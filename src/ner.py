@@ -59,7 +59,9 @@ class EntityExtractor:
         Add both acronym (e.g., 'STEP') and expanded form (e.g.,
         'Systematic Tracking and Exchanges in Procurement') patterns to the EntityRuler.
         Gives them priority over SpaCy NER and allows case-insensitive matching.
+        Returns the newly added patterns.
         """
+        start = len(self.patterns)
 
         for abbr, expanded in acronyms.items():
             # Add abbreviation pattern
@@ -78,6 +80,8 @@ class EntityExtractor:
                     "id": expanded
                 })
 
+        return self.patterns[start:]
+
     def add_unbis_patterns(self, unbis_terms):
         """
         Add UNBIS terms to the EntityRuler for matching.
@@ -102,6 +106,12 @@ class EntityExtractor:
         """Collect all entity spans (including those added by EntityRuler)."""
         return [{"surface": ent.text, "label": ent.label_, 'id': ent.id_, 'qid': None}
             for ent in doc.ents if ent.label_ not in EXCLUDED_ENTS]
+
+    def collect_mentions(self, doc, chunk_id: str) -> List[Dict]:
+        """Collect entity spans with character offsets relative to the chunk text."""
+        return [{"surface": ent.text, "label": ent.label_, 'id': ent.id_, 'qid': None,
+                 "chunk_id": chunk_id, "start_char": ent.start_char, "end_char": ent.end_char}
+            for ent in doc.ents if ent.label_ not in EXCLUDED_ENTS]
     
 
 def main():
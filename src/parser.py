@@ -1,22 +1,154 @@
+import hashlib
 import json
 import re
-from typing import List, Tuple, Optional, Sequence, Any
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional, Sequence, Any
 from llama_index.core.bridge.pydantic import Field
 from llama_index.core.callbacks.base import CallbackManager
-from llama_index.core.node_parser.interface import NodeParser
+from llama_index.core.node_parser.interface import NodeParser, TextSplitter
 from llama_index.core.text_splitter import SentenceSplitter
 from llama_index.core import Document
 from llama_index.core.node_parser.node_utils import build_nodes_from_splits
-from llama_index.core.schema import TextNode, NodeRelationship, BaseNode
+from llama_index.core.schema import TextNode, NodeRelationship, BaseNode, MetadataMode
 from llama_index.core.utils import get_tqdm_iterable
-from bs4 import BeautifulSoup
-from markdownify import markdownify as md
+from src.splitters import make_splitter
+from src.tables import table_to_markdown
                 
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# Sections are sent to split workers in batches of roughly this many characters
+SECTION_BATCH_CHARS = 200_000
+
+# Text splitters rebuilt from their spec, once per worker process
+_SPLITTERS: Dict[str, NodeParser] = {}
+
+
+def chunk_id(doc_id: str, header_path: str, text_hash: str, occurrence: int = 0) -> str:
+    """
+    Deterministic node ID for a chunk, from its document, header path and
+    text hash: re-parsing the same content list gives the same IDs, and an
+    edited chunk a new one. `occurrence` tells apart identical chunks under
+    the same header of one document.
+    """
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, json.dumps([doc_id, header_path, text_hash, occurrence])))
+
+
+def extract_sections(struct_out: List[Dict], header_path_separator: str = "/") -> List[Tuple[str, str]]:
+    """
+    Turn a MinerU content list into (section text, header path) pairs in
+    node order.
+
+    Headers start a new section; text under a header accumulates until the
+    next header. A table is converted to markdown and emitted as its own
+    section at its position, while the surrounding text keeps accumulating.
+    """
+    return list(iter_sections(struct_out, header_path_separator))
+
+
+def iter_sections(struct_out: Iterable[Dict], header_path_separator: str = "/") -> Iterator[Tuple[str, str]]:
+    """`extract_sections`, yielding each section as soon as it is complete."""
+    sections: List[Tuple[str, str]] = []
+    current_section = ""
+    header_stack: List[Tuple[int, str]] = []
+
+    def process_current_section(current_section: str):
+        if not current_section.strip():
+           return ""
+        
+        header_path = header_path_separator.join(
+            [h for _, h in header_stack]
+        )
+        sections.append((current_section.strip(), header_path))
+        
+        # reset buffer
+        return ""
+
+    for element in struct_out:
+        # Hand over sections completed by the previous element
+        yield from sections
+        sections.clear()
+
+        etype = element.get("type")
+
+        # ---- Handle headers ----
+        if (etype == "text" and "text_level" in element 
+            and isinstance(element["text_level"], int)):
+            # Save the previous section before starting a new one
+            current_section = process_current_section(current_section)
+            
+            level = element["text_level"]
+            text = element.get("text", "").strip()
+            if not text:
+                continue
+            if level == 1:
+                header_stack = [(1, text)]
+            else:
+                header_stack = [(lvl, h) for lvl, h in header_stack if lvl < level]
+                header_stack.append((level, text))
+            current_section = "#" * level + f" {text}\n"
+            continue
+        
+        # ---- Handle text elements ----
+        elif etype == "text":
+            current_section += element.get("text", "") + "\n"
+        
+        # ---- Handle table elements ----
+        elif etype == "table":
+            table_body = element.get("table_body", "")
+            process_current_section(table_to_markdown(table_body))
+
+        # ---- Handle image elements ----
+        elif etype == "image":
+            print("Image encountered; skipping for now.")
+        
+        else:
+            logger.warning(f"Unknown element type: {etype}")
+    
+    # Save any remaining section
+    process_current_section(current_section)
+
+    yield from sections
+
+
+def _load_struct(text: str) -> Optional[List[Dict]]:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        logger.warning(f"Skipping ill-formed text: {text[:50]}")
+        return None
+
+
+def _splitter_spec(splitter: NodeParser) -> Tuple[type, Dict]:
+    """Class and constructor arguments of a splitter (its callables do not pickle)."""
+    kwargs = splitter.model_dump(exclude={"id_func", "callback_manager"})
+    kwargs.pop("class_name", None)
+    return type(splitter), kwargs
+
+
+def _extract_sections_worker(args) -> Optional[List[Tuple[str, str]]]:
+    struct_out, text, header_path_separator = args
+    if struct_out is None:
+        struct_out = _load_struct(text)
+        if struct_out is None:
+            return None
+    return extract_sections(struct_out, header_path_separator)
+
+
+def _split_sections_worker(args) -> List[List[str]]:
+    spec, texts = args
+    cls, kwargs = spec
+    key = json.dumps([cls.__module__, cls.__name__, kwargs], sort_keys=True, default=str)
+    if key not in _SPLITTERS:
+        _SPLITTERS[key] = cls(**kwargs)
+    splitter = _SPLITTERS[key]
+    return [splitter.split_text(text) for text in texts]
+
+
 class CustomParser(NodeParser):
     """
     Custom parser for MinerU structured output.
@@ -33,23 +165,44 @@ class CustomParser(NodeParser):
 
     Images are currently skipped.
 
+    The content list is read from each document's text as JSON, unless it is
+    passed in memory with `get_nodes_from_documents(docs, content_lists={doc_id: [...]})`.
+
+    With `num_workers` > 1, section extraction (JSON, tables to markdown) runs
+    per document and sentence splitting per batch of sections across worker
+    processes; nodes are then built in the parent in document and section
+    order, so the output matches the serial parse.
+
+    `iter_nodes_from_documents` yields the same nodes section by section, so
+    callers can store a long document without holding all of its nodes.
+
+    Node IDs are derived from the document ID, header path and chunk text
+    (see `chunk_id`), so re-parsing an unchanged section yields the same IDs.
+
     Args:
         include_metadata (bool): whether to include metadata in nodes
         include_prev_next_rel (bool): whether to include prev/next relationships
         header_path_separator (str): separator char used for section header path metadata
         chunk_size (int): size of text chunks
         chunk_overlap (int): overlap size between text chunks
+        num_workers (int): worker processes for parsing; 1 parses serially
+        splitter (str): text splitter backend from `splitters.SPLITTERS`;
+            "fast" swaps NLTK sentence splitting for a cached regex splitter
     """
 
     header_path_separator: str = Field(
         default="/", description="Separator char used for section header path metadata."
     )
 
-    text_splitter: SentenceSplitter = Field(
+    text_splitter: TextSplitter = Field(
         default_factory=SentenceSplitter, 
         description="The text splitter to use for long sections."
     )
 
+    num_workers: int = Field(
+        default=1, description="Worker processes used to parse documents; 1 parses serially."
+    )
+
     @classmethod
     def from_defaults(
         cls,
@@ -59,10 +212,13 @@ class CustomParser(NodeParser):
         callback_manager: Optional[CallbackManager] = None,
         chunk_size: int = 1024,
         chunk_overlap: int = 20,
+        num_workers: int = 1,
+        splitter: str = "sentence",
     ) -> "CustomParser":
         callback_manager = callback_manager or CallbackManager([])
         
-        text_splitter = SentenceSplitter(
+        text_splitter = make_splitter(
+            splitter,
             chunk_size=chunk_size, 
             chunk_overlap=chunk_overlap
         )
@@ -73,105 +229,149 @@ class CustomParser(NodeParser):
             header_path_separator=header_path_separator,
             callback_manager=callback_manager,
             text_splitter=text_splitter,
+            num_workers=num_workers,
         )
     
     def _parse_nodes(
         self,
         nodes: Sequence[BaseNode],
         show_progress: bool = True,
+        content_lists: Optional[Dict[str, List[Dict]]] = None,
         **kwargs: Any,
     ) -> List[BaseNode]:
+        content_lists = content_lists or {}
+        if self.num_workers > 1:
+            return self._parse_nodes_parallel(nodes, content_lists)
+
         all_nodes: List[BaseNode] = []
         nodes_with_progress = get_tqdm_iterable(nodes, show_progress, "Parsing nodes")
 
         for node in nodes_with_progress:
-            nodes = self.get_nodes_from_node(node)
+            nodes = self.get_nodes_from_node(node, content_lists.get(node.node_id))
             all_nodes.extend(nodes)
         
         return all_nodes
 
 
-    def get_nodes_from_node(self, node: BaseNode) -> List[TextNode]:
-        """Get nodes from a single BaseNode."""
-        try:
-            struct_out = json.loads(node.text)
-        except json.JSONDecodeError:
-            logger.warning(f"Skipping ill-formed text: {node.text[:50]}")
-            return []
-        
-        text_nodes: List[TextNode] = []
-        current_section = ""
-        header_stack: List[Tuple[int, str]] = []
+    def _parse_nodes_parallel(
+        self,
+        nodes: Sequence[BaseNode],
+        content_lists: Dict[str, List[Dict]]
+    ) -> List[BaseNode]:
+        """Fan documents, then batches of sections, out to a process pool."""
+        extract_args = [
+            (content_lists.get(node.node_id),
+             None if node.node_id in content_lists else node.text,
+             self.header_path_separator)
+            for node in nodes
+        ]
+        spec = _splitter_spec(self.text_splitter)
+
+        with ProcessPoolExecutor(max_workers=self.num_workers) as pool:
+            doc_sections = list(pool.map(_extract_sections_worker, extract_args))
+
+            # (node index, header path) per section, in order
+            index: List[Tuple[int, str]] = []
+            batches: List[List[str]] = [[]]
+            batch_chars = 0
+            for i, sections in enumerate(doc_sections):
+                for text, header_path in sections or []:
+                    if batches[-1] and batch_chars + len(text) > SECTION_BATCH_CHARS:
+                        batches.append([])
+                        batch_chars = 0
+                    batches[-1].append(text)
+                    batch_chars += len(text)
+                    index.append((i, header_path))
+
+            splits = [
+                section_splits
+                for batch_splits in pool.map(_split_sections_worker, [(spec, b) for b in batches])
+                for section_splits in batch_splits
+            ]
 
-        def process_current_section(current_section: str):
-            if not current_section.strip():
-               return ""
-            
-            header_path = self.header_path_separator.join(
-                [h for _, h in header_stack]
-            )
+        all_nodes: List[BaseNode] = []
+        seen: Dict[int, Counter] = defaultdict(Counter)
+        for (i, header_path), text_splits in zip(index, splits):
+            all_nodes.extend(self._build_nodes_from_splits(text_splits, nodes[i], header_path, seen[i]))
+        return all_nodes
 
-            text_splits = self.text_splitter.split_text(current_section.strip())
-            new_nodes = self._build_nodes_from_splits(
-                text_splits,
-                node,
-                header_path
-            )
-            text_nodes.extend(new_nodes)
-            
-            # reset buffer
-            return ""
 
-        for element in struct_out:
-            etype = element.get("type")
+    def get_nodes_from_node(
+        self,
+        node: BaseNode,
+        struct_out: Optional[List[Dict]] = None
+    ) -> List[TextNode]:
+        """Get nodes from a single BaseNode, or from its content list if given."""
+        return list(self.iter_nodes_from_node(node, struct_out))
 
-            # ---- Handle headers ----
-            if (etype == "text" and "text_level" in element 
-                and isinstance(element["text_level"], int)):
-                # Save the previous section before starting a new one
-                current_section = process_current_section(current_section)
-                
-                level = element["text_level"]
-                text = element.get("text", "").strip()
-                if not text:
-                    continue
-                if level == 1:
-                    header_stack = [(1, text)]
-                else:
-                    header_stack = [(lvl, h) for lvl, h in header_stack if lvl < level]
-                    header_stack.append((level, text))
-                current_section = "#" * level + f" {text}\n"
-                continue
-            
-            # ---- Handle text elements ----
-            elif etype == "text":
-                current_section += element.get("text", "") + "\n"
-            
-            # ---- Handle table elements ----
-            elif etype == "table":
-                table_body = element.get("table_body", "")
-                table_soup = BeautifulSoup(table_body, 'html.parser')
-                table_element = table_soup.find('table')
-                html_str = str(table_element)
-                markdown_output = md(
-                    html_str, 
-                    # Use a specific style for headings if needed, e.g., 'ATX'
-                    heading_style="ATX" 
-                )
-
-                process_current_section(markdown_output)
-
-            # ---- Handle image elements ----
-            elif etype == "image":
-                print("Image encountered; skipping for now.")
-            
-            else:
-                logger.warning(f"Unknown element type: {etype}")
-        
-        # Save any remaining section
-        process_current_section(current_section)
-        
-        return text_nodes
+
+    def iter_nodes_from_node(
+        self,
+        node: BaseNode,
+        struct_out: Optional[List[Dict]] = None
+    ) -> Iterator[TextNode]:
+        """`get_nodes_from_node`, yielding nodes section by section."""
+        if struct_out is None:
+            struct_out = _load_struct(node.text)
+            if struct_out is None:
+                return
+
+        seen: Counter = Counter()
+        for text, header_path in iter_sections(struct_out, self.header_path_separator):
+            text_splits = self.text_splitter.split_text(text)
+            yield from self._build_nodes_from_splits(text_splits, node, header_path, seen)
+
+
+    def iter_nodes_from_documents(
+        self,
+        documents: Iterable[Document],
+        content_lists: Optional[Dict[str, List[Dict]]] = None,
+    ) -> Iterator[BaseNode]:
+        """
+        Streaming `get_nodes_from_documents`: nodes are yielded section by
+        section, with the same metadata, character offsets and prev/next
+        relationships, while only one section's nodes are held in memory.
+
+        Each node is yielded once the next one exists (to link it), always
+        serially; `num_workers` only applies to `get_nodes_from_documents`.
+        """
+        content_lists = content_lists or {}
+        for doc in documents:
+            search_start = 0
+            prev: Optional[BaseNode] = None
+            for node in self.iter_nodes_from_node(doc, content_lists.get(doc.node_id)):
+                if prev is not None and self.include_prev_next_rel:
+                    prev.relationships[NodeRelationship.NEXT] = node.as_related_node_info()
+                search_start = self._postprocess_node(node, doc, search_start)
+                if prev is not None:
+                    if self.include_prev_next_rel:
+                        node.relationships[NodeRelationship.PREVIOUS] = prev.as_related_node_info()
+                    yield prev
+                prev = node
+            if prev is not None:
+                yield prev
+
+
+    def _postprocess_node(self, node: BaseNode, doc: Document, search_start: int) -> int:
+        """
+        `_postprocess_parsed_nodes` for one node of `doc` (prev/next links are
+        set by the caller). Returns where to search for the next node's text.
+        """
+        if doc.source_node is not None:
+            node.relationships[NodeRelationship.SOURCE] = doc.source_node
+
+        node_content = node.get_content(metadata_mode=MetadataMode.NONE)
+        start_char_idx = doc.text.find(node_content, search_start)
+        if start_char_idx >= 0 and isinstance(node, TextNode):
+            node.start_char_idx = start_char_idx
+            node.end_char_idx = start_char_idx + len(node_content)
+            search_start = start_char_idx + 1
+
+        if self.include_metadata:
+            node.metadata = {**doc.metadata, **node.metadata}
+            if node.source_node is not None:
+                node.metadata.update({**node.source_node.metadata, **node.metadata})
+        return search_start
     
 
     def _build_nodes_from_splits(
@@ -179,13 +379,24 @@ class CustomParser(NodeParser):
         text_splits: List[str],
         node: BaseNode,
         header_path: str,
+        seen: Optional[Counter] = None,
     ) -> List[TextNode]:
-        """Build nodes from a list of text splits."""
+        """
+        Build nodes from a list of text splits. `seen` counts the chunks
+        already built for this document, to number repeated chunks.
+        """
+        seen = Counter() if seen is None else seen
+        ids = []
+        for text in text_splits:
+            text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            ids.append(chunk_id(node.node_id, header_path, text_hash, seen[header_path, text_hash]))
+            seen[header_path, text_hash] += 1
+
         # Use LlamaIndex's utility to create nodes and handle prev/next relationships
         nodes = build_nodes_from_splits(
             text_splits, 
             node, 
-            id_func=self.id_func,
+            id_func=lambda i, _: ids[i],
         )
         
         if self.include_metadata:
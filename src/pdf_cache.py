@@ -0,0 +1,208 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import requests
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from src import http_client
+from src.locks import file_lock
+
+logger = logging.getLogger(__name__)
+
+PDF_CACHE_DIR = "cache/pdfs"
+INDEX_FILE = "index.json"
+CHUNK_SIZE = 1024 * 1024
+
+# Serializes index rewrites between threads of one process; the file lock
+# in `locks.file_lock` serializes them between processes
+_INDEX_LOCK = threading.Lock()
+
+
+class PdfCache:
+    """
+    Content-addressed cache of downloaded PDFs.
+
+    Files are streamed to disk in chunks and stored under their SHA-256
+    (`{root}/{sha[:2]}/{sha}.pdf`), with an index mapping each URL to its
+    hash and the ETag / Last-Modified validators of the response. A cached
+    URL is revalidated with a conditional request (304 reuses the file), and
+    an interrupted transfer is resumed with a Range request.
+
+    Usage:
+        cache = PdfCache()
+        path = cache.fetch(url)
+
+    Args:
+        root (str): cache directory
+        chunk_size (int): bytes read per streamed chunk
+        timeout (float): connect/read timeout in seconds
+        throttle (callable): called with the size of each received chunk,
+            e.g. to cap bandwidth (see prefetch.RateLimiter)
+    """
+    def __init__(
+            self,
+            root: str = PDF_CACHE_DIR,
+            chunk_size: int = CHUNK_SIZE,
+            timeout: float = 60,
+            throttle: Optional[Callable[[int], None]] = None
+        ):
+        self.root = Path(root)
+        self.partial_dir = self.root / "partial"
+        self.index_path = self.root / INDEX_FILE
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.throttle = throttle
+
+
+    def _load_index(self) -> Dict[str, Dict]:
+        if self.index_path.exists():
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {}
+
+
+    def _update_index(self, url: str, entry: Dict):
+        """Reload, update and atomically rewrite the index (workers share it)."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with _INDEX_LOCK, file_lock(str(self.index_path)):
+            index = self._load_index()
+            index[url] = entry
+            tmp_path = self.index_path.with_name(f"{INDEX_FILE}.{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(index, f, indent=2)
+            os.replace(tmp_path, self.index_path)
+
+
+    def path_for_hash(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / f"{sha256}.pdf"
+
+
+    def lookup(self, url: str) -> Optional[Path]:
+        """Cached file for a URL without any network request, or None."""
+        entry = self._load_index().get(url)
+        if entry:
+            path = self.path_for_hash(entry["sha256"])
+            if path.exists():
+                return path
+        return None
+
+
+    def content_hash(self, url: str) -> Optional[str]:
+        """SHA-256 of the cached file for a URL without any network request, or None."""
+        path = self.lookup(url)
+        return path.stem if path is not None else None
+
+
+    def content_length(self, url: str) -> Optional[int]:
+        """
+        Size of the PDF for `url` in bytes: from the cache if it is there,
+        else from the Content-Length of a HEAD request. None if unknown.
+        """
+        cached = self.lookup(url)
+        if cached is not None:
+            return cached.stat().st_size
+        try:
+            response = http_client.head(url, allow_redirects=True, timeout=10)
+            response.raise_for_status()
+            size = response.headers.get("Content-Length")
+            return int(size) if size else None
+        except (requests.RequestException, ValueError) as e:
+            logger.debug(f"Could not get size of {url}: {e}")
+            return None
+
+
+    def _partial_paths(self, url: str):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.partial_dir / f"{key}.part", self.partial_dir / f"{key}.json"
+
+
+    def fetch(self, url: str) -> Path:
+        """
+        Return the path of the cached PDF for `url`, downloading only if needed.
+
+        Workers fetching the same URL take turns on its partial file; the one
+        that waited revalidates the copy the other just cached.
+        """
+        part_path, part_meta_path = self._partial_paths(url)
+        with file_lock(str(part_path)):
+            return self._fetch(url, part_path, part_meta_path)
+
+
+    def _fetch(self, url: str, part_path: Path, part_meta_path: Path) -> Path:
+        entry = self._load_index().get(url)
+        cached = self.path_for_hash(entry["sha256"]) if entry else None
+
+        headers = {}
+        offset = 0
+        if cached is not None and cached.exists():
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        elif part_path.exists() and part_meta_path.exists():
+            part_meta = json.loads(part_meta_path.read_text())
+            validator = part_meta.get("etag") or part_meta.get("last_modified")
+            if validator:
+                offset = part_path.stat().st_size
+                headers["Range"] = f"bytes={offset}-"
+                headers["If-Range"] = validator
+
+        with http_client.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if response.status_code == 304:
+                logger.debug(f"Cache hit for {url} (not modified)")
+                return cached
+
+            response.raise_for_status()
+
+            if cached is not None and cached.exists() and not headers.get("Range"):
+                logger.info(f"{url} changed upstream; downloading new version.")
+
+            resume = response.status_code == 206 and offset > 0
+            validators = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+            self.partial_dir.mkdir(parents=True, exist_ok=True)
+            part_meta_path.write_text(json.dumps(validators))
+
+            sha = hashlib.sha256()
+            if resume:
+                logger.info(f"Resuming download of {url} at byte {offset}")
+                with open(part_path, "rb") as f:
+                    for chunk in iter(lambda: f.read(self.chunk_size), b""):
+                        sha.update(chunk)
+
+            expected = response.headers.get("Content-Length")
+            received = 0
+            with open(part_path, "ab" if resume else "wb") as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    if self.throttle is not None:
+                        self.throttle(len(chunk))
+                    f.write(chunk)
+                    sha.update(chunk)
+                    received += len(chunk)
+
+            if expected is not None and received < int(expected):
+                raise IOError(
+                    f"Incomplete download of {url}: {received} of {expected} bytes; will resume.")
+
+        digest = sha.hexdigest()
+        final_path = self.path_for_hash(digest)
+        if final_path.exists():
+            part_path.unlink()
+        else:
+            final_path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(part_path, final_path)
+        part_meta_path.unlink(missing_ok=True)
+
+        self._update_index(url, {
+            "sha256": digest,
+            "size": final_path.stat().st_size,
+            **validators,
+        })
+        logger.info(f"Cached {url} as {final_path}")
+        return final_path
@@ -1,70 +1,223 @@
 import logging
-from typing import Dict, List, Any
 import json
+import queue
+import threading
+from typing import Callable, Dict, Iterable, List, Any, Optional, Tuple
 from pathlib import Path
 
-import spacy
+from llama_index.core import Document
+from llama_index.core.schema import BaseNode
 from spacy.pipeline import EntityRuler
-from scispacy.abbreviation import AbbreviationDetector  # used to add "abbreviation_detector" in nlp pipeline
 
 from src.acronyms import AcronymExtractor
 from src.ner import EntityExtractor
 from src.linker import Wikifier 
 from src.reader import Reader
 from src.summarize import OllamaClient
-from src.storage import LlamaStorage
+from src.storage import LlamaStorage, _process_content_list, document_exists, get_document_nodes
 from src.parser import CustomParser
+from src.models import get_nlp
+from src.manifest import StageManifest, hash_obj, hash_text
+from src.metrics import StageRecorder
 
 logger = logging.getLogger(__name__)
 
+# Sentinel passed down the stage queues once the producer is exhausted
+_DONE = object()
+
+
 class IngestionPipeline:
-    def __init__(self, reader: Reader, parser: CustomParser):
+    """
+    Producer/consumer ingestion engine.
+
+    Documents flow through bounded queues between the stages:
+        download     Reader.read_fn                  (download_workers threads)
+        parse        Reader.parse_bytes (MinerU)     (parse_workers threads)
+        chunk_embed  parse into nodes + store        (one thread; writes the shared store)
+        annotate     DocumentPipeline.run            (annotate_workers threads)
+
+    The content list is handed from parse to chunk_embed in memory; whether
+    it is also written to disk follows the reader's `f_dump_content_list`.
+
+    Each queue holds at most `queue_size` documents, so a stage that falls
+    behind blocks the stages upstream of it (backpressure): downloads cannot
+    pile up more than `queue_size + parse_workers` PDFs in memory.
+
+    Args:
+        reader (Reader): downloads and parses PDFs
+        parser (CustomParser): splits parsed content lists into nodes
+        download_workers (int): concurrent downloads
+        parse_workers (int): concurrent MinerU parses
+        annotate_workers (int): concurrent annotation runs
+        queue_size (int): capacity of each inter-stage queue
+        annotate (callable): `annotate(doc_id) -> dict`; defaults to
+            DocumentPipeline(doc_id).run()
+        lang (str): document language passed to MinerU
+    """
+    def __init__(
+            self,
+            reader: Reader,
+            parser: CustomParser,
+            download_workers: int = 4,
+            parse_workers: int = 1,
+            annotate_workers: int = 1,
+            queue_size: int = 2,
+            annotate: Optional[Callable[[str], Dict]] = None,
+            lang: str = "English"
+        ):
         self.reader = reader
         self.parser = parser
         self.storage = LlamaStorage()
-    
-    def ingest_document(self, doc_id: str):
+        self.workers = {
+            "download": download_workers,
+            "parse": parse_workers,
+            "chunk_embed": 1,
+            "annotate": annotate_workers,
+        }
+        self.queue_size = queue_size
+        self.annotate = annotate or (lambda doc_id: DocumentPipeline(doc_id).run())
+        self.lang = lang
+
+        self._results: Dict[str, Dict] = {}
+        self._results_lock = threading.Lock()
+
+
+    def ingest_document(self, doc_id: str, url: str) -> bool:
         """
-        Orchestrates the flow for a single document.
+        Ingest a single document.
         Returns True if successful, False otherwise.
         """
-        if self._document_exists(doc_id):
-            logger.info(f"Document {doc_id} already exists in storage. Skipping ingestion.")
-            return True
-
-        try:
-            output_path: Path = self.reader.process_doc(doc_id)
-
-            if not output_path or not output_path.exists():
-                logger.error(f"Failed to process document {doc_id}. Output path invalid.")
-                return False
-        except:
-            pass
+        result = self.ingest([(doc_id, url)])[doc_id]
+        return result["status"] in ("ok", "skipped")
+
+
+    def ingest(self, documents: Iterable[Tuple[str, str]]) -> Dict[str, Dict]:
+        """
+        Ingest `(doc_id, url)` pairs and report the outcome per document:
+            {"status": "ok" | "skipped" | "failed", "stage": ..., "error": ..., "result": ...}
+        """
+        self._results = {}
+        stages = [
+            ("download", self._download),
+            ("parse", self._parse),
+            ("chunk_embed", self._chunk_embed),
+            ("annotate", self._annotate),
+        ]
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in stages]
+        threads = []
+
+        for i, (name, fn) in enumerate(stages):
+            inbox = queues[i]
+            outbox = queues[i + 1] if i + 1 < len(queues) else None
+            n_workers = self.workers[name]
+            next_workers = self.workers[stages[i + 1][0]] if outbox else 0
+            remaining = [n_workers]
+            lock = threading.Lock()
+
+            for _ in range(n_workers):
+                t = threading.Thread(
+                    target=self._stage_worker,
+                    args=(name, fn, inbox, outbox, remaining, lock, next_workers),
+                    name=f"ingest-{name}",
+                    daemon=True)
+                t.start()
+                threads.append(t)
+
+        # Producer: blocks when the download queue is full
+        for doc_id, url in documents:
+            doc_id = str(doc_id)
+            if self._document_exists(doc_id):
+                logger.info(f"Document {doc_id} already exists in storage. Skipping ingestion.")
+                self._set_result(doc_id, status="skipped")
+                continue
+            queues[0].put((doc_id, url))
+
+        for _ in range(self.workers["download"]):
+            queues[0].put(_DONE)
+
+        for t in threads:
+            t.join()
+
+        failed = [d for d, r in self._results.items() if r["status"] == "failed"]
+        logger.info(f"Ingested {len(self._results) - len(failed)} documents; {len(failed)} failed.")
+
+        return self._results
+
+
+    def _stage_worker(self, name, fn, inbox, outbox, remaining, lock, next_workers):
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                break
+
+            doc_id, payload = item
+            try:
+                output = fn(doc_id, payload)
+            except Exception as e:
+                logger.exception(f"Stage '{name}' failed for doc {doc_id}: {e}")
+                self._set_result(doc_id, status="failed", stage=name, error=str(e))
+                continue
+
+            if outbox is not None:
+                outbox.put((doc_id, output))  # blocks while the next stage is behind
+            else:
+                self._set_result(doc_id, status="ok", result=output)
+
+        # The last worker of a stage tells every worker of the next stage to stop
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last and outbox is not None:
+            for _ in range(next_workers):
+                outbox.put(_DONE)
+
+
+    def _set_result(self, doc_id: str, status: str, stage: Optional[str] = None,
+                    error: Optional[str] = None, result: Any = None):
+        with self._results_lock:
+            self._results[doc_id] = {
+                "status": status, "stage": stage, "error": error, "result": result}
+
+
+    def _download(self, doc_id: str, url: str) -> bytes:
+        return self.reader.read_fn(url)
+
+
+    def _parse(self, doc_id: str, pdf_bytes: bytes) -> List[Dict]:
+        return self.reader.parse_bytes(pdf_bytes, doc_id, self.lang, in_memory=True)
+
+
+    def _chunk_embed(self, doc_id: str, content_list: List[Dict]) -> str:
+        source = str(self.reader._content_list_path(doc_id))
+        _process_content_list(content_list, self.parser, kg_id=doc_id, source=source)
+        self.storage.persist()
+        return doc_id
+
+
+    def _annotate(self, doc_id: str, _) -> Dict:
+        return self.annotate(doc_id)
             
 
     def _document_exists(self, doc_id: str) -> bool:
         """
         Check if a document with the given doc_id already exists in storage.
         """
-        ref_doc_info = self.storage.context.docstore.get_ref_doc_info(doc_id)
-        ref_doc_exists = ref_doc_info is not None
-        return ref_doc_exists
+        return document_exists(doc_id)
 
 
 class DocumentPipeline:
-    def __init__(self, file_id: str, model: str = "en_core_web_sm"):
+    def __init__(self, file_id: str, model: str = "en_core_web_sm", recorder: Optional[StageRecorder] = None):
         self.file_id = file_id
-        self.nlp = spacy.load(model)
-        
-        # Add abbreviation detector
-        if "abbreviation_detector" not in self.nlp.pipe_names:
-            self.nlp.add_pipe("abbreviation_detector", first=True)
+        self.model = model
+        self.recorder = recorder or StageRecorder(file_id)
 
-        # Add entity ruler (after NER)
-        if "entity_ruler" not in self.nlp.pipe_names:
-            self.entity_ruler = self.nlp.add_pipe("entity_ruler", before="ner", config={"phrase_matcher_attr": "LOWER"})
-        else:
-            self.entity_ruler = self.nlp.get_pipe("entity_ruler")
+        # Shared, warm pipeline with abbreviation detector and UNBIS ruler attached
+        self.nlp = get_nlp(model)
+
+        # Document-specific acronym patterns go to a standalone ruler so they
+        # never leak into the shared pipeline
+        self.entity_ruler = EntityRuler(
+            self.nlp, name="acronym_ruler", phrase_matcher_attr="LOWER")
         
         self.acronym_extractor = AcronymExtractor(
             file_id, 
@@ -75,39 +228,226 @@ class DocumentPipeline:
         self.reader = Reader()  # TODO: use ArtifactStore from storage.py instead
 
 
-    def process(self, md_text: str) -> Dict[str, Any]:
+    def process(self, md_text: str, link: bool = True) -> Dict[str, Any]:
         logger.info("Processing document...")
         
-        doc = self.nlp(md_text)
+        doc = self._run_nlp(md_text)
         
-        # Get and add acronyms
-        acronyms = self.acronym_extractor.extract(doc)
+        acronyms = self._extract_acronyms(doc)
+        entities = self._extract_entities(doc, acronyms)
+        if not link:
+            return acronyms, entities
+
+        cleaned_entities = self._link_entities(entities)
+
+        return acronyms, cleaned_entities
+
+
+    def _run_nlp(self, md_text: str):
+        with self.recorder.stage("spacy", items_in=len(md_text)) as rec:
+            doc = self.nlp(md_text)
+            rec["items_out"] = len(doc)
+        return doc
+
+
+    def _extract_acronyms(self, doc) -> Dict[str, str]:
+        with self.recorder.stage("acronym_llm", items_in=len(doc)) as rec:
+            acronyms = self.acronym_extractor.extract(doc)
+            rec["items_out"] = len(acronyms)
         logger.info(f"Extracted {len(acronyms)} acronyms: {list(acronyms.keys())}")
+        return acronyms
 
-        self.entity_extractor.add_acronym_patterns(acronyms)
 
-        # Read and add UNBIS patterns
-        with open('cache/unbis_vocab.json', 'r', encoding='utf-8') as f:
-            unbis_terms = json.loads(f.read())
-        self.entity_extractor.add_unbis_patterns(unbis_terms)
+    def _extract_entities(self, doc, acronyms: Dict[str, str]) -> List[Dict]:
+        with self.recorder.stage("entity_ruler", items_in=len(acronyms)) as rec:
+            self.entity_extractor.add_acronym_patterns(acronyms)
 
-        # Apply the EntityRuler to the doc
-        doc = self.entity_extractor.apply_entity_ruler(self.entity_ruler, doc)
+            # Apply the acronym EntityRuler to the doc
+            doc = self.entity_extractor.apply_entity_ruler(self.entity_ruler, doc)
 
-        entities = self.entity_extractor.collect_entities(doc)
+            entities = self.entity_extractor.collect_entities(doc)
+            rec["items_out"] = len(entities)
         logger.info(f"Collected {len(entities)} total entities.")
+        return entities
+
+
+    def _link_entities(self, entities: List[Dict]) -> List[Dict]:
+        with self.recorder.stage("wikifier", items_in=len(entities)) as rec:
+            wikifier = Wikifier()
+            linked_entities = wikifier.wikify(entities)
+            cleaned = self.entity_extractor._normalize_entities(linked_entities)
+            rec["items_out"] = len(cleaned)
+
+        return cleaned
+
+
+    def _stream_entities(self, chunks: List[BaseNode], batch_size: int = 32) -> Tuple[Dict, List[Dict]]:
+        """
+        Single bounded-memory pass over the chunks with `nlp.pipe`.
+
+        Acronyms from the acronym section are added to the EntityRuler before
+        the pass; inline acronyms are added as they are detected, so they match
+        in their defining chunk and every later chunk. Each Doc is discarded
+        once its acronyms and entity mentions have been collected.
+
+        Returns the merged acronyms and the entity mentions with their chunk
+        ID and character offsets within the chunk.
+        """
+        with self.recorder.stage("acronym_llm") as rec:
+            primary_acronyms = self.acronym_extractor.extract_primary()
+            rec["items_out"] = len(primary_acronyms)
+        self.entity_ruler.add_patterns(
+            self.entity_extractor.add_acronym_patterns(primary_acronyms))
+
+        inline_acronyms: Dict[str, str] = {}
+        mentions: List[Dict] = []
+
+        # spaCy, inline acronyms and the ruler are interleaved per chunk, so
+        # the pass is recorded as one stage
+        with self.recorder.stage("spacy_stream", items_in=len(chunks)) as rec:
+            texts = (chunk.get_content() for chunk in chunks)
+            for chunk, doc in zip(chunks, self.nlp.pipe(texts, batch_size=batch_size)):
+                found = self.acronym_extractor._extract_inline_acronyms(doc)
+                new_acronyms = {
+                    abbr: defn for abbr, defn in found.items()
+                    if abbr not in primary_acronyms and abbr not in inline_acronyms
+                }
+                inline_acronyms.update(found)
+                if new_acronyms:
+                    self.entity_ruler.add_patterns(
+                        self.entity_extractor.add_acronym_patterns(new_acronyms))
+
+                doc = self.entity_ruler(doc)
+                mentions.extend(self.entity_extractor.collect_mentions(doc, chunk.node_id))
+            rec["items_out"] = len(mentions)
+
+        acronyms = self.acronym_extractor.merge(primary_acronyms, inline_acronyms)
+        logger.info(f"Extracted {len(acronyms)} acronyms: {list(acronyms.keys())}")
+        logger.info(f"Collected {len(mentions)} entity mentions from {len(chunks)} chunks.")
+
+        return acronyms, mentions
+
+
+    @staticmethod
+    def _entities_from_mentions(mentions: List[Dict]) -> List[Dict]:
+        return [{k: m[k] for k in ("surface", "label", "id", "qid")} for m in mentions]
+
+
+    def process_chunks(self, chunks: List[BaseNode], batch_size: int = 32, link: bool = True):
+        """
+        Streaming alternative to `process` that runs NER chunk by chunk instead
+        of on the whole markdown, avoiding spaCy's max_length and the memory
+        of one document-sized Doc.
+        """
+        logger.info(f"Processing document in {len(chunks)} chunks...")
 
-        wikifier = Wikifier()
-        linked_entities = wikifier.wikify(entities)
+        acronyms, mentions = self._stream_entities(chunks, batch_size=batch_size)
+        entities = self._entities_from_mentions(mentions)
+        cleaned_entities = self._link_entities(entities) if link else entities
 
-        cleaned_entities = self.entity_extractor._normalize_entities(linked_entities)
+        return acronyms, cleaned_entities, mentions
+
+
+    def _process_chunks_with_manifest(
+            self, chunks: List[BaseNode], manifest: StageManifest, batch_size: int = 32, link: bool = True):
+        """Same as `process_chunks`, skipping stages that are current in the manifest."""
+        chunks_hash = hash_obj([chunk.get_content() for chunk in chunks])
+        stream_input = hash_obj([chunks_hash, self.model, manifest.output_hash("chunk_embed")])
+
+        acronyms = manifest.load_output("acronyms", stream_input)
+        mentions = manifest.load_output("ner", stream_input)
+        if acronyms is None or mentions is None:
+            acronyms, mentions = self._stream_entities(chunks, batch_size=batch_size)
+            manifest.save_output("acronyms", stream_input, acronyms)
+            manifest.save_output("ner", stream_input, mentions)
+
+        entities = self._entities_from_mentions(mentions)
+        if not link:
+            return acronyms, entities, mentions
+
+        linking_input = hash_obj(entities)
+        cleaned_entities = manifest.load_output("linking", linking_input)
+        if cleaned_entities is None:
+            cleaned_entities = self._link_entities(entities)
+            manifest.save_output("linking", linking_input, cleaned_entities)
+
+        return acronyms, cleaned_entities, mentions
+
+
+    def _load_chunks(self) -> List[BaseNode]:
+        """Chunks from the docstore, or freshly parsed from the content list."""
+        chunks = get_document_nodes(self.file_id)
+        if chunks:
+            return chunks
+
+        logger.info(f"No stored chunks for doc {self.file_id}; parsing content list.")
+        content_list = self.reader.get_json(self.file_id)
+        doc = Document(text=json.dumps(content_list, ensure_ascii=False), doc_id=self.file_id)
+        parser = CustomParser(include_metadata=True, include_prev_next_rel=True)
+        return parser.get_nodes_from_documents([doc])
+
+
+    def _process_with_manifest(self, md_text: str, manifest: StageManifest, link: bool = True):
+        """
+        Same as `process`, but each stage (acronyms, NER, linking) is skipped
+        when the manifest shows it already ran on identical inputs.
+        """
+        md_hash = hash_text(md_text)
+        doc = None
+
+        # Acronyms also depend on the stored chunks (acronym section retrieval)
+        acronyms_input = hash_obj([md_hash, manifest.output_hash("chunk_embed")])
+        acronyms = manifest.load_output("acronyms", acronyms_input)
+        if acronyms is None:
+            doc = self._run_nlp(md_text)
+            acronyms = self._extract_acronyms(doc)
+            manifest.save_output("acronyms", acronyms_input, acronyms)
+
+        ner_input = hash_obj([md_hash, self.model, acronyms])
+        entities = manifest.load_output("ner", ner_input)
+        if entities is None:
+            doc = doc if doc is not None else self._run_nlp(md_text)
+            entities = self._extract_entities(doc, acronyms)
+            manifest.save_output("ner", ner_input, entities)
+
+        if not link:
+            return acronyms, entities
+
+        linking_input = hash_obj(entities)
+        cleaned_entities = manifest.load_output("linking", linking_input)
+        if cleaned_entities is None:
+            cleaned_entities = self._link_entities(entities)
+            manifest.save_output("linking", linking_input, cleaned_entities)
 
         return acronyms, cleaned_entities
     
 
-    def run(self):
+    def run(self, manifest: Optional[StageManifest] = None, streaming: bool = False, link: bool = True):
+        """
+        Run acronym extraction, NER and (unless `link` is False) Wikidata
+        linking. With `link=False` the entities are returned unlinked so the
+        network-bound linking can be scheduled separately.
+        """
+        if streaming:
+            chunks = self._load_chunks()
+            if manifest is None:
+                acronyms, entities, mentions = self.process_chunks(chunks, link=link)
+            else:
+                acronyms, entities, mentions = self._process_chunks_with_manifest(
+                    chunks, manifest, link=link)
+
+            return {
+                "doc_id": self.file_id,
+                "acronyms": acronyms,
+                "entities": entities,
+                "mentions": mentions,
+            }
+
         md_text = self.reader.get_markdown(self.file_id)
-        acronyms, entities = self.process(md_text)
+        if manifest is None:
+            acronyms, entities = self.process(md_text, link=link)
+        else:
+            acronyms, entities = self._process_with_manifest(md_text, manifest, link=link)
 
         return {
             "doc_id": self.file_id,
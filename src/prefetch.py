@@ -0,0 +1,144 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from src.metrics import StageRecorder
+from src.pdf_cache import PDF_CACHE_DIR, PdfCache
+
+logger = logging.getLogger(__name__)
+
+# Log a progress line at most this often
+PROGRESS_INTERVAL = 10  # seconds
+
+
+class RateLimiter:
+    """
+    Token bucket shared by download threads: `consume(n)` blocks until `n`
+    bytes fit under `bytes_per_s` (bursts of up to one second of budget).
+    """
+    def __init__(self, bytes_per_s: float):
+        self.bytes_per_s = bytes_per_s
+        self._tokens = bytes_per_s
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+
+    def consume(self, n: int):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.bytes_per_s, self._tokens + (now - self._last) * self.bytes_per_s)
+            self._last = now
+            self._tokens -= n
+            deficit = -self._tokens
+        if deficit > 0:
+            time.sleep(deficit / self.bytes_per_s)
+
+
+class Prefetcher:
+    """
+    Downloads PDFs into the PDF cache on a pool of threads, ahead of the
+    parse workers, so parsing never waits on the network.
+
+    At most `max_concurrency` downloads run at once, and `max_bytes_per_s`
+    (if set) caps their combined bandwidth. Progress (documents, bytes and
+    throughput) is logged every PROGRESS_INTERVAL seconds and available from
+    `progress()`.
+
+    Usage:
+        with Prefetcher(max_concurrency=4) as prefetcher:
+            future = prefetcher.submit(url, doc_id)
+            path = future.result()
+
+    Args:
+        cache_dir (str): PDF cache directory
+        max_concurrency (int): concurrent downloads
+        max_bytes_per_s (float): bandwidth cap across all downloads
+    """
+    def __init__(
+            self,
+            cache_dir: str = PDF_CACHE_DIR,
+            max_concurrency: int = 4,
+            max_bytes_per_s: Optional[float] = None
+        ):
+        limiter = RateLimiter(max_bytes_per_s) if max_bytes_per_s else None
+        self.cache = PdfCache(root=cache_dir, throttle=limiter.consume if limiter else None)
+        self.max_concurrency = max_concurrency
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._stats = {"submitted": 0, "done": 0, "failed": 0, "bytes": 0}
+        self._started = time.monotonic()
+        self._last_log = 0.0
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+        self._log_progress(force=True)
+
+
+    def submit(self, url: str, doc_id: Optional[str] = None) -> Future:
+        """Queue a download; the future resolves to the cached path."""
+        with self._lock:
+            self._stats["submitted"] += 1
+        return self._pool.submit(self._fetch, url, doc_id or url)
+
+
+    def prefetch(self, docs: Iterable[Tuple[str, str]]) -> Dict[str, Optional[Path]]:
+        """Download (doc_id, url) pairs and wait; failed downloads map to None."""
+        futures = {doc_id: self.submit(url, doc_id) for doc_id, url in docs}
+        paths = {}
+        for doc_id, future in futures.items():
+            try:
+                paths[doc_id] = future.result()
+            except Exception:
+                paths[doc_id] = None
+        return paths
+
+
+    def _fetch(self, url: str, doc_id: str) -> Path:
+        try:
+            with StageRecorder(doc_id).stage("download", items_in=1) as rec:
+                path = self.cache.fetch(url)
+                rec["items_out"] = 1
+        except Exception as e:
+            logger.warning(f"Prefetch of doc {doc_id} from {url} failed: {e}")
+            with self._lock:
+                self._stats["failed"] += 1
+            raise
+
+        with self._lock:
+            self._stats["done"] += 1
+            self._stats["bytes"] += path.stat().st_size
+        self._log_progress()
+        return path
+
+
+    def progress(self) -> Dict:
+        """Documents submitted/done/failed, bytes cached and MB/s so far."""
+        with self._lock:
+            stats = dict(self._stats)
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        stats["mb_per_s"] = round(stats["bytes"] / elapsed / 1e6, 2)
+        return stats
+
+
+    def _log_progress(self, force: bool = False):
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_log < PROGRESS_INTERVAL:
+                return
+            self._last_log = now
+        stats = self.progress()
+        logger.info(
+            f"Prefetched {stats['done']}/{stats['submitted']} PDFs "
+            f"({stats['failed']} failed, {stats['bytes'] / 1e6:.1f} MB, {stats['mb_per_s']} MB/s)")
@@ -1,32 +1,132 @@
 import json
+import logging
 from pathlib import Path
-import requests
+from typing import Dict, List, Tuple
 
-from src.mineru_demo import do_parse
+from src.mineru_demo import do_parse, render_debug_artifacts
+from src.pdf_cache import PDF_CACHE_DIR, PdfCache
+from src import shards, text_layer
+
+logger = logging.getLogger(__name__)
 
 LANGUAGES = {
     'English': 'en'
 }
 
+# do_parse output flags. "production" writes only a compact content list,
+# markdown and a compact middle JSON (from which the bbox/origin PDFs can be
+# regenerated with Reader.render_debug_artifacts); "debug" keeps MinerU's defaults.
+OUTPUT_PROFILES = {
+    "production": {
+        "f_draw_layout_bbox": False,
+        "f_draw_span_bbox": False,
+        "f_dump_orig_pdf": False,
+        "f_dump_model_output": False,
+        "f_dump_middle_json": True,
+        "f_dump_md": True,
+        "f_dump_content_list": True,
+        "f_compact_json": True,
+    },
+    "debug": {},
+}
+
+# Limits for one batched do_parse call
+MAX_BATCH_DOCS = 8
+MAX_BATCH_BYTES = 150 * 1024 * 1024
+
 class Reader:
-    def __init__(self, output_dir='output', **kwargs):
+    """
+    Downloads PDFs (through the PDF cache) and parses them with MinerU.
+
+    Args:
+        output_dir (str): MinerU output root
+        cache_dir (str): PDF cache directory
+        shard_pages (int): if set, PDFs longer than this are parsed as page-range
+            shards in parallel processes and stitched back together
+        shard_workers (int): processes used for sharded parsing
+        text_layer (bool): route born-digital PDFs (per `text_layer.preflight`)
+            to the lightweight text-layer extractor instead of MinerU
+        output_profile (str): key of OUTPUT_PROFILES applied before `kwargs`
+        revalidate (bool): revalidate cached PDFs with the server; set to False
+            when a prefetch stage has just downloaded them
+        **kwargs: passed to `do_parse`
+    """
+    def __init__(
+            self,
+            output_dir='output',
+            cache_dir=PDF_CACHE_DIR,
+            shard_pages=None,
+            shard_workers=2,
+            text_layer=False,
+            output_profile=None,
+            revalidate=True,
+            **kwargs
+        ):
         self.output_dir = output_dir
-        self.kwargs = kwargs
+        self.cache = PdfCache(root=cache_dir)
+        self.shard_pages = shard_pages
+        self.shard_workers = shard_workers
+        self.text_layer = text_layer
+        self.revalidate = revalidate
+        self.kwargs = {**OUTPUT_PROFILES.get(output_profile or "debug", {}), **kwargs}
+
+
+    def _is_born_digital(self, file_bytes, file_id) -> bool:
+        if not self.text_layer:
+            return False
+        stats = text_layer.preflight(file_bytes)
+        route = "text layer" if stats["born_digital"] else "MinerU"
+        logger.info(f"Preflight for doc {file_id}: {stats}; parsing with {route}.")
+        return stats["born_digital"]
+
+
+    def download(self, url) -> Path:
+        """Stream the PDF into the local cache (if not already there) and return its path."""
+        if not self.revalidate:
+            cached = self.cache.lookup(url)
+            if cached is not None:
+                return cached
+        return self.cache.fetch(url)
 
 
     def read_fn(self, url):
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
-        return response.content
+        return self.download(url).read_bytes()
 
 
-    def process_doc(self, url, file_id, lang):
-        pdf_file_names = [str(file_id)]
+    def process_doc(self, url, file_id, lang, in_memory=False):
         file_bytes = self.read_fn(url)
+        return self.parse_bytes(file_bytes, file_id, lang, in_memory=in_memory)
+
+
+    def parse_bytes(self, file_bytes, file_id, lang, in_memory=False):
+        """
+        Parse already downloaded PDF bytes with MinerU.
+
+        Returns the content list path, or with `in_memory` the content list
+        itself, which is then only written to disk if `f_dump_content_list`
+        is set.
+        """
+        persist = not in_memory or self.kwargs.get("f_dump_content_list", True)
+
+        if self._is_born_digital(file_bytes, file_id):
+            content_list = text_layer.extract_content_list(file_bytes)
+            path = text_layer.write_outputs(
+                content_list, file_id, self.output_dir,
+                dump_content_list=persist, dump_md=self.kwargs.get("f_dump_md", True),
+                compact_json=self.kwargs.get("f_compact_json", False))
+            return content_list if in_memory else path
+
+        if self.shard_pages and shards.page_count(file_bytes) > self.shard_pages:
+            return shards.parse_sharded(
+                file_bytes, file_id, self.output_dir, LANGUAGES.get(lang, 'en'),
+                shard_pages=self.shard_pages, workers=self.shard_workers,
+                parse_kwargs=self.kwargs, in_memory=in_memory)
+
+        pdf_file_names = [str(file_id)]
         pdf_bytes_list = [file_bytes]
         p_lang_list = [LANGUAGES.get(lang, 'en')]
 
-        do_parse(
+        content_lists = do_parse(
             output_dir=self.output_dir,
             pdf_file_names=pdf_file_names,
             pdf_bytes_list=pdf_bytes_list,
@@ -34,7 +134,95 @@ class Reader:
             **self.kwargs
         )
 
-        return Path(f'output/{file_id}/auto/{file_id}_content_list.json')
+        return content_lists[str(file_id)] if in_memory else self._content_list_path(file_id)
+
+    
+    def process_docs(
+            self,
+            docs: List[Tuple[str, str]],
+            lang: str,
+            max_batch_docs: int = MAX_BATCH_DOCS,
+            max_batch_bytes: int = MAX_BATCH_BYTES
+        ) -> Dict[str, Path]:
+        """
+        Download and parse many PDFs, sharing MinerU model setup and layout/OCR
+        inference batches across documents. Born-digital PDFs take the
+        text-layer path instead when `text_layer` is enabled.
+
+        PDFs are sorted by size and grouped into batches of similar size (at
+        most `max_batch_docs` files and `max_batch_bytes` bytes), each parsed
+        in a single `do_parse` call. If a batch fails, its documents are
+        retried one by one so a single bad PDF does not sink the others.
+
+        Args:
+            docs (list): (url, file_id) pairs
+            lang (str): document language
+
+        Returns:
+            dict: file_id -> content list path; documents that failed are missing
+        """
+        outputs = {}
+        downloaded = []
+        for url, file_id in docs:
+            try:
+                file_bytes = self.read_fn(url)
+                if self._is_born_digital(file_bytes, file_id):
+                    outputs[str(file_id)] = text_layer.parse_text_layer(
+                        file_bytes, file_id, self.output_dir,
+                        compact_json=self.kwargs.get("f_compact_json", False))
+                else:
+                    downloaded.append((str(file_id), file_bytes))
+            except Exception as e:
+                logger.error(f"Failed to download or parse doc {file_id} from {url}: {e}")
+
+        downloaded.sort(key=lambda item: len(item[1]))
+
+        batches, batch, batch_bytes = [], [], 0
+        for file_id, file_bytes in downloaded:
+            if batch and (len(batch) >= max_batch_docs or batch_bytes + len(file_bytes) > max_batch_bytes):
+                batches.append(batch)
+                batch, batch_bytes = [], 0
+            batch.append((file_id, file_bytes))
+            batch_bytes += len(file_bytes)
+        if batch:
+            batches.append(batch)
+
+        p_lang = LANGUAGES.get(lang, 'en')
+        for batch in batches:
+            try:
+                do_parse(
+                    output_dir=self.output_dir,
+                    pdf_file_names=[file_id for file_id, _ in batch],
+                    pdf_bytes_list=[file_bytes for _, file_bytes in batch],
+                    p_lang_list=[p_lang] * len(batch),
+                    **self.kwargs
+                )
+                for file_id, _ in batch:
+                    outputs[file_id] = self._content_list_path(file_id)
+                logger.info(f"Parsed batch of {len(batch)} documents.")
+
+            except Exception as e:
+                if len(batch) == 1:
+                    logger.error(f"Failed to parse doc {batch[0][0]}: {e}")
+                    continue
+                logger.warning(f"Batch of {len(batch)} documents failed ({e}); parsing one by one.")
+                for file_id, file_bytes in batch:
+                    try:
+                        outputs[file_id] = self.parse_bytes(file_bytes, file_id, lang)
+                    except Exception as e:
+                        logger.error(f"Failed to parse doc {file_id}: {e}")
+
+        return outputs
+
+
+    def render_debug_artifacts(self, url, file_id):
+        """Regenerate bbox and origin PDFs for a document parsed with the production profile."""
+        local_md_dir = self._content_list_path(file_id).parent
+        render_debug_artifacts(str(local_md_dir), str(file_id), self.read_fn(url))
+
+
+    def _content_list_path(self, file_id):
+        return Path(f'{self.output_dir}/{file_id}/auto/{file_id}_content_list.json')
 
     
     def get_markdown(self, file_id):
@@ -45,7 +233,7 @@ class Reader:
 
 
     def get_json(self, file_id):
-        json_file_path = Path(f'{self.output_dir}/{file_id}/auto/{file_id}_content_list.json')
+        json_file_path = self._content_list_path(file_id)
         with open(json_file_path, "r", encoding="utf-8") as f:
             return json.load(f)
 
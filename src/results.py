@@ -0,0 +1,129 @@
+import logging
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import srsly
+
+from src.manifest import hash_obj
+
+logger = logging.getLogger(__name__)
+
+RESULTS_DIR = "output/results"
+INDEX_FILE = "index.msgpack"
+
+# Leading columns per record type (as `Wikifier.wikify` and
+# `EntityExtractor._normalize_entities` write them); any other keys in the
+# records follow, and keys a record lacks are stored as None
+ENTITY_COLUMNS = ("surface", "label", "sparql_safe", "qid", "rdf_safe")
+MENTION_COLUMNS = ("surface", "label", "id", "qid", "chunk_id", "start_char", "end_char")
+
+
+def _to_columns(rows: List[Dict], columns: Iterable[str]) -> Dict[str, List]:
+    columns = list(dict.fromkeys([*columns, *(key for row in rows for key in row)]))
+    return {col: [row.get(col) for row in rows] for col in columns}
+
+
+def _from_columns(data: Dict[str, List]) -> List[Dict]:
+    if not data:
+        return []
+    cols = list(data)
+    return [dict(zip(cols, values)) for values in zip(*(data[c] for c in cols))]
+
+
+class ResultsStore:
+    """
+    Per-document NLP results (acronyms, entities and mentions) stored as
+    column-oriented msgpack files, plus a corpus-level index.
+
+    Layout:
+        {root}/{doc_id}.msgpack   one file per document
+        {root}/index.msgpack      doc_id -> file, record counts, hash, updated_at
+
+    Later stages (relinking, re-annotation, KG rebuilds) can read the index
+    and load many documents' entities without parsing JSON.
+
+    Args:
+        root (str): directory of the store
+    """
+    def __init__(self, root: str = RESULTS_DIR):
+        self.root = Path(root)
+        self.index_path = self.root / INDEX_FILE
+        self.index: Dict[str, Dict] = self._load_index()
+
+
+    def _load_index(self) -> Dict[str, Dict]:
+        if self.index_path.exists():
+            return srsly.read_msgpack(self.index_path)
+        return {}
+
+
+    def _write_atomic(self, path: Path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        srsly.write_msgpack(tmp_path, data)
+        os.replace(tmp_path, path)
+
+
+    def path(self, doc_id: str) -> Path:
+        return self.root / f"{doc_id}.msgpack"
+
+
+    def write(self, doc_id: str, results: Dict) -> Path:
+        """Store one document's results and update the corpus index."""
+        doc_id = str(doc_id)
+        acronyms = results.get("acronyms") or {}
+        entities = results.get("entities") or []
+        mentions = results.get("mentions") or []
+
+        data = {
+            "doc_id": doc_id,
+            "acronyms": {"abbr": list(acronyms), "expansion": list(acronyms.values())},
+            "entities": _to_columns(entities, ENTITY_COLUMNS),
+            "mentions": _to_columns(mentions, MENTION_COLUMNS),
+        }
+        path = self.path(doc_id)
+        self._write_atomic(path, data)
+
+        self.index = self._load_index()
+        self.index[doc_id] = {
+            "file": path.name,
+            "n_acronyms": len(acronyms),
+            "n_entities": len(entities),
+            "n_mentions": len(mentions),
+            "hash": hash_obj([acronyms, entities, mentions]),
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+        self._write_atomic(self.index_path, self.index)
+
+        logger.info(f"Saved results for doc {doc_id} to {path}")
+        return path
+
+
+    def read(self, doc_id: str) -> Optional[Dict]:
+        """Load one document's results in the pipeline's row format, or None."""
+        path = self.path(doc_id)
+        if not path.exists():
+            return None
+
+        data = srsly.read_msgpack(path)
+        acronyms = data["acronyms"]
+        return {
+            "doc_id": data["doc_id"],
+            "acronyms": dict(zip(acronyms["abbr"], acronyms["expansion"])),
+            "entities": _from_columns(data["entities"]),
+            "mentions": _from_columns(data["mentions"]),
+        }
+
+
+    def iter_entities(self, doc_ids: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+        """Yield entities of the given (default: all indexed) documents with their doc_id."""
+        for doc_id in (doc_ids if doc_ids is not None else list(self.index)):
+            results = self.read(doc_id)
+            if results is None:
+                logger.warning(f"No stored results for doc {doc_id}")
+                continue
+            for ent in results["entities"]:
+                ent["doc_id"] = results["doc_id"]
+                yield ent
@@ -0,0 +1,184 @@
+import json
+import logging
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+import pypdfium2 as pdfium
+
+from src import threads
+from src.mineru_demo import _write_json_compact, do_parse
+
+logger = logging.getLogger(__name__)
+
+SHARD_DIR = "shards"
+PARSE_METHOD = "auto"
+
+# A paragraph cut at a shard boundary ends without closing punctuation
+_OPEN_END = re.compile(r"[^.!?:;)\]\"']\s*$")
+
+
+def page_count(pdf_bytes: bytes) -> int:
+    pdf = pdfium.PdfDocument(pdf_bytes)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def shard_ranges(n_pages: int, shard_pages: int) -> List[Tuple[int, int]]:
+    """Split `n_pages` into [start, end) page ranges of at most `shard_pages`."""
+    return [(start, min(start + shard_pages, n_pages)) for start in range(0, n_pages, shard_pages)]
+
+
+def parse_shard(
+        shard_root: str,
+        shard_name: str,
+        pdf_bytes: bytes,
+        p_lang: str,
+        start: int,
+        end: int,
+        parse_kwargs: Dict
+    ) -> Tuple[str, List[Dict]]:
+    """Worker: parse pages [start, end) of a PDF. Returns the shard's output dir and content list."""
+    content_lists = do_parse(
+        output_dir=shard_root,
+        pdf_file_names=[shard_name],
+        pdf_bytes_list=[pdf_bytes],
+        p_lang_list=[p_lang],
+        start_page_id=start,
+        end_page_id=end - 1,  # MinerU's end page is inclusive
+        **parse_kwargs
+    )
+    return str(Path(shard_root) / shard_name / PARSE_METHOD), content_lists[shard_name]
+
+
+def merge_content_lists(shards: List[Tuple[int, List[Dict]]]) -> List[Dict]:
+    """
+    Stitch per-shard content lists into one.
+
+    Page indices are shifted by each shard's first page. A paragraph that
+    MinerU could not merge across a shard boundary (the previous shard ends
+    mid-sentence and the next starts with a lowercase continuation) is
+    joined back together. Headers keep their `text_level`, so CustomParser
+    sees the same header sequence as for an unsharded parse.
+    """
+    merged: List[Dict] = []
+    for start, items in shards:
+        for i, item in enumerate(items):
+            item = dict(item)
+            item["page_idx"] = item.get("page_idx", 0) + start
+
+            prev = merged[-1] if merged else None
+            if (
+                i == 0 and prev is not None
+                and prev.get("type") == "text" and not prev.get("text_level")
+                and item.get("type") == "text" and not item.get("text_level")
+                and _OPEN_END.search(prev.get("text", ""))
+                and item.get("text", "")[:1].islower()
+            ):
+                prev["text"] = f"{prev['text'].rstrip()} {item['text'].lstrip()}"
+                continue
+
+            merged.append(item)
+    return merged
+
+
+def merge_middle_jsons(shards: List[Tuple[int, Dict]]) -> Dict:
+    """
+    Stitch per-shard MinerU middle JSONs into one for the whole PDF: the
+    `pdf_info` pages are concatenated with `page_idx` shifted by each
+    shard's first page, so the bbox/origin PDFs can be rendered from it
+    (`Reader.render_debug_artifacts`) as for an unsharded parse.
+    """
+    merged: Dict = {}
+    pages: List[Dict] = []
+    for start, middle_json in shards:
+        merged = {**middle_json, **merged}
+        for page in middle_json.get("pdf_info", []):
+            pages.append({**page, "page_idx": page.get("page_idx", 0) + start})
+    merged["pdf_info"] = pages
+    return merged
+
+
+def _write_json(path: Path, obj, compact: bool):
+    if compact:
+        _write_json_compact(path, obj)
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=4)
+
+
+def parse_sharded(
+        pdf_bytes: bytes,
+        file_id: str,
+        output_dir: str,
+        p_lang: str,
+        shard_pages: int,
+        workers: int,
+        parse_kwargs: Dict,
+        in_memory: bool = False
+    ) -> Union[Path, List[Dict]]:
+    """
+    Parse a PDF as page-range shards in separate processes and stitch the
+    content list, markdown and (if every shard wrote one) middle JSON into
+    the usual `{output_dir}/{file_id}/auto` layout. Returns the content list path, or with `in_memory` the merged
+    content list (then only written if `f_dump_content_list` is set).
+    """
+    file_id = str(file_id)
+    ranges = shard_ranges(page_count(pdf_bytes), shard_pages)
+    shard_root = Path(output_dir) / file_id / SHARD_DIR
+    logger.info(f"Parsing doc {file_id} as {len(ranges)} shards of up to {shard_pages} pages.")
+
+    # Shard processes split the thread budget of the worker that spawns them
+    workers = min(workers, len(ranges))
+    shard_threads = max(1, threads.current_threads() // workers)
+    with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=threads.init_worker,
+            initargs=(shard_threads, "shard")) as pool:
+        futures = [
+            pool.submit(
+                parse_shard, str(shard_root), f"{file_id}_{start}", pdf_bytes,
+                p_lang, start, end, parse_kwargs)
+            for start, end in ranges
+        ]
+        shard_results = [future.result() for future in futures]
+
+    out_dir = Path(output_dir) / file_id / PARSE_METHOD
+    (out_dir / "images").mkdir(parents=True, exist_ok=True)
+
+    content_lists = []
+    middle_jsons = []
+    markdown = []
+    for (start, _), (shard_dir, shard_content_list) in zip(ranges, shard_results):
+        shard_dir = Path(shard_dir)
+        shard_name = shard_dir.parent.name
+        content_lists.append((start, shard_content_list))
+
+        md_path = shard_dir / f"{shard_name}.md"
+        if md_path.exists():
+            markdown.append(md_path.read_text(encoding="utf-8").strip())
+
+        middle_path = shard_dir / f"{shard_name}_middle.json"
+        if middle_path.exists():
+            with open(middle_path, "r", encoding="utf-8") as f:
+                middle_jsons.append((start, json.load(f)))
+
+        # Image names are content hashes, so shards never collide
+        for image in (shard_dir / "images").glob("*"):
+            shutil.copy2(image, out_dir / "images" / image.name)
+
+    compact = parse_kwargs.get("f_compact_json", False)
+    content_list = merge_content_lists(content_lists)
+    content_list_path = out_dir / f"{file_id}_content_list.json"
+    if not in_memory or parse_kwargs.get("f_dump_content_list", True):
+        _write_json(content_list_path, content_list, compact)
+    (out_dir / f"{file_id}.md").write_text("\n\n".join(markdown), encoding="utf-8")
+    if len(middle_jsons) == len(ranges):
+        _write_json(out_dir / f"{file_id}_middle.json", merge_middle_jsons(middle_jsons), compact)
+
+    shutil.rmtree(shard_root, ignore_errors=True)
+    return content_list if in_memory else content_list_path
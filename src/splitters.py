@@ -0,0 +1,138 @@
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Type
+
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.callbacks.base import CallbackManager
+from llama_index.core.node_parser.interface import TextSplitter
+from llama_index.core.node_parser.text.sentence import (
+    CHUNKING_REGEX, DEFAULT_PARAGRAPH_SEP, SENTENCE_CHUNK_OVERLAP
+)
+from llama_index.core.constants import DEFAULT_CHUNK_SIZE
+from llama_index.core.text_splitter import SentenceSplitter
+
+# Token counts kept per splitter; sections repeat sentences (and overlap
+# re-counts them) far more often than this many distinct splits
+TOKEN_CACHE_SIZE = 65_536
+
+# Lowercased words that end with a period without ending the sentence,
+# common in World Bank project documents
+ABBREVIATIONS = frozenset({
+    "e.g", "i.e", "etc", "cf", "vs", "viz", "approx", "incl", "excl",
+    "vol", "fig", "figs", "pp",
+    "mr", "mrs", "dr", "prof", "jr", "sr", "govt", "dept", "corp", "inc", "ltd",
+    "jan", "feb", "apr", "jun", "jul", "aug", "sept", "oct", "nov", "dec",
+})
+
+# Abbreviations only when a number follows ("para. 3", not "the answer is no.")
+NUMBERED_ABBREVIATIONS = frozenset({"no", "nos", "para", "paras"})
+
+# Sentence-final punctuation, closing quotes/brackets, then whitespace
+_BOUNDARY = re.compile(r"(?P<punct>[.!?]+)[\"'”’)\]]*\s+")
+
+# Dotted acronym without its final period (U.S, i.e), not a decimal (2.5)
+_ACRONYM = re.compile(r"(?:[A-Za-z]\.)+[A-Za-z]")
+
+# Longer words are never abbreviations, so only this much text before a
+# period is inspected
+_MAX_ABBREVIATION = 12
+
+
+def split_sentences(
+        text: str,
+        abbreviations: frozenset = ABBREVIATIONS,
+        numbered_abbreviations: frozenset = NUMBERED_ABBREVIATIONS
+    ) -> List[str]:
+    """
+    Regex sentence splitter, a fast stand-in for NLTK Punkt in
+    SentenceSplitter. Like Punkt's spans, leading whitespace is dropped and
+    the whitespace after a sentence stays with it, so the sentences join
+    back into the text.
+
+    A period after a known abbreviation, a single-letter initial or inside
+    a dotted acronym (U.S.) does not end a sentence, nor does one after a
+    numbered abbreviation (para.) when a number follows.
+    """
+    start = len(text) - len(text.lstrip())
+    sentences = []
+    for match in _BOUNDARY.finditer(text, start):
+        end = match.start()
+        before = text[max(start, end - _MAX_ABBREVIATION):end].split()
+        word = before[-1].lstrip("([{\"'“‘").lower() if before else ""
+        if match.group("punct") == "." and (
+            word in abbreviations
+            or (len(word) == 1 and word.isalpha())
+            or _ACRONYM.fullmatch(word)
+            or (word in numbered_abbreviations and text[match.end():match.end() + 1].isdigit())
+        ):
+            continue
+        if match.end() < len(text):
+            sentences.append(text[start:match.end()])
+            start = match.end()
+    if start < len(text):
+        sentences.append(text[start:])
+    return sentences
+
+
+class FastSentenceSplitter(SentenceSplitter):
+    """
+    SentenceSplitter with a regex, abbreviation-aware sentence splitter
+    (`split_sentences`) instead of NLTK Punkt and an LRU cache over token
+    counts. Chunks are packed by SentenceSplitter's own merge, so sizes and
+    overlap follow the same rules; `scripts/benchmark_splitters.py` measures
+    throughput and chunk-boundary agreement against SentenceSplitter.
+    """
+
+    _token_count: Callable[[str], int] = PrivateAttr()
+
+    def __init__(
+        self,
+        separator: str = " ",
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        chunk_overlap: int = SENTENCE_CHUNK_OVERLAP,
+        tokenizer: Optional[Callable] = None,
+        paragraph_separator: str = DEFAULT_PARAGRAPH_SEP,
+        secondary_chunking_regex: Optional[str] = CHUNKING_REGEX,
+        callback_manager: Optional[CallbackManager] = None,
+        include_metadata: bool = True,
+        include_prev_next_rel: bool = True,
+        id_func: Optional[Callable] = None,
+    ):
+        super().__init__(
+            separator=separator,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            tokenizer=tokenizer,
+            paragraph_separator=paragraph_separator,
+            chunking_tokenizer_fn=split_sentences,
+            secondary_chunking_regex=secondary_chunking_regex,
+            callback_manager=callback_manager,
+            include_metadata=include_metadata,
+            include_prev_next_rel=include_prev_next_rel,
+            id_func=id_func,
+        )
+        tokenizer = self._tokenizer
+        self._token_count = lru_cache(maxsize=TOKEN_CACHE_SIZE)(lambda text: len(tokenizer(text)))
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "FastSentenceSplitter"
+
+    def _token_size(self, text: str) -> int:
+        return self._token_count(text)
+
+
+# Text splitter backends for CustomParser, by name
+SPLITTERS: Dict[str, Type[TextSplitter]] = {
+    "sentence": SentenceSplitter,
+    "fast": FastSentenceSplitter,
+}
+
+
+def make_splitter(name: str = "sentence", **kwargs) -> TextSplitter:
+    """Build the text splitter registered as `name` (see SPLITTERS)."""
+    try:
+        cls = SPLITTERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown splitter '{name}'; expected one of {sorted(SPLITTERS)}.")
+    return cls(**kwargs)
@@ -1,7 +1,9 @@
+import os
 import shutil
 import logging
 from pathlib import Path
-from typing import Dict, List
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
 import json
 import time
 
@@ -10,10 +12,12 @@ from dotenv import load_dotenv
 from llama_index.core import Document, StorageContext, VectorStoreIndex, load_index_from_storage
 from llama_index.core.schema import BaseNode
 from llama_index.core.storage.docstore import SimpleDocumentStore
+from llama_index.core.vector_stores.utils import metadata_dict_to_node, node_to_metadata_dict
 from llama_index.vector_stores.chroma import ChromaVectorStore
 from llama_index.core.schema import NodeRelationship, RelatedNodeInfo
 from rdflib import Graph, Namespace, RDF, Literal
 
+from src.manifest import StageManifest, hash_obj
 from src.parser import CustomParser
 
 logger = logging.getLogger(__name__)
@@ -24,6 +28,9 @@ STORAGE_DIR = Path("./storage")
 CHROMA_DIR = Path("./chroma_db")
 COLLECTION_NAME = "documents"
 
+# Chunks embedded and inserted per batch when storing a document
+INSERT_BATCH_SIZE = 256
+
 
 from llama_index.embeddings.ollama import OllamaEmbedding
 from llama_index.core import Settings
@@ -107,8 +114,6 @@ def _process_file(
         kg_id: str
     ) -> str:
     """Parse file into a Document + Nodes, index them, and add to storage."""
-    storage = LlamaStorage()
-
     raw_text = file_path.read_text(encoding="utf-8")
 
     # Create Document
@@ -118,19 +123,143 @@ def _process_file(
         doc_id=kg_id
     )
 
-    # Parse into TextNodes
-    nodes = parser.get_nodes_from_documents([doc])
+    # Parse into TextNodes, streamed into storage in batches
+    nodes = parser.iter_nodes_from_documents([doc])
+
+    return _store_nodes(doc, nodes)
+
+
+def _process_content_list(
+        content_list: List[Dict],
+        parser: CustomParser,
+        kg_id: str,
+        source: str = ""
+    ) -> str:
+    """
+    Like `_process_file`, but from a MinerU content list already in memory,
+    skipping the JSON write/read round trip. The stored Document carries only
+    the `source` path of the persisted content list (if any), not its text.
+    """
+    doc = Document(text="", metadata={"source": source}, doc_id=kg_id)
+    nodes = parser.iter_nodes_from_documents([doc], content_lists={kg_id: content_list})
+    return _store_nodes(doc, nodes)
 
-    for n in nodes:
-        n.relationships[NodeRelationship.SOURCE] = RelatedNodeInfo(node_id=doc.doc_id)
+
+def _store_nodes(
+        doc: Document,
+        nodes: Iterable[BaseNode],
+        batch_size: int = INSERT_BATCH_SIZE
+    ) -> str:
+    """
+    Add `doc` and its nodes to storage, or update a stored document to them,
+    embedding and inserting `batch_size` nodes at a time. With a node
+    generator (`CustomParser.iter_nodes_from_documents`) only one batch is
+    held in memory, however long the document.
+
+    Node IDs are content hashes (`parser.chunk_id`), so against the chunks
+    already stored for the document only new IDs are embedded and inserted,
+    IDs no longer produced are deleted, and unchanged chunks are left alone.
+    An unchanged chunk whose neighbours changed is re-inserted with its
+    stored embedding to update its prev/next links.
+    """
+    storage = LlamaStorage()
+    collection = storage.context.vector_store.client
+    stored = _stored_links(collection, doc.doc_id)
 
     # Store nodes documents and nodes in doc store
     storage.context.docstore.add_documents([doc])
-    storage.index.insert_nodes(nodes)
 
+    counts = {"added": 0, "relinked": 0, "unchanged": 0, "deleted": 0}
+    kept = set()
+    nodes = iter(nodes)
+    while batch := list(islice(nodes, batch_size)):
+        changed = []
+        relinked = {}
+        for n in batch:
+            n.relationships[NodeRelationship.SOURCE] = RelatedNodeInfo(node_id=doc.doc_id)
+            kept.add(n.node_id)
+            if n.node_id not in stored:
+                changed.append(n)
+            elif _links(n) != stored[n.node_id]:
+                relinked[n.node_id] = n
+            else:
+                counts["unchanged"] += 1
+
+        if relinked:
+            # Reuse stored embeddings rather than embedding the text again
+            old = collection.get(ids=list(relinked), include=["embeddings"])
+            for node_id, embedding in zip(old["ids"], old["embeddings"]):
+                relinked[node_id].embedding = [float(x) for x in embedding]
+            storage.index.delete_nodes(list(relinked))
+            changed.extend(relinked.values())
+
+        if changed:
+            storage.index.insert_nodes(changed)
+        counts["added"] += len(changed) - len(relinked)
+        counts["relinked"] += len(relinked)
+
+    stale = [node_id for node_id in stored if node_id not in kept]
+    if stale:
+        storage.index.delete_nodes(stale)
+    counts["deleted"] = len(stale)
+
+    if stored:
+        logger.info(f"Updated chunks of doc {doc.doc_id}: {counts}")
     return doc.doc_id
 
 
+def _stored_links(
+        collection,
+        doc_id: str,
+        page_size: int = INSERT_BATCH_SIZE
+    ) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+    """
+    (previous, next) node IDs of each chunk stored in Chroma for `doc_id`.
+
+    Chroma metadata carries each chunk's full text (`_node_content`), so it
+    is read `page_size` chunks at a time and only the links are kept.
+    """
+    links = {}
+    offset = 0
+    while True:
+        page = collection.get(
+            where={"ref_doc_id": doc_id}, include=["metadatas"], limit=page_size, offset=offset)
+        for node_id, metadata in zip(page["ids"], page["metadatas"]):
+            links[node_id] = _links(metadata_dict_to_node(metadata))
+        if len(page["ids"]) < page_size:
+            return links
+        offset += page_size
+
+
+def _links(node: BaseNode) -> Tuple[Optional[str], Optional[str]]:
+    prev_node, next_node = node.prev_node, node.next_node
+    return (prev_node.node_id if prev_node else None, next_node.node_id if next_node else None)
+
+
+def document_exists(doc_id: str) -> bool:
+    """Check if a document with the given doc_id already exists in storage."""
+    storage = LlamaStorage()
+    ref_doc_info = storage.context.docstore.get_ref_doc_info(doc_id)
+    return ref_doc_info is not None
+
+
+def get_document_nodes(doc_id: str) -> List[BaseNode]:
+    """Return the stored chunks of a document in insertion order."""
+    storage = LlamaStorage()
+    ref_doc_info = storage.context.docstore.get_ref_doc_info(doc_id)
+    if not ref_doc_info:
+        return []
+    return storage.context.docstore.get_nodes(ref_doc_info.node_ids)
+
+
+def delete_document(doc_id: str) -> None:
+    """Remove a document and all of its chunks from the docstore + Chroma vector store."""
+    storage = LlamaStorage()
+    storage.index.delete_ref_doc(doc_id, delete_from_docstore=True)
+    storage.persist()
+    logger.info(f"Deleted document {doc_id} from storage.")
+
+
 def add_file(
         file_path: str, 
         kg_id: str
@@ -151,6 +280,83 @@ def add_file(
     return doc_id
 
 
+def rechunk_documents(
+        doc_ids: Optional[List[str]] = None,
+        chunk_size: int = 1024,
+        chunk_overlap: int = 20,
+        num_workers: Optional[int] = None,
+        manifest_root: str = "output",
+        splitter: str = "sentence"
+    ) -> List[str]:
+    """
+    Re-chunk stored documents (all except community summaries by default),
+    e.g. after a chunk size change, parsing them on `num_workers` processes
+    (default: every core) with the `splitter` backend. Chunks the new
+    settings leave unchanged keep their IDs and embeddings; only the others
+    are embedded and replaced.
+
+    Each document's "chunk_embed" manifest entry gets a new output hash, so
+    the next corpus run re-enriches its chunks. Documents whose content list
+    cannot be recovered (no stored text and no source file, or malformed
+    JSON) are skipped with a warning and left untouched. Returns the
+    re-chunked IDs.
+    """
+    storage = LlamaStorage()
+    docstore = storage.context.docstore
+
+    if doc_ids is None:
+        doc_ids = [
+            doc_id for doc_id in docstore.get_all_ref_doc_info()
+            if not doc_id.startswith("community-")]
+
+    docs = []
+    for doc_id in doc_ids:
+        stored = docstore.get_document(doc_id, raise_error=False)
+        if stored is None:
+            logger.warning(f"Document {doc_id} not in docstore; skipping.")
+            continue
+        source = stored.metadata.get("source", "")
+        text = stored.text
+        if not text and source and Path(source).exists():
+            # Stored from an in-memory content list; read the persisted copy
+            text = Path(source).read_text(encoding="utf-8")
+        try:
+            if not isinstance(json.loads(text), list):
+                raise ValueError("not a content list")
+        except ValueError as e:
+            # Chunking it would yield no nodes and wipe the stored chunks
+            logger.warning(f"Content list of document {doc_id} cannot be recovered ({e}); skipping.")
+            continue
+        docs.append(Document(text=text, metadata={"source": source}, doc_id=doc_id))
+
+    parser = CustomParser.from_defaults(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        num_workers=num_workers or os.cpu_count() or 1,
+        splitter=splitter)
+    nodes = parser.get_nodes_from_documents(docs)
+
+    nodes_by_doc: Dict[str, List[BaseNode]] = {doc.doc_id: [] for doc in docs}
+    for node in nodes:
+        nodes_by_doc[node.ref_doc_id].append(node)
+
+    chunk_config = {"chunk_size": chunk_size, "chunk_overlap": chunk_overlap, "splitter": splitter}
+    for doc in docs:
+        _store_nodes(doc, nodes_by_doc[doc.doc_id])
+
+        manifest = StageManifest(doc.doc_id, root=manifest_root)
+        entry = manifest.get("chunk_embed")
+        if entry:
+            manifest.record(
+                "chunk_embed", entry["input_hash"],
+                output=entry["output"],
+                output_hash=hash_obj([entry["input_hash"], chunk_config]))
+
+    storage.persist()
+    logger.info(f"Re-chunked {len(docs)} documents into {len(nodes)} chunks.")
+    return [doc.doc_id for doc in docs]
+
+
 # def load_existing_index() -> VectorStoreIndex:
 #     chroma_client = chromadb.PersistentClient(path=str(CHROMA_DIR))
 #     collection = chroma_client.get_or_create_collection(COLLECTION_NAME)
@@ -224,30 +430,38 @@ def enrich_document_chunks(
         acronyms: Dict[str, str], 
         entities: List[Dict]
     ) -> None:
+    """
+    Annotate the chunks stored in Chroma for a document with the acronyms
+    and entities found in their text. Only the metadata is rewritten, in
+    pages of `INSERT_BATCH_SIZE`; stored embeddings are left as they are.
+    """
     storage = LlamaStorage()
-
-    ref_doc_info = storage.context.docstore.get_ref_doc_info(doc_id)
-    
-    if not ref_doc_info:
+    vector_store = storage.context.vector_store
+    collection = vector_store.client
+
+    updated = 0
+    offset = 0
+    while True:
+        page = collection.get(
+            where={"ref_doc_id": doc_id}, include=["metadatas", "documents"],
+            limit=INSERT_BATCH_SIZE, offset=offset)
+        metadatas = []
+        for metadata, text in zip(page["metadatas"], page["documents"]):
+            node = metadata_dict_to_node(metadata, text=text)
+            node = annotate_chunk(node, acronyms, entities)
+            metadatas.append(node_to_metadata_dict(
+                node, remove_text=True, flat_metadata=vector_store.flat_metadata))
+        if page["ids"]:
+            collection.update(ids=page["ids"], metadatas=metadatas)
+            updated += len(page["ids"])
+        if len(page["ids"]) < INSERT_BATCH_SIZE:
+            break
+        offset += INSERT_BATCH_SIZE
+
+    if updated:
+        logger.info(f"Enriched {updated} chunks for document {doc_id}.")
+    else:
         logger.warning(f"No nodes found for doc_id={doc_id}")
-        return
-
-    # Enrich metadata in docstore
-    node_ids = ref_doc_info.node_ids
-    nodes = storage.context.docstore.get_nodes(node_ids)
-    
-    updated_nodes = []
-
-    for node in nodes:
-        updated_node = annotate_chunk(node, acronyms, entities)
-        updated_nodes.append(updated_node)
-
-    storage.index.delete_ref_doc(doc_id, delete_from_docstore=True)
-    storage.index.insert_nodes(updated_nodes)
-
-    storage.persist()
-
-    logger.info(f"Enriched and persisted {len(updated_nodes)} chunks for document {doc_id}.")
 
 
 def add_communities_from_graph(kg):
@@ -8,13 +8,14 @@ from openai import OpenAI
 import tiktoken
 import json
 from pathlib import Path
-import requests
 
 from graspologic.partition import hierarchical_leiden
 from rdflib import URIRef, Literal, RDF
 import matplotlib.pyplot as plt
 
 from src.graph import KnowledgeGraph
+from src.metrics import count_http, count_tokens
+from src import http_client
 
 logger = logging.getLogger(__name__)
 
@@ -43,12 +44,19 @@ class OllamaClient:
         }
 
         logger.debug(f"Sending prompt to Ollama model '{self.model}'...")
-        resp = requests.post(self.base_url, json=data)
+        # Generation can take minutes on CPU
+        resp = http_client.post(self.base_url, json=data, timeout=(10, 600))
         resp.raise_for_status()
         response = resp.json()
 
+        usage = {
+            "prompt_tokens": response.get("prompt_eval_count", 0),
+            "completion_tokens": response.get("eval_count", 0),
+        }
+        count_tokens(usage["prompt_tokens"], usage["completion_tokens"])
+
         # Return an object mimicking OpenAI’s response
-        return {"choices": [{"message": {"content": response["response"]}}]}
+        return {"choices": [{"message": {"content": response["response"]}}], "usage": usage}
     
 
 class Summarizer:
@@ -105,6 +113,9 @@ class Summarizer:
                 messages=messages,
                 temperature=0.3,
             )
+            count_http()
+            if getattr(response, "usage", None):
+                count_tokens(response.usage.prompt_tokens, response.usage.completion_tokens)
             return response.choices[0].message.content.strip()
 
         elif self.backend == "ollama":
@@ -189,7 +200,7 @@ class Summarizer:
             # Link chunk to community
             graph.add((chunk_uri, self.kg.schema.isPartOf, comm_uri))
 
-        self.kg.save()
+        self.kg.commit()
 
         logger.info(f"Added {len(chunk_to_comm)} chunk→community links to graph")
 
@@ -233,11 +244,12 @@ class Summarizer:
                 # Store in KG
                 comm_uri = self.kg.ex[f"community/{comm_id}"]
                 self.kg.g.add((comm_uri, self.kg.schema.abstract, Literal(summary)))
+                self.kg.commit()
             else:
                 logger.debug(f"No summary returned for community {comm_id}")
 
         self._save_cache()
-        self.kg.save()
+        self.kg.commit()
 
         logger.info(f"Completed {len(summaries)} total summaries.")
         
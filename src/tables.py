@@ -0,0 +1,223 @@
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup
+from markdownify import markdownify as md
+
+logger = logging.getLogger(__name__)
+
+# Converted tables kept per process, keyed by the sha1 of `table_body`
+TABLE_CACHE_SIZE = 4096
+
+# Tags the streaming converter handles; anything else inside the table
+# (inline formatting, images, nested tables) goes through markdownify
+_CHILD_TAGS = {
+    "table": {"thead", "tbody", "tfoot", "tr"},
+    "thead": {"tr"},
+    "tbody": {"tr"},
+    "tfoot": {"tr"},
+    "tr": {"td", "th"},
+}
+
+# markdownify's whitespace normalization, then the cell's strip/join
+_WHITESPACE = re.compile(r"[\t \r\n]+")
+_ESCAPES = str.maketrans({"*": r"\*", "_": r"\_"})
+
+_cache: "OrderedDict[str, str]" = OrderedDict()
+_cache_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "fallbacks": 0}
+
+
+class _Unsupported(Exception):
+    """Markup outside what the streaming converter reproduces exactly."""
+
+
+class _Row:
+    def __init__(self, parent: Dict, is_first: bool):
+        self.parent = parent
+        self.is_first = is_first
+        self.cells: List[str] = []
+        self.width = 0
+        self.all_th = True
+
+
+class _TableParser(HTMLParser):
+    """
+    Single pass over the HTML events of the first <table> in a string,
+    collecting rows and cells without building a tree.
+
+    Only plain-text cells in well-nested table/thead/tbody/tfoot/tr/td/th
+    markup with explicit end tags are accepted; anything else raises
+    _Unsupported.
+    """
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack: List[Dict] = []
+        self.table: Optional[Dict] = None
+        self.rows: List[_Row] = []
+        self.done = False
+        self._cell: Optional[List[str]] = None
+        self._colspan = 1
+
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if self.table is None:
+            if tag == "table":
+                self.table = {"tag": "table", "children": []}
+                self.stack.append(self.table)
+            return
+        parent = self.stack[-1]
+        if self._cell is not None or tag not in _CHILD_TAGS.get(parent["tag"], ()):
+            raise _Unsupported(f"<{tag}> in <{parent['tag']}>")
+
+        node = {"tag": tag, "parent": parent, "children": [], "is_first": not parent["children"]}
+        parent["children"].append(node)
+        self.stack.append(node)
+
+        if tag == "tr":
+            self.rows.append(_Row(parent, node["is_first"]))
+        elif tag in ("td", "th"):
+            self._cell = []
+            self._colspan = _colspan(dict(attrs).get("colspan"))
+            if tag == "td":
+                self.rows[-1].all_th = False
+
+
+    def handle_startendtag(self, tag, attrs):
+        if self.table is not None and not self.done:
+            raise _Unsupported(tag)
+
+
+    def handle_endtag(self, tag):
+        if self.done or self.table is None:
+            return
+        if self.stack[-1]["tag"] != tag:
+            raise _Unsupported(f"unbalanced </{tag}>")
+        self.stack.pop()
+
+        if tag in ("td", "th"):
+            text = _WHITESPACE.sub(" ", "".join(self._cell).translate(_ESCAPES)).strip()
+            self.rows[-1].cells.append(" " + text + " |" * self._colspan)
+            self.rows[-1].width += self._colspan
+            self._cell = None
+        elif tag == "table":
+            self.done = True
+
+
+    def handle_data(self, data):
+        if self.done or self.table is None:
+            return
+        if self._cell is not None:
+            self._cell.append(data)
+        elif data.strip():
+            raise _Unsupported("text outside cells")
+
+
+    def handle_comment(self, data):
+        if self.table is not None and not self.done:
+            raise _Unsupported("comment")
+
+
+def _colspan(value: Optional[str]) -> int:
+    if value and value.isdigit():
+        return max(1, min(1000, int(value)))
+    return 1
+
+
+def _render(parser: _TableParser) -> str:
+    """Rows as markdownify's table rules write them."""
+    lines = []
+    for row in parser.rows:
+        parent = row.parent
+        width = row.width
+        is_head = (
+            row.all_th
+            or (parent["tag"] == "thead" and len(parent["children"]) == 1)
+        )
+        is_head_missing = row.is_first and (
+            parent["tag"] != "tbody"
+            or not any(child["tag"] == "thead" for child in parent["parent"]["children"])
+        )
+
+        overline = underline = ""
+        if is_head and row.is_first:
+            underline = "| " + " | ".join(["---"] * width) + " |\n"
+        elif is_head_missing or (row.is_first and (
+                parent["tag"] == "table" or (parent["tag"] == "tbody" and parent["is_first"]))):
+            overline = "| " + " | ".join([""] * width) + " |\n"
+            overline += "| " + " | ".join(["---"] * width) + " |\n"
+        lines.append(overline + "|" + "".join(row.cells) + "\n" + underline)
+    return "".join(lines).strip("\n")
+
+
+def _markdownify(table_body: str) -> str:
+    table_element = BeautifulSoup(table_body, 'html.parser').find('table')
+    return md(str(table_element), heading_style="ATX")
+
+
+def convert_table(table_body: str) -> str:
+    """
+    Convert the first <table> in `table_body` to markdown, exactly as
+    markdownify(heading_style="ATX") would.
+
+    MinerU tables (rows of plain-text cells, optional thead/tbody and
+    colspan) are converted in one streaming pass; other markup falls back
+    to BeautifulSoup + markdownify.
+    """
+    parser = _TableParser()
+    try:
+        parser.feed(table_body)
+        parser.close()
+        if not parser.done or not parser.rows:
+            raise _Unsupported("no complete table")
+    except _Unsupported as e:
+        logger.debug(f"Converting table with markdownify: {e}")
+        with _cache_lock:
+            _stats["fallbacks"] += 1
+        return _markdownify(table_body)
+    return _render(parser)
+
+
+def _cache_key(table_body: str) -> str:
+    return hashlib.sha1(table_body.encode("utf-8")).hexdigest()
+
+
+def table_to_markdown(table_body: str) -> str:
+    """
+    `convert_table` behind an LRU cache keyed by the hash of `table_body`,
+    so tables repeated across documents (boilerplate financing, results
+    framework and disclosure tables) are converted once per process.
+    """
+    key = _cache_key(table_body)
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return _cache[key]
+        _stats["misses"] += 1
+
+    markdown = convert_table(table_body)
+    with _cache_lock:
+        _cache[key] = markdown
+        if len(_cache) > TABLE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return markdown
+
+
+def table_cache_info() -> Dict[str, int]:
+    """Cache hits, misses, markdownify fallbacks and current size."""
+    with _cache_lock:
+        return {**_stats, "size": len(_cache)}
+
+
+def clear_table_cache():
+    with _cache_lock:
+        _cache.clear()
+        _stats.update(hits=0, misses=0, fallbacks=0)
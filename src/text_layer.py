@@ -0,0 +1,210 @@
+import json
+import logging
+from collections import Counter
+from html import escape
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pymupdf
+
+from src.mineru_demo import _write_json_compact
+
+logger = logging.getLogger(__name__)
+
+# Routing thresholds for the preflight
+MIN_PAGE_CHARS = 200        # a page with less extractable text counts as scanned
+MIN_TEXT_PAGE_RATIO = 0.9   # share of pages that must have a text layer
+MAX_IMAGE_COVERAGE = 0.5    # mean share of page area covered by images
+
+# A block is a header when its font is this much larger than the body font
+HEADER_SIZE_RATIO = 1.15
+MAX_HEADER_CHARS = 200
+MAX_HEADER_LEVELS = 3
+
+# Short blocks in these top/bottom page margins are running headers/footers
+MARGIN_RATIO = 0.06
+
+
+def preflight(pdf_bytes: bytes) -> Dict:
+    """
+    Measure the text layer of a PDF without rendering it.
+
+    Returns the page count, the share of pages with at least MIN_PAGE_CHARS
+    characters of extractable text, the mean share of page area covered by
+    images, and whether the document can take the text-layer path.
+    """
+    with pymupdf.open(stream=pdf_bytes, filetype="pdf") as doc:
+        pages = len(doc)
+        text_pages = 0
+        image_coverage = 0.0
+        for page in doc:
+            if len(page.get_text("text").strip()) >= MIN_PAGE_CHARS:
+                text_pages += 1
+            page_area = abs(page.rect) or 1.0
+            image_area = sum(
+                abs(pymupdf.Rect(info["bbox"]) & page.rect) for info in page.get_image_info())
+            image_coverage += min(image_area / page_area, 1.0)
+
+    text_ratio = text_pages / pages if pages else 0.0
+    image_coverage = image_coverage / pages if pages else 0.0
+    return {
+        "pages": pages,
+        "text_page_ratio": round(text_ratio, 3),
+        "image_coverage": round(image_coverage, 3),
+        "born_digital": (
+            pages > 0 and text_ratio >= MIN_TEXT_PAGE_RATIO
+            and image_coverage <= MAX_IMAGE_COVERAGE),
+    }
+
+
+def _table_html(rows: List[List[Optional[str]]]) -> str:
+    cells = "".join(
+        "<tr>" + "".join(f"<td>{escape(cell or '')}</td>" for cell in row) + "</tr>"
+        for row in rows)
+    return f"<html><body><table>{cells}</table></body></html>"
+
+
+def _body_font_size(doc) -> float:
+    sizes = Counter()
+    for page in doc:
+        for block in page.get_text("dict")["blocks"]:
+            for line in block.get("lines", []):
+                for span in line["spans"]:
+                    sizes[round(span["size"], 1)] += len(span["text"].strip())
+    return sizes.most_common(1)[0][0] if sizes else 0.0
+
+
+def extract_content_list(pdf_bytes: bytes) -> List[Dict]:
+    """
+    Build a MinerU-style content list from the PDF text layer.
+
+    Emits `text` items (headers carry `text_level`, ranked by font size) and
+    `table` items with an HTML `table_body`, each with its `page_idx`, so the
+    result can be fed to CustomParser like MinerU output.
+    """
+    content_list: List[Dict] = []
+
+    with pymupdf.open(stream=pdf_bytes, filetype="pdf") as doc:
+        body_size = _body_font_size(doc)
+
+        # First pass: collect blocks with their dominant font size
+        pages = []
+        header_sizes = set()
+        for page_idx, page in enumerate(doc):
+            tables = page.find_tables().tables
+            table_rects = [pymupdf.Rect(t.bbox) for t in tables]
+            height = page.rect.height
+            blocks = []
+
+            for block in page.get_text("dict")["blocks"]:
+                if block.get("type") != 0:
+                    continue
+                rect = pymupdf.Rect(block["bbox"])
+                if any(rect.intersects(t) for t in table_rects):
+                    continue
+
+                spans = [s for line in block["lines"] for s in line["spans"] if s["text"].strip()]
+                if not spans:
+                    continue
+                text = " ".join(
+                    " ".join(s["text"].strip() for s in line["spans"] if s["text"].strip())
+                    for line in block["lines"]).strip()
+                size = round(max(s["size"] for s in spans), 1)
+
+                in_margin = rect.y1 < height * MARGIN_RATIO or rect.y0 > height * (1 - MARGIN_RATIO)
+                if in_margin and len(text) < 80:
+                    continue
+
+                is_header = (
+                    body_size and size >= body_size * HEADER_SIZE_RATIO
+                    and len(text) <= MAX_HEADER_CHARS)
+                if is_header:
+                    header_sizes.add(size)
+                blocks.append((rect.y0, {"text": text, "size": size, "header": is_header}))
+
+            for table, rect in zip(tables, table_rects):
+                blocks.append((rect.y0, {"table": _table_html(table.extract())}))
+
+            blocks.sort(key=lambda b: b[0])
+            pages.append([b for _, b in blocks])
+
+        # Largest header font is level 1, the next level 2, ...
+        levels = {
+            size: min(rank + 1, MAX_HEADER_LEVELS)
+            for rank, size in enumerate(sorted(header_sizes, reverse=True))}
+
+        for page_idx, blocks in enumerate(pages):
+            for block in blocks:
+                if "table" in block:
+                    content_list.append({
+                        "type": "table",
+                        "img_path": "",
+                        "table_caption": [],
+                        "table_footnote": [],
+                        "table_body": block["table"],
+                        "page_idx": page_idx,
+                    })
+                elif block["header"]:
+                    content_list.append({
+                        "type": "text",
+                        "text": block["text"],
+                        "text_level": levels[block["size"]],
+                        "page_idx": page_idx,
+                    })
+                else:
+                    content_list.append({
+                        "type": "text",
+                        "text": block["text"],
+                        "page_idx": page_idx,
+                    })
+
+    return content_list
+
+
+def to_markdown(content_list: List[Dict]) -> str:
+    parts = []
+    for item in content_list:
+        if item["type"] == "table":
+            parts.append(item["table_body"])
+        elif item.get("text_level"):
+            parts.append("#" * item["text_level"] + " " + item["text"])
+        else:
+            parts.append(item["text"])
+    return "\n\n".join(parts)
+
+
+def write_outputs(
+        content_list: List[Dict],
+        file_id: str,
+        output_dir: str,
+        dump_content_list: bool = True,
+        dump_md: bool = True,
+        compact_json: bool = False
+    ) -> Path:
+    """
+    Write `{file_id}_content_list.json` and `{file_id}.md` (each unless
+    switched off, like MinerU's `f_dump_*` flags) in MinerU's
+    `{output_dir}/{file_id}/auto` layout, the JSON compact with
+    `compact_json` (`f_compact_json`). Returns the content list path.
+    """
+    file_id = str(file_id)
+    out_dir = Path(output_dir) / file_id / "auto"
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    content_list_path = out_dir / f"{file_id}_content_list.json"
+    if dump_content_list:
+        if compact_json:
+            _write_json_compact(content_list_path, content_list)
+        else:
+            with open(content_list_path, "w", encoding="utf-8") as f:
+                json.dump(content_list, f, ensure_ascii=False, indent=4)
+    if dump_md:
+        (out_dir / f"{file_id}.md").write_text(to_markdown(content_list), encoding="utf-8")
+    return content_list_path
+
+
+def parse_text_layer(pdf_bytes: bytes, file_id: str, output_dir: str, compact_json: bool = False) -> Path:
+    """Extract the text layer and write MinerU-style outputs. Returns the content list path."""
+    content_list = extract_content_list(pdf_bytes)
+    logger.info(f"Extracted {len(content_list)} blocks for doc {file_id} from the text layer.")
+    return write_outputs(content_list, file_id, output_dir, compact_json=compact_json)
@@ -0,0 +1,142 @@
+import logging
+import math
+import os
+import sys
+from typing import Callable, Dict, Optional
+
+from threadpoolctl import threadpool_info, threadpool_limits
+
+logger = logging.getLogger(__name__)
+
+# Read by OpenMP (torch, onnxruntime builds with OpenMP) and BLAS libraries
+# when they start their thread pools
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+
+# Relative intra-op demand of one worker: MinerU's layout/OCR models are far
+# heavier than spaCy's small CNN pipelines
+WORKER_WEIGHTS = {"parse": 4, "nlp": 1}
+
+# Cores kept for the main process while the pools run (store/KG writes, I/O)
+MAIN_THREADS = 1
+
+_limiter = None
+_effective: Dict = {}
+
+
+def available_cores() -> int:
+    """Cores this process may run on (respects CPU affinity / cgroup pinning)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class ThreadBudget:
+    """
+    Split a host's core budget into intra-op threads per worker type.
+
+    Without a budget every worker process starts torch, OpenMP and BLAS pools
+    sized to the whole machine, so N workers run N x cores threads. Here the
+    cores left after MAIN_THREADS are shared between the pools in proportion
+    to `weights` x worker count, with at least one thread per worker. Steps
+    that run after the pools have shut down (Leiden, NumPy) get every core.
+
+    Usage:
+        budget = ThreadBudget({"parse": 2, "nlp": 4})
+        budget.threads  # {"parse": 5, "nlp": 1, "main": 1, "summarize": 16}
+
+    Args:
+        workers (dict): worker processes per type, e.g. {"parse": 2, "nlp": 2}
+        cores (int): core budget; defaults to the cores available to this process
+        weights (dict): overrides for WORKER_WEIGHTS
+    """
+    def __init__(
+            self,
+            workers: Dict[str, int],
+            cores: Optional[int] = None,
+            weights: Optional[Dict[str, float]] = None
+        ):
+        self.workers = {kind: n for kind, n in workers.items() if n}
+        self.cores = cores or available_cores()
+        self.weights = {**WORKER_WEIGHTS, **(weights or {})}
+        self.threads = self._allocate()
+
+
+    def _allocate(self) -> Dict[str, int]:
+        free = max(self.cores - MAIN_THREADS, 1)
+        demand = sum(self.weights.get(kind, 1) * n for kind, n in self.workers.items())
+
+        threads = {
+            kind: max(1, math.floor(free * self.weights.get(kind, 1) / demand)) if demand else 1
+            for kind in self.workers
+        }
+        threads["main"] = MAIN_THREADS
+        threads["summarize"] = self.cores
+
+        used = sum(threads[kind] * n for kind, n in self.workers.items()) + MAIN_THREADS
+        if used > self.cores:
+            logger.warning(
+                f"{sum(self.workers.values())} workers need at least {used} threads "
+                f"on a {self.cores}-core budget; reduce the worker counts to avoid oversubscription.")
+        return threads
+
+
+    def __repr__(self):
+        return f"ThreadBudget(cores={self.cores}, workers={self.workers}, threads={self.threads})"
+
+
+def limit_threads(n: int, worker: str = "main") -> Dict:
+    """
+    Cap the intra-op threads of this process: environment variables for pools
+    not started yet, plus torch and any loaded BLAS/OpenMP libraries.
+    Returns the effective settings.
+    """
+    global _limiter
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(n)
+
+    # torch is usually already imported (via MinerU) in forked workers
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(n)
+
+    _limiter = threadpool_limits(limits=n)
+
+    _effective.clear()
+    _effective.update({"worker": worker, "pid": os.getpid(), "threads": n})
+    _effective.update(effective_settings())
+    logger.debug(f"Thread limits for {worker} worker {os.getpid()}: {_effective}")
+    return dict(_effective)
+
+
+def effective_settings() -> Dict:
+    """Thread counts currently in effect in this process, per library."""
+    settings = dict(_effective)
+    if "torch" in sys.modules:
+        settings["torch"] = sys.modules["torch"].get_num_threads()
+    settings["threadpools"] = {
+        f"{info['internal_api']}:{os.path.basename(info['filepath'])}": info["num_threads"]
+        for info in threadpool_info()}
+    return settings
+
+
+def current_threads() -> int:
+    """Threads granted to this process by `limit_threads`, or all available cores."""
+    return _effective.get("threads") or available_cores()
+
+
+def init_worker(
+        n: int,
+        worker: str,
+        initializer: Optional[Callable] = None,
+        initargs: tuple = ()
+    ):
+    """Process pool initializer: apply the thread budget, then run `initializer`."""
+    limit_threads(n, worker)
+    if initializer is not None:
+        initializer(*initargs)
@@ -10,4 +10,12 @@ def pytest_addoption(parser):
 
 @pytest.fixture
 def update_golden(request):
-    return request.config.getoption("--update-golden")
\ No newline at end of file
+    return request.config.getoption("--update-golden")
+
+
+@pytest.fixture(autouse=True)
+def stage_metrics_file(tmp_path, monkeypatch):
+    """Keep stage metrics written during tests out of ./logs."""
+    path = tmp_path / "stage_metrics.jsonl"
+    monkeypatch.setattr("src.metrics.METRICS_FILE", path)
+    return path
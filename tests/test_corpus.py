@@ -0,0 +1,207 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock
+
+from src.corpus import AsyncCorpusRunner, CorpusRunner, parse_document
+from src.manifest import StageManifest
+
+
+@pytest.fixture
+def kg(tmp_path):
+    kg = MagicMock()
+    kg.ttl_path = tmp_path / "kg.ttl"
+    kg.get_url_by_id.side_effect = lambda doc_id: None if doc_id == "no-url" else f"http://example.com/{doc_id}.pdf"
+    return kg
+
+
+@pytest.fixture
+def fake_parse(tmp_path):
+    def parse(doc_id, url, kwargs):
+        if doc_id == "bad":
+            raise RuntimeError("parse failed")
+        path = tmp_path / f"{doc_id}_content_list.json"
+        path.write_text('[{"type": "text", "text": "Hello"}]')
+        return str(path)
+    return parse
+
+
+def make_runner(kg, tmp_path, workers=2):
+    return CorpusRunner(
+        kg,
+        parse_workers=workers,
+        nlp_workers=workers,
+        reader_kwargs={"output_dir": str(tmp_path / "output")},
+        nlp_models=())
+
+
+@patch("src.corpus.ProcessPoolExecutor", ThreadPoolExecutor)
+@patch("src.corpus.document_exists", return_value=False)
+@patch("src.corpus.enrich_document_chunks")
+@patch("src.corpus.add_file")
+@patch("src.corpus.annotate_document")
+@patch("src.corpus.parse_document")
+def test_run_processes_each_document(mock_parse, mock_annotate, mock_add_file, mock_enrich, mock_exists, kg, fake_parse, tmp_path):
+    mock_parse.side_effect = fake_parse
+    mock_annotate.side_effect = lambda doc_id, output_dir, streaming: {"doc_id": doc_id, "acronyms": {}, "entities": []}
+
+    runner = make_runner(kg, tmp_path)
+    summary = runner.run(["1", "2", "no-url"], summarize=False)
+
+    assert sorted(summary["completed"]) == ["1", "2"]
+    assert summary["failed"] == {}
+    assert mock_add_file.call_count == 2
+    assert kg.add_entities.call_count == 2
+    kg.add_text_chunks.assert_any_call(doc_id="1")
+    assert set(runner.results.index) == {"1", "2"}
+
+
+@patch("src.corpus.ProcessPoolExecutor", ThreadPoolExecutor)
+@patch("src.corpus.document_exists", return_value=False)
+@patch("src.corpus.enrich_document_chunks")
+@patch("src.corpus.add_file")
+@patch("src.corpus.annotate_document")
+@patch("src.corpus.parse_document")
+def test_run_records_failures_and_continues(mock_parse, mock_annotate, mock_add_file, mock_enrich, mock_exists, kg, fake_parse, tmp_path):
+    mock_parse.side_effect = fake_parse
+    mock_annotate.side_effect = lambda doc_id, output_dir, streaming: {"doc_id": doc_id, "acronyms": {}, "entities": []}
+
+    runner = make_runner(kg, tmp_path, workers=1)
+    summary = runner.run(["good", "bad"], summarize=False)
+
+    assert summary["completed"] == ["good"]
+    assert "bad" in summary["failed"]
+    mock_annotate.assert_called_once_with("good", str(tmp_path / "output"), False)
+
+
+@patch("src.corpus.ProcessPoolExecutor", ThreadPoolExecutor)
+@patch("src.corpus.document_exists", return_value=True)
+@patch("src.corpus.enrich_document_chunks")
+@patch("src.corpus.add_file")
+@patch("src.corpus.annotate_document")
+@patch("src.corpus.parse_document")
+def test_rerun_skips_unchanged_stages(mock_parse, mock_annotate, mock_add_file, mock_enrich, mock_exists, kg, fake_parse, tmp_path):
+    mock_parse.side_effect = fake_parse
+    mock_annotate.side_effect = lambda doc_id, output_dir, streaming: {"doc_id": doc_id, "acronyms": {"AI": "Artificial Intelligence"}, "entities": []}
+
+    make_runner(kg, tmp_path).run(["1"], summarize=False)
+    make_runner(kg, tmp_path).run(["1"], summarize=False)
+
+    # Second run found every stage current
+    mock_add_file.assert_called_once()
+    mock_enrich.assert_called_once()
+    kg.add_entities.assert_called_once()
+
+    manifest = StageManifest("1", root=str(tmp_path / "output"))
+    assert {"chunk_embed", "chunk_enrichment", "chunk_kg"} <= set(manifest.stages)
+
+
+@patch("src.corpus.ProcessPoolExecutor", ThreadPoolExecutor)
+@patch("src.corpus.document_exists", return_value=False)
+@patch("src.corpus.enrich_document_chunks")
+@patch("src.corpus.add_file")
+@patch("src.corpus.link_document")
+@patch("src.corpus.annotate_document")
+@patch("src.corpus.parse_document")
+@patch("src.corpus.Reader")
+def test_async_runner_overlaps_stages(mock_reader, mock_parse, mock_annotate, mock_link, mock_add_file, mock_enrich, mock_exists, kg, fake_parse, tmp_path):
+    mock_reader.return_value.read_fn.return_value = b"%PDF"
+    mock_parse.side_effect = lambda doc_id, url, kwargs, pdf_bytes: fake_parse(doc_id, url, kwargs)
+    mock_annotate.side_effect = lambda doc_id, output_dir, streaming, link: {
+        "doc_id": doc_id, "acronyms": {}, "entities": [{"surface": "wind"}]}
+    mock_link.side_effect = lambda doc_id, entities, output_dir: [dict(e, qid="Q1") for e in entities]
+
+    runner = AsyncCorpusRunner(
+        kg,
+        endpoint_limits={"pdf": 1},
+        parse_workers=2,
+        nlp_workers=2,
+        reader_kwargs={"output_dir": str(tmp_path / "output")},
+        nlp_models=())
+    summary = runner.run(["1", "2", "bad"], summarize=False)
+
+    assert sorted(summary["completed"]) == ["1", "2"]
+    assert summary["failed"]["bad"].startswith("parse")
+    # NLP workers skip linking; it runs separately under the wikidata limit
+    assert all(call.args[3] is False for call in mock_annotate.call_args_list)
+    kg.add_entities.assert_any_call("1", [{"surface": "wind", "qid": "Q1"}])
+    kg.commit.assert_called_with(force=True)
+
+
+@patch("src.corpus.ProcessPoolExecutor", ThreadPoolExecutor)
+@patch("src.corpus.document_exists", return_value=False)
+@patch("src.corpus.enrich_document_chunks")
+@patch("src.corpus.add_file")
+@patch("src.corpus.annotate_document")
+@patch("src.corpus.parse_documents")
+def test_run_parses_in_batches(mock_parse_docs, mock_annotate, mock_add_file, mock_enrich, mock_exists, kg, fake_parse, tmp_path):
+    mock_parse_docs.side_effect = lambda docs, kwargs: {
+        doc_id: fake_parse(doc_id, url, kwargs) for doc_id, url in docs if doc_id != "bad"}
+    mock_annotate.side_effect = lambda doc_id, output_dir, streaming: {"doc_id": doc_id, "acronyms": {}, "entities": []}
+    sizes = {"1": 10_000_000, "2": 50_000, "3": 9_000_000, "bad": None}
+
+    runner = make_runner(kg, tmp_path, workers=1)
+    runner.parse_batch_size = 2
+    with patch.object(runner.pdf_cache, "content_length",
+                      side_effect=lambda url: sizes[url.rsplit("/", 1)[-1][:-4]]):
+        summary = runner.run(["1", "2", "3", "bad"], summarize=False)
+
+    # Batched by size across the whole run, unknown sizes last
+    batches = [[doc_id for doc_id, _ in call.args[0]] for call in mock_parse_docs.call_args_list]
+    assert batches == [["2", "3"], ["1", "bad"]]
+    assert sorted(summary["completed"]) == ["1", "2", "3"]
+    assert "bad" in summary["failed"]
+
+
+@patch("src.corpus.ProcessPoolExecutor", ThreadPoolExecutor)
+@patch("src.corpus.document_exists", return_value=False)
+@patch("src.corpus.enrich_document_chunks")
+@patch("src.corpus.add_file")
+@patch("src.corpus.annotate_document")
+@patch("src.corpus.parse_document")
+@patch("src.prefetch.PdfCache")
+def test_run_prefetches_pdfs_ahead_of_parsing(MockCache, mock_parse, mock_annotate, mock_add_file, mock_enrich, mock_exists, kg, fake_parse, tmp_path):
+    def fetch(url):
+        if url.endswith("/offline.pdf"):
+            raise IOError("connection reset")
+        path = tmp_path / url.rsplit("/", 1)[-1]
+        path.write_bytes(b"%PDF")
+        return path
+    MockCache.return_value.fetch.side_effect = fetch
+    mock_parse.side_effect = lambda doc_id, url, kwargs: fake_parse(doc_id, url, kwargs)
+    mock_annotate.side_effect = lambda doc_id, output_dir, streaming: {"doc_id": doc_id, "acronyms": {}, "entities": []}
+
+    runner = CorpusRunner(
+        kg, parse_workers=1, nlp_workers=1, nlp_models=(), prefetch=1,
+        reader_kwargs={"output_dir": str(tmp_path / "output")})
+    summary = runner.run(["1", "2", "offline", "3"], summarize=False)
+
+    assert sorted(summary["completed"]) == ["1", "2", "3"]
+    assert summary["failed"]["offline"].startswith("download:")
+    assert MockCache.return_value.fetch.call_count == 4
+    # Workers read the prefetched PDFs from the cache without revalidating
+    assert all(call.args[2]["revalidate"] is False for call in mock_parse.call_args_list)
+
+
+@patch("src.corpus.Reader")
+def test_parse_document_is_keyed_on_pdf_content(mock_reader, tmp_path):
+    def parse_bytes(pdf_bytes, doc_id, lang):
+        path = tmp_path / f"{doc_id}_content_list.json"
+        path.write_text("[]")
+        return path
+    mock_reader.return_value.parse_bytes.side_effect = parse_bytes
+    kwargs = {"output_dir": str(tmp_path / "output")}
+    url = "http://example.com/1.pdf"
+
+    parse_document("1", url, kwargs, pdf_bytes=b"%PDF v1")
+    parse_document("1", url, kwargs, pdf_bytes=b"%PDF v1")
+    assert mock_reader.return_value.parse_bytes.call_count == 1
+
+    # Same URL, new content
+    parse_document("1", url, kwargs, pdf_bytes=b"%PDF v2")
+    assert mock_reader.return_value.parse_bytes.call_count == 2
+
+
+@pytest.mark.parametrize("option", [{"parse_batch_size": 4}, {"prefetch": 2}])
+def test_async_runner_rejects_batching_and_prefetch(kg, tmp_path, option):
+    with pytest.raises(ValueError):
+        AsyncCorpusRunner(kg, reader_kwargs={"output_dir": str(tmp_path / "output")}, **option)
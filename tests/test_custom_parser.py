@@ -441,3 +441,93 @@ def test_structured_output(sample_document):
 #         print(f"  Metadata keys: {list(node.metadata.keys())}")
 #         print(f"  Relationships: {list(node.relationships.keys())}")
 #     print("\n--- END DEBUG ---")
+
+
+def test_in_memory_content_list_matches_json_text() -> None:
+    parser = CustomParser()
+    content_list = [
+        {"type": "text", "text": "Header 1", "text_level": 1},
+        {"type": "text", "text": "Paragraph under header 1."},
+    ]
+    from_text = parser.get_nodes_from_documents([Document(text=json.dumps(content_list))])
+    doc = Document(text="", doc_id="42")
+    in_memory = parser.get_nodes_from_documents([doc], content_lists={"42": content_list})
+
+    assert [n.text for n in in_memory] == [n.text for n in from_text]
+    assert in_memory[0].metadata["header_path"] == from_text[0].metadata["header_path"]
+
+
+def test_parallel_parse_matches_serial() -> None:
+    content = [
+        {"type": "text", "text": "Header 1", "text_level": 1},
+        {"type": "text", "text": "First sentence here. " * 40},
+        {"type": "table", "table_body": "<table><tr><td>Cell 1</td><td>Cell 2</td></tr></table>"},
+        {"type": "text", "text": "Sub-header", "text_level": 2},
+        {"type": "text", "text": "Second sentence here. " * 40},
+    ]
+    docs = [Document(text=json.dumps(content), doc_id=f"doc-{i}") for i in range(3)]
+    docs.append(Document(text="not json", doc_id="bad"))
+
+    serial = CustomParser.from_defaults(chunk_size=64, chunk_overlap=8)
+    parallel = CustomParser.from_defaults(chunk_size=64, chunk_overlap=8, num_workers=2)
+    expected = serial.get_nodes_from_documents(docs)
+    nodes = parallel.get_nodes_from_documents(docs)
+
+    assert [(n.ref_doc_id, n.text, n.metadata["header_path"]) for n in nodes] == [
+        (n.ref_doc_id, n.text, n.metadata["header_path"]) for n in expected]
+    assert nodes[1].relationships[NodeRelationship.PREVIOUS].node_id == nodes[0].node_id
+    assert nodes[0].relationships[NodeRelationship.NEXT].node_id == nodes[1].node_id
+
+
+def test_streamed_nodes_match_get_nodes_from_documents() -> None:
+    content = [
+        {"type": "text", "text": "Header 1", "text_level": 1},
+        {"type": "text", "text": "First sentence here. " * 40},
+        {"type": "table", "table_body": "<table><tr><td>Cell 1</td><td>Cell 2</td></tr></table>"},
+        {"type": "text", "text": "Sub-header", "text_level": 2},
+        {"type": "text", "text": "Second sentence here. " * 40},
+    ]
+    docs = [
+        Document(text=json.dumps(content), doc_id=f"doc-{i}", metadata={"source": f"{i}.json"})
+        for i in range(2)]
+
+    parser = CustomParser.from_defaults(chunk_size=64, chunk_overlap=8)
+    expected = parser.get_nodes_from_documents(docs)
+    stream = parser.iter_nodes_from_documents(docs)
+
+    first = next(stream)
+    assert first.text == expected[0].text
+    nodes = [first, *stream]
+
+    assert [(n.ref_doc_id, n.text, n.metadata, n.start_char_idx) for n in nodes] == [
+        (n.ref_doc_id, n.text, n.metadata, n.start_char_idx) for n in expected]
+    for prev, node in zip(nodes, nodes[1:]):
+        linked = prev.ref_doc_id == node.ref_doc_id
+        assert (NodeRelationship.NEXT in prev.relationships) == linked
+        if linked:
+            assert prev.relationships[NodeRelationship.NEXT].node_id == node.node_id
+            assert node.relationships[NodeRelationship.PREVIOUS].node_id == prev.node_id
+
+
+def test_node_ids_are_deterministic_per_chunk() -> None:
+    content = [
+        {"type": "text", "text": "Header 1", "text_level": 1},
+        {"type": "text", "text": "Unchanged paragraph."},
+        {"type": "text", "text": "Header 2", "text_level": 1},
+        {"type": "text", "text": "Original paragraph."},
+        {"type": "table", "table_body": "<table><tr><td>Repeated</td></tr></table>"},
+        {"type": "table", "table_body": "<table><tr><td>Repeated</td></tr></table>"},
+    ]
+    revised = [dict(e) for e in content]
+    revised[3]["text"] = "Revised paragraph."
+
+    parser = CustomParser()
+    first = parser.get_nodes_from_documents([Document(text=json.dumps(content), doc_id="42")])
+    again = parser.get_nodes_from_documents([Document(text=json.dumps(content), doc_id="42")])
+    changed = parser.get_nodes_from_documents([Document(text=json.dumps(revised), doc_id="42")])
+
+    assert [n.node_id for n in again] == [n.node_id for n in first]
+    # Identical tables under one header still get distinct IDs
+    assert len({n.node_id for n in first}) == len(first) == 4
+    # Tables are emitted at their position, the text under Header 2 after them
+    assert [a.node_id == b.node_id for a, b in zip(first, changed)] == [True, True, True, False]
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from src.estimate import CostEstimator, format_report
+from src.results import ResultsStore
+
+
+@pytest.fixture
+def kg():
+    kg = MagicMock()
+    kg.get_url_by_id.side_effect = lambda doc_id: f"http://example.com/{doc_id}.pdf"
+    return kg
+
+
+@pytest.fixture
+def output_dir(tmp_path):
+    # Doc "parsed" has MinerU output and stored results
+    auto = tmp_path / "parsed" / "auto"
+    auto.mkdir(parents=True)
+    blocks = [{"type": "text", "text": "x" * 8192, "page_idx": i} for i in range(3)]
+    (auto / "parsed_content_list.json").write_text(json.dumps(blocks))
+
+    ResultsStore(root=str(tmp_path / "results")).write("parsed", {
+        "acronyms": {},
+        "entities": [
+            {"surface": "World Bank", "label": "ORG"},
+            {"surface": "Kenya", "label": "GPE"},
+        ]})
+    return tmp_path
+
+
+@patch("src.estimate.document_exists", return_value=False)
+@patch("src.pdf_cache.http_client.head")
+def test_estimate_uses_existing_output_and_pdf_size(mock_head, mock_exists, kg, output_dir):
+    mock_head.return_value.headers = {"Content-Length": "600000"}
+
+    estimator = CostEstimator(kg, output_dir=str(output_dir), rates={"bytes_per_page": 60_000})
+    estimator.wikidata_cache = {"world bank|org"}
+    report = estimator.estimate(["parsed", "new"])
+
+    parsed, new = report["per_document"]
+    assert parsed["pages"] == 3
+    assert parsed["chunks"] == 6
+    assert parsed["new_entities"] == 1
+    assert parsed["acronym_calls"] == 0
+    assert new["pages"] == 10
+    assert new["acronym_calls"] == 1
+
+    assert report["pages"] == 13
+    assert report["llm"]["acronym_calls"] == 1
+    assert report["wall_clock_s"]["wikifier"] == report["new_entities"] / estimator.rates["wikidata_calls_per_second"]
+    assert "PDF pages to parse" in format_report(report)
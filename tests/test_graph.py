@@ -2,9 +2,9 @@ import pytest
 import json
 import pandas as pd
 from unittest.mock import MagicMock, patch, mock_open
-from rdflib import URIRef, RDF, Literal
+from rdflib import Graph, URIRef, RDF, Literal
 
-from src.graph import KnowledgeGraph, COUNTRY_PROPERTY_MAP
+from src.graph import KnowledgeGraph, COUNTRY_PROPERTY_MAP, DOCUMENT_COLUMNS
 
 
 @pytest.fixture
@@ -48,7 +48,7 @@ def test_sanitize_column_removes_accents_and_spaces(kg):
     assert "South_Africa" in list(result)
 
 
-@patch("src.graph.requests.get")
+@patch("src.graph.http_client.get")
 def test_get_metadata_fetches_and_sanitizes(mock_get, tmp_path, kg):
     """Simulate metadata download and ensure DataFrame returned."""
     fake_json = {
@@ -157,7 +157,7 @@ def test_get_url_by_id_returns_url(kg):
     assert kg.get_url_by_id("999") is None
 
 
-@patch("src.graph.requests.get")
+@patch("src.graph.http_client.get")
 def test_load_or_build_rebuilds_when_requested(mock_get, tmp_path):
     """Verify load_or_build removes old TTL and calls build/save."""
     fake_ttl = tmp_path / "fake.ttl"
@@ -169,3 +169,73 @@ def test_load_or_build_rebuilds_when_requested(mock_get, tmp_path):
         m_build.assert_called_once()
         m_save.assert_called_once()
         assert isinstance(kg, KnowledgeGraph)
+
+
+def test_get_document_ids_filters_by_since(kg):
+    old_doc = URIRef("http://worldbank.example.org/document/1")
+    new_doc = URIRef("http://worldbank.example.org/document/2")
+    kg.g.add((old_doc, kg.schema.identifier, Literal("1")))
+    kg.g.add((old_doc, kg.schema.dateModified, Literal("2020-05-01 00:00:00+00:00")))
+    kg.g.add((new_doc, kg.schema.identifier, Literal("2")))
+    kg.g.add((new_doc, kg.schema.dateModified, Literal("2025-01-02 00:00:00+00:00")))
+
+    assert sorted(kg.get_document_ids()) == ["1", "2"]
+    assert kg.get_document_ids(since="2024-01-01") == ["2"]
+
+
+def test_commit_journals_delta_and_replays_on_load(tmp_path):
+    ttl = tmp_path / "kg.ttl"
+    kg = KnowledgeGraph(ttl_path=ttl)
+    kg.save()
+
+    triple = (kg.ex["document/1"], kg.schema.mentions, kg.ex["entity/AI"])
+    kg.g.add(triple)
+    kg.commit()
+
+    # Journaled, not checkpointed
+    assert kg.journal_path.exists()
+    assert triple not in Graph().parse(ttl, format="turtle")
+    reloaded = KnowledgeGraph(ttl_path=ttl)
+    assert triple in reloaded.g
+
+
+def test_commit_checkpoints_when_threshold_reached(tmp_path):
+    kg = KnowledgeGraph(ttl_path=tmp_path / "kg.ttl", commit_triples=2)
+    kg.g.add((kg.ex["document/1"], kg.schema.mentions, kg.ex["entity/A"]))
+    kg.commit()
+    assert not kg.ttl_path.exists()
+
+    kg.g.add((kg.ex["document/1"], kg.schema.mentions, kg.ex["entity/B"]))
+    kg.commit()
+    assert kg.ttl_path.exists()
+    assert not kg.journal_path.exists()
+
+
+def test_sync_metadata_replaces_changed_literals_before_advancing_watermark(tmp_path):
+    kg = KnowledgeGraph(ttl_path=tmp_path / "kg.ttl")
+    kg.linker = MagicMock()
+    doc = kg.ex["document/1"]
+    kg.g.add((doc, kg.schema.name, Literal("Old title", lang="en")))
+    kg.g.add((doc, kg.schema.url, Literal("http://example.com/old.pdf")))
+    kg.save()
+
+    changed = pd.DataFrame([{
+        "id": "1", "display_title": "New title", "pdfurl": "http://example.com/new.pdf",
+        "last_modified_date": "2025-02-01", "docty": "PAD", "owner": "WB"}])
+    harvester = MagicMock()
+    harvester.sync.return_value = changed
+
+    def advance_watermark(df):
+        # The update is checkpointed before the watermark moves
+        saved = KnowledgeGraph(ttl_path=kg.ttl_path).g
+        assert set(saved.objects(doc, kg.schema.name)) == {Literal("New title", lang="en")}
+    harvester.advance_watermark.side_effect = advance_watermark
+
+    with patch.object(KnowledgeGraph, "_prepare_metadata", side_effect=lambda df: df), \
+         patch.object(KnowledgeGraph, "_add_metadata",
+                      side_effect=lambda: kg.add_world_bank_documents(extra_columns=DOCUMENT_COLUMNS)):
+        assert kg.sync_metadata(harvester) == 1
+
+    harvester.sync.assert_called_once_with(advance=False)
+    harvester.advance_watermark.assert_called_once_with(changed)
+    assert list(kg.g.objects(doc, kg.schema.url)) == [Literal("http://example.com/new.pdf")]
@@ -0,0 +1,93 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+from src.harvest import MetadataHarvester
+
+
+def page_response(docs, total):
+    response = MagicMock()
+    response.content = json.dumps({
+        "total": str(total),
+        "documents": {**{d["id"]: d for d in docs}, "facets": {}},
+    }).encode()
+    return response
+
+
+def fake_wds(n_docs, rows):
+    """Newest-first result pages: doc i was modified on day n_docs - i."""
+    docs = [
+        {"id": str(i), "last_modified_date": f"2025-01-{n_docs - i:02d}T00:00:00Z",
+         "year": "2025", "docty": "Project Appraisal Document"}
+        for i in range(n_docs)]
+
+    def get(url, params):
+        start = (params["page"] - 1) * rows
+        return page_response(docs[start:start + rows], n_docs)
+    return get
+
+
+@patch("src.harvest.http_client.get")
+def test_harvest_fetches_all_pages(mock_get, tmp_path):
+    mock_get.side_effect = fake_wds(n_docs=25, rows=10)
+    harvester = MetadataHarvester("http://wds", {"qterm": "wind"}, root=str(tmp_path), rows=10)
+
+    df = harvester.harvest()
+
+    assert len(df) == 25
+    assert sorted(call.kwargs["params"]["page"] for call in mock_get.call_args_list) == [1, 2, 3]
+    assert mock_get.call_args.kwargs["params"]["srt"] == "last_modified_date"
+
+
+@patch("src.harvest.http_client.get")
+def test_sync_only_requests_documents_newer_than_watermark(mock_get, tmp_path):
+    mock_get.side_effect = fake_wds(n_docs=30, rows=5)
+    harvester = MetadataHarvester(
+        "http://wds", {}, root=str(tmp_path), rows=5, max_concurrency=2)
+    harvester.sync_path.parent.mkdir(parents=True, exist_ok=True)
+    harvester.sync_path.write_text(json.dumps({"last_modified_date": "2025-01-24T00:00:00Z"}))
+
+    with patch.object(MetadataHarvester, "_write") as mock_write:
+        changed = harvester.sync()
+
+    # Docs 0-5 are newer; the first wave (pages 1-3) already reaches the watermark
+    assert sorted(changed["id"].astype(int)) == [0, 1, 2, 3, 4, 5]
+    assert mock_get.call_count == 3
+    mock_write.assert_called_once()
+    assert harvester.watermark() == pd.Timestamp("2025-01-30", tz="UTC")
+
+
+@patch("src.harvest.http_client.get")
+def test_sync_can_leave_watermark_for_later(mock_get, tmp_path):
+    mock_get.side_effect = fake_wds(n_docs=10, rows=5)
+    harvester = MetadataHarvester("http://wds", {}, root=str(tmp_path), rows=5)
+
+    with patch.object(MetadataHarvester, "_write"):
+        changed = harvester.sync(advance=False)
+    assert harvester.watermark() is None
+
+    harvester.advance_watermark(changed)
+    assert harvester.watermark() == changed["last_modified_date"].max()
+
+
+def test_parquet_roundtrip_keeps_latest_version(tmp_path):
+    pytest.importorskip("pyarrow")
+    harvester = MetadataHarvester("http://wds", {}, root=str(tmp_path))
+    first = pd.DataFrame([
+        {"id": "1", "last_modified_date": pd.Timestamp("2025-01-01"), "year": "2024", "docty": "PAD"},
+        {"id": "2", "last_modified_date": pd.Timestamp("2025-01-01"), "year": "2025", "docty": None},
+    ])
+    update = pd.DataFrame([
+        {"id": "1", "last_modified_date": pd.Timestamp("2025-02-01"), "year": "2024", "docty": "PAD"},
+    ])
+
+    harvester._write(first)
+    harvester._write(update)
+    df = harvester.load()
+
+    assert (tmp_path / "year=2024" / "docty=PAD").is_dir()
+    assert len(df) == 2
+    assert df.set_index("id").loc["1", "last_modified_date"] == pd.Timestamp("2025-02-01")
+    assert df.set_index("id").loc["2", "docty"] is None
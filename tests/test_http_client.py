@@ -0,0 +1,30 @@
+from unittest.mock import MagicMock, patch
+
+from src import http_client
+
+
+def test_session_is_shared_and_pooled():
+    session = http_client.get_session()
+    assert http_client.get_session() is session
+
+    adapter = session.get_adapter("https://query.wikidata.org")
+    assert adapter.max_retries.total == http_client.RETRY.total
+    # Non-idempotent requests are not replayed
+    assert adapter.max_retries.is_retry("GET", 503)
+    assert not adapter.max_retries.is_retry("POST", 503)
+    assert "gzip" in session.headers["Accept-Encoding"]
+
+
+@patch("src.http_client.get_session")
+def test_request_applies_timeout_and_records_host_metrics(mock_get_session):
+    response = MagicMock(status_code=200, content=b"12345")
+    mock_get_session.return_value.request.return_value = response
+
+    before = http_client.host_metrics().get("example.org", {"requests": 0, "bytes": 0})
+    assert http_client.get("https://example.org/api", params={"q": 1}) is response
+
+    _, kwargs = mock_get_session.return_value.request.call_args
+    assert kwargs["timeout"] == http_client.DEFAULT_TIMEOUT
+    stats = http_client.host_metrics()["example.org"]
+    assert stats["requests"] == before["requests"] + 1
+    assert stats["bytes"] == before["bytes"] + 5
@@ -1,7 +1,17 @@
 import pytest
 import json
+import threading
+import time
 from unittest.mock import patch, MagicMock
-from src.linker import Wikifier, num_tokens
+from src.linker import Wikifier, num_tokens, wait_for_rate_limit
+
+
+@pytest.fixture(autouse=True)
+def cache_files(tmp_path, monkeypatch):
+    """Keep the Wikidata cache and rate limit state written during tests out of ./cache."""
+    monkeypatch.setattr("src.linker.CACHE_FILE", str(tmp_path / "wikidata_cache.json"))
+    monkeypatch.setattr("src.linker.RATE_LIMIT_FILE", str(tmp_path / "wikidata_rate_limit"))
+    return tmp_path
 
 
 @pytest.fixture
@@ -76,6 +86,52 @@ def test_wikify_skips_unsanitizable_entities(mock_get_qid, wikifier):
     assert result == []
 
 
+def test_write_cache_from_concurrent_threads(cache_files):
+    """Threads writing the cache at once never clobber each other's temp file or results."""
+    def link(i):
+        wikifier = Wikifier()
+        wikifier._cache_entry("entities", f"entity {i}|org", f"https://www.wikidata.org/wiki/Q{i}")
+        wikifier._write_cache()
+
+    threads = [threading.Thread(target=link, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    cache = json.loads((cache_files / "wikidata_cache.json").read_text())
+    assert len(cache["entities"]) == 8
+    assert not list(cache_files.glob("*.tmp"))
+
+
+@patch.object(Wikifier, "get_qid", return_value="Q2")
+def test_wikify_merges_into_cache_written_by_other_workers(mock_get_qid, cache_files):
+    """A worker holding an older snapshot keeps the entries others wrote meanwhile."""
+    first, second = Wikifier(), Wikifier()
+    first._cache_entry("entities", "world bank|org", "https://www.wikidata.org/wiki/Q1")
+    first._write_cache()
+
+    second.wikify([{"surface": "Kenya", "label": "GPE"}])
+
+    cache = json.loads((cache_files / "wikidata_cache.json").read_text())
+    assert cache["entities"] == {
+        "world bank|org": "https://www.wikidata.org/wiki/Q1",
+        "kenya|gpe": "https://www.wikidata.org/wiki/Q2",
+    }
+    assert second.cache == cache
+
+
+def test_rate_limit_is_shared_between_callers():
+    """Callers space their lookups through the shared state file, not a per-process counter."""
+    start = time.monotonic()
+    threads = [threading.Thread(target=wait_for_rate_limit, args=(0.2,)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.monotonic() - start >= 0.4
+
+
 # ---------------------
 # wikify_from_llm
 # ---------------------
@@ -163,7 +219,7 @@ def test_get_qid_via_exact_match_handles_empty_results(mock_sparql_cls, wikifier
 # ---------------------
 # query_via_fuzzy_search
 # ---------------------
-@patch("src.linker.requests.get")
+@patch("src.linker.http_client.get")
 def test_query_via_fuzzy_search_returns_qid(mock_get, wikifier):
     mock_response = MagicMock()
     mock_response.json.return_value = {"search": [{"id": "Q321"}]}
@@ -174,7 +230,7 @@ def test_query_via_fuzzy_search_returns_qid(mock_get, wikifier):
     assert qid == "Q321"
 
 
-@patch("src.linker.requests.get")
+@patch("src.linker.http_client.get")
 def test_query_via_fuzzy_search_returns_none_if_empty(mock_get, wikifier):
     mock_response = MagicMock()
     mock_response.json.return_value = {"search": []}
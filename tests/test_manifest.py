@@ -0,0 +1,55 @@
+import pytest
+
+from src.manifest import StageManifest, hash_obj, hash_file
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    return StageManifest("doc1", root=str(tmp_path))
+
+
+def test_hash_obj_is_key_order_independent():
+    assert hash_obj({"a": 1, "b": 2}) == hash_obj({"b": 2, "a": 1})
+    assert hash_obj({"a": 1}) != hash_obj({"a": 2})
+
+
+def test_record_and_is_current(manifest, tmp_path):
+    output = tmp_path / "out.json"
+    output.write_text("[]")
+
+    manifest.record("parse", "abc", output=str(output), output_hash=hash_file(output))
+
+    assert manifest.is_current("parse", "abc")
+    assert not manifest.is_current("parse", "changed")
+    assert not manifest.is_current("ner", "abc")
+
+    # Reloaded manifest sees the same entries
+    reloaded = StageManifest("doc1", root=str(tmp_path))
+    assert reloaded.is_current("parse", "abc")
+    assert reloaded.output_hash("parse") == hash_file(output)
+
+
+def test_missing_output_is_not_current(manifest, tmp_path):
+    output = tmp_path / "out.json"
+    output.write_text("[]")
+    manifest.record("parse", "abc", output=str(output))
+    output.unlink()
+
+    assert not manifest.is_current("parse", "abc")
+
+
+def test_store_locations_are_trusted(manifest):
+    manifest.record("chunk_embed", "abc", output="docstore:doc1")
+    assert manifest.is_current("chunk_embed", "abc")
+
+
+def test_save_and_load_output(manifest):
+    manifest.save_output("acronyms", "h1", {"AI": "Artificial Intelligence"})
+
+    assert manifest.load_output("acronyms", "h1") == {"AI": "Artificial Intelligence"}
+    assert manifest.load_output("acronyms", "h2") is None
+
+
+def test_unknown_stage_raises(manifest):
+    with pytest.raises(ValueError):
+        manifest.record("not-a-stage", "abc")
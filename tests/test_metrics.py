@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from src.metrics import StageRecorder, count_http, count_tokens
+
+
+def read_records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_stage_writes_record(stage_metrics_file):
+    recorder = StageRecorder("doc1")
+    with recorder.stage("spacy", items_in=3) as rec:
+        rec["items_out"] = 5
+
+    [record] = read_records(stage_metrics_file)
+    assert record["doc_id"] == "doc1"
+    assert record["stage"] == "spacy"
+    assert record["items_in"] == 3
+    assert record["items_out"] == 5
+    assert record["status"] == "ok"
+    assert record["wall_s"] >= 0
+    assert "cpu_s" in record and "peak_rss_mb" in record
+
+
+def test_counters_apply_to_active_stages(stage_metrics_file):
+    recorder = StageRecorder("doc1")
+    count_http()  # outside any stage: ignored
+    with recorder.stage("outer"):
+        count_http()
+        with recorder.stage("inner"):
+            count_http(2)
+            count_tokens(10, 4)
+
+    inner, outer = read_records(stage_metrics_file)
+    assert (inner["stage"], inner["http_calls"], inner["prompt_tokens"]) == ("inner", 2, 10)
+    assert (outer["stage"], outer["http_calls"], outer["completion_tokens"]) == ("outer", 3, 4)
+
+
+def test_failed_stage_is_recorded(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    recorder = StageRecorder("doc1", path=path)
+    with pytest.raises(RuntimeError):
+        with recorder.stage("wikifier"):
+            raise RuntimeError("boom")
+
+    [record] = read_records(path)
+    assert record["status"] == "error"
@@ -0,0 +1,58 @@
+import pytest
+from unittest.mock import patch, MagicMock
+
+import src.models as models
+
+
+@pytest.fixture(autouse=True)
+def clear_registry():
+    models.clear()
+    yield
+    models.clear()
+
+
+@pytest.fixture
+def mock_spacy_model():
+    mock_nlp = MagicMock(name="nlp")
+    mock_nlp.pipe_names = ["tok2vec", "ner"]
+    return mock_nlp
+
+
+@patch("src.models._load_unbis_terms", return_value={"water supply": "http://metadata.un.org/thesaurus/1"})
+@patch("src.models.spacy.load")
+def test_get_nlp_loads_model_once(mock_spacy_load, mock_terms, mock_spacy_model):
+    mock_spacy_load.return_value = mock_spacy_model
+
+    nlp1 = models.get_nlp("en_core_web_sm")
+    nlp2 = models.get_nlp("en_core_web_sm")
+
+    assert nlp1 is nlp2
+    mock_spacy_load.assert_called_once_with("en_core_web_sm")
+
+
+@patch("src.models._load_unbis_terms", return_value={"water supply": "http://metadata.un.org/thesaurus/1"})
+@patch("src.models.spacy.load")
+def test_get_nlp_attaches_static_components(mock_spacy_load, mock_terms, mock_spacy_model):
+    mock_spacy_load.return_value = mock_spacy_model
+    mock_ruler = MagicMock(name="entity_ruler")
+    mock_spacy_model.add_pipe.side_effect = lambda name, **kwargs: mock_ruler if name == "entity_ruler" else MagicMock()
+
+    models.get_nlp("en_core_web_sm")
+
+    mock_spacy_model.add_pipe.assert_any_call("abbreviation_detector", first=True)
+    mock_spacy_model.add_pipe.assert_any_call(
+        "entity_ruler", before="ner", config={"phrase_matcher_attr": "LOWER"})
+    patterns = mock_ruler.add_patterns.call_args[0][0]
+    assert patterns[0]["label"] == "UNBIS_TERM"
+    assert patterns[0]["pattern"] == "water supply"
+
+
+@patch("src.models._load_unbis_terms", return_value={})
+@patch("src.models.spacy.load")
+def test_preload_warms_each_model(mock_spacy_load, mock_terms):
+    mock_spacy_load.side_effect = lambda name: MagicMock(name=name, pipe_names=[])
+
+    models.preload(["en_core_web_sm", "en_core_web_lg"])
+
+    assert mock_spacy_load.call_count == 2
+    assert set(models._NLP_CACHE) == {"en_core_web_sm", "en_core_web_lg"}
@@ -0,0 +1,103 @@
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from unittest.mock import patch
+
+from src.pdf_cache import PdfCache
+
+URL = "http://example.com/doc.pdf"
+CONTENT = b"%PDF-1.7 " + b"x" * 100
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=b"", headers=None, fail_after=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+        self.fail_after = fail_after
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), 10):
+            if self.fail_after is not None and i >= self.fail_after:
+                raise ConnectionError("connection reset")
+            yield self.body[i:i + 10]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return PdfCache(root=str(tmp_path / "pdfs"), chunk_size=10)
+
+
+@patch("src.pdf_cache.http_client.get")
+def test_fetch_stores_by_hash_and_revalidates(mock_get, cache):
+    mock_get.return_value = FakeResponse(body=CONTENT, headers={"ETag": '"v1"'})
+    path = cache.fetch(URL)
+
+    assert path.name == hashlib.sha256(CONTENT).hexdigest() + ".pdf"
+    assert path.read_bytes() == CONTENT
+    assert cache.lookup(URL) == path
+    assert cache.content_hash(URL) == hashlib.sha256(CONTENT).hexdigest()
+
+    # Second fetch sends the validator and reuses the file on 304
+    mock_get.return_value = FakeResponse(status_code=304)
+    assert cache.fetch(URL) == path
+    assert mock_get.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+
+
+@patch("src.pdf_cache.http_client.get")
+def test_interrupted_download_is_resumed(mock_get, cache):
+    headers = {"ETag": '"v1"', "Content-Length": str(len(CONTENT))}
+    mock_get.return_value = FakeResponse(body=CONTENT, headers=headers, fail_after=50)
+    with pytest.raises(ConnectionError):
+        cache.fetch(URL)
+    assert cache.lookup(URL) is None
+
+    mock_get.return_value = FakeResponse(
+        status_code=206, body=CONTENT[50:], headers={"ETag": '"v1"'})
+    path = cache.fetch(URL)
+
+    sent = mock_get.call_args.kwargs["headers"]
+    assert sent["Range"] == "bytes=50-" and sent["If-Range"] == '"v1"'
+    assert path.read_bytes() == CONTENT
+
+
+@patch("src.pdf_cache.http_client.get")
+def test_concurrent_fetches_of_one_url_take_turns(mock_get, cache):
+    active, overlaps = [], []
+
+    class SlowResponse(FakeResponse):
+        def iter_content(self, chunk_size):
+            active.append(self)
+            overlaps.append(len(active))
+            try:
+                for chunk in super().iter_content(chunk_size):
+                    time.sleep(0.005)
+                    yield chunk
+            finally:
+                active.remove(self)
+
+    def get(url, headers, **kwargs):
+        if "If-None-Match" in headers:
+            return FakeResponse(status_code=304)
+        return SlowResponse(body=CONTENT, headers={"ETag": '"v1"'})
+    mock_get.side_effect = get
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        paths = list(pool.map(lambda _: cache.fetch(URL), range(2)))
+
+    assert max(overlaps) == 1
+    assert paths[0] == paths[1] and paths[0].read_bytes() == CONTENT
+    # The second worker revalidated the first one's copy instead of downloading
+    assert len(overlaps) == 1
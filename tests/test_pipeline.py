@@ -1,6 +1,6 @@
 import pytest
 from unittest.mock import patch, MagicMock
-from src.pipeline import DocumentPipeline
+from src.pipeline import DocumentPipeline, IngestionPipeline
 
 
 @pytest.fixture
@@ -23,19 +23,21 @@ def mock_doc():
     return doc
 
 
-@patch("src.pipeline.spacy.load")
-def test_init_adds_pipes(mock_spacy_load, mock_spacy_model):
-    """Ensure abbreviation_detector and entity_ruler are added on init."""
-    mock_spacy_load.return_value = mock_spacy_model
+@patch("src.pipeline.EntityRuler")
+@patch("src.pipeline.get_nlp")
+def test_init_uses_shared_model(mock_get_nlp, MockEntityRuler, mock_spacy_model):
+    """Ensure the shared model is reused and acronyms get their own ruler."""
+    mock_get_nlp.return_value = mock_spacy_model
 
     pipeline = DocumentPipeline(file_id="doc123")
 
-    # Abbreviation detector added first
-    mock_spacy_model.add_pipe.assert_any_call("abbreviation_detector", first=True)
-    # Entity ruler added before NER
-    mock_spacy_model.add_pipe.assert_any_call("entity_ruler", before="ner")
+    mock_get_nlp.assert_called_once_with("en_core_web_sm")
+    # Shared pipeline is never modified per document
+    mock_spacy_model.add_pipe.assert_not_called()
+    MockEntityRuler.assert_called_once_with(
+        mock_spacy_model, name="acronym_ruler", phrase_matcher_attr="LOWER")
 
-    assert hasattr(pipeline, "entity_ruler")
+    assert pipeline.entity_ruler is MockEntityRuler.return_value
     assert isinstance(pipeline.acronym_extractor, object)
     assert isinstance(pipeline.entity_extractor, object)
 
@@ -43,10 +45,11 @@ def test_init_adds_pipes(mock_spacy_load, mock_spacy_model):
 @patch("src.pipeline.Wikifier")
 @patch("src.pipeline.EntityExtractor")
 @patch("src.pipeline.AcronymExtractor")
-@patch("src.pipeline.spacy.load")
-def test_process_invokes_components(mock_spacy_load, MockAcronymExtractor, MockEntityExtractor, MockWikifier, mock_spacy_model, mock_doc):
+@patch("src.pipeline.EntityRuler")
+@patch("src.pipeline.get_nlp")
+def test_process_invokes_components(mock_get_nlp, MockEntityRuler, MockAcronymExtractor, MockEntityExtractor, MockWikifier, mock_spacy_model, mock_doc):
     """Verify the process method orchestrates the full pipeline correctly."""
-    mock_spacy_load.return_value = mock_spacy_model
+    mock_get_nlp.return_value = mock_spacy_model
     mock_spacy_model.return_value = mock_doc
 
     # Mock AcronymExtractor
@@ -93,7 +96,9 @@ def test_process_invokes_components(mock_spacy_load, MockAcronymExtractor, MockE
 
 @patch("src.pipeline.DocumentPipeline.process")
 @patch("src.pipeline.Reader")
-def test_run_reads_and_processes(mock_reader, mock_process):
+@patch("src.pipeline.EntityRuler")
+@patch("src.pipeline.get_nlp")
+def test_run_reads_and_processes(mock_get_nlp, MockEntityRuler, mock_reader, mock_process):
     """Ensure run() reads markdown and calls process()."""
     mock_reader.return_value = mock_reader
     mock_reader.return_value.get_markdown.return_value = "Sample markdown"
@@ -107,10 +112,117 @@ def test_run_reads_and_processes(mock_reader, mock_process):
 
     # Ensure Reader and process used correctly
     mock_reader.return_value.get_markdown.assert_called_once_with("doc111")
-    mock_process.assert_called_once_with("Sample markdown")
+    mock_process.assert_called_once_with("Sample markdown", link=True)
 
     # Check output structure
     assert result["doc_id"] == "doc111"
     assert "acronyms" in result
     assert "entities" in result
     assert result["acronyms"]["AI"] == "Artificial Intelligence"
+
+
+@patch("src.pipeline.Wikifier")
+@patch("src.pipeline.AcronymExtractor")
+@patch("src.pipeline.Reader")
+@patch("src.pipeline.EntityRuler")
+@patch("src.pipeline.get_nlp")
+def test_run_with_manifest_skips_current_stages(mock_get_nlp, MockEntityRuler, mock_reader, MockAcronymExtractor, MockWikifier, mock_spacy_model, mock_doc, tmp_path):
+    """A second run over unchanged markdown reuses the stored stage outputs."""
+    from src.manifest import StageManifest
+
+    mock_get_nlp.return_value = mock_spacy_model
+    mock_spacy_model.return_value = mock_doc
+    mock_reader.return_value.get_markdown.return_value = "Sample markdown"
+    MockAcronymExtractor.return_value.extract.return_value = {"AI": "Artificial Intelligence"}
+    MockWikifier.return_value.wikify.return_value = [
+        {"surface": "World Bank", "label": "ORG", "qid": "Q784"},
+    ]
+
+    manifest = StageManifest("doc222", root=str(tmp_path))
+    with patch("src.pipeline.EntityExtractor.apply_entity_ruler", return_value=mock_doc), \
+         patch("src.pipeline.EntityExtractor.collect_entities",
+               return_value=[{"surface": "World Bank", "label": "ORG", "id": "", "qid": None}]):
+        first = DocumentPipeline(file_id="doc222").run(manifest=manifest)
+        second = DocumentPipeline(file_id="doc222").run(manifest=manifest)
+
+    assert first == second
+    assert mock_spacy_model.call_count == 1
+    MockAcronymExtractor.return_value.extract.assert_called_once()
+    MockWikifier.return_value.wikify.assert_called_once()
+    assert {"acronyms", "ner", "linking"} <= set(manifest.stages)
+
+
+@patch("src.pipeline.Wikifier")
+@patch("src.pipeline.AcronymExtractor")
+@patch("src.pipeline.EntityRuler")
+@patch("src.pipeline.get_nlp")
+def test_process_chunks_streams_with_offsets(mock_get_nlp, MockEntityRuler, MockAcronymExtractor, MockWikifier, mock_spacy_model):
+    """Chunks are streamed through nlp.pipe and mentions keep chunk attribution."""
+    mock_get_nlp.return_value = mock_spacy_model
+
+    chunks = []
+    docs = []
+    for i, (surface, start) in enumerate([("World Bank", 4), ("STEP", 0)]):
+        chunk = MagicMock(node_id=f"node-{i}")
+        chunk.get_content.return_value = f"text {i}"
+        chunks.append(chunk)
+        ent = MagicMock(text=surface, label_="ORG", id_="", start_char=start, end_char=start + len(surface))
+        docs.append(MagicMock(ents=[ent]))
+    mock_spacy_model.pipe.return_value = iter(docs)
+
+    mock_ruler = MockEntityRuler.return_value
+    mock_ruler.side_effect = lambda doc: doc
+
+    mock_acronyms = MockAcronymExtractor.return_value
+    mock_acronyms.extract_primary.return_value = {"IPF": "Investment Project Financing"}
+    mock_acronyms._extract_inline_acronyms.side_effect = [
+        {}, {"STEP": "Systematic Tracking of Exchanges in Procurement"}]
+    mock_acronyms.merge.side_effect = lambda primary, inline: {**inline, **primary}
+
+    MockWikifier.return_value.wikify.side_effect = lambda ents: [dict(e, qid=None) for e in ents]
+
+    pipeline = DocumentPipeline(file_id="doc333")
+    acronyms, entities, mentions = pipeline.process_chunks(chunks, batch_size=8)
+
+    mock_spacy_model.pipe.assert_called_once()
+    assert mock_spacy_model.pipe.call_args.kwargs["batch_size"] == 8
+    assert set(acronyms) == {"IPF", "STEP"}
+    # Primary acronyms added up front, STEP added once detected
+    assert mock_ruler.add_patterns.call_count == 2
+    assert mentions[0] == {
+        "surface": "World Bank", "label": "ORG", "id": "", "qid": None,
+        "chunk_id": "node-0", "start_char": 4, "end_char": 14}
+    assert mentions[1]["chunk_id"] == "node-1"
+    assert [e["surface"] for e in entities] == ["World Bank", "STEP"]
+
+
+@patch("src.pipeline.document_exists")
+@patch("src.pipeline._process_content_list")
+@patch("src.pipeline.LlamaStorage")
+def test_ingestion_pipeline_reports_each_document(MockStorage, mock_process, mock_exists, tmp_path):
+    """Documents flow through every stage; failures and skips are reported per document."""
+    mock_exists.side_effect = lambda doc_id: doc_id == "stored"
+
+    def parse_bytes(pdf_bytes, doc_id, lang, in_memory=False):
+        if doc_id == "bad":
+            raise RuntimeError("MinerU failed")
+        return [{"type": "text", "text": f"Doc {doc_id}"}]
+
+    reader = MagicMock()
+    reader.read_fn.side_effect = lambda url: b"%PDF"
+    reader.parse_bytes.side_effect = parse_bytes
+
+    pipeline = IngestionPipeline(
+        reader, MagicMock(),
+        download_workers=2, parse_workers=2, queue_size=1,
+        annotate=lambda doc_id: {"doc_id": doc_id})
+    docs = [(str(i), f"http://example.com/{i}.pdf") for i in range(5)]
+    results = pipeline.ingest(docs + [("bad", "http://example.com/bad.pdf"), ("stored", "x")])
+
+    assert {d for d, r in results.items() if r["status"] == "ok"} == {"0", "1", "2", "3", "4"}
+    assert results["0"]["result"] == {"doc_id": "0"}
+    assert results["bad"]["status"] == "failed" and results["bad"]["stage"] == "parse"
+    assert results["stored"]["status"] == "skipped"
+    assert mock_process.call_count == 5
+    content_list = mock_process.call_args.args[0]
+    assert content_list[0]["type"] == "text"
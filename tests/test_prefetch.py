@@ -0,0 +1,31 @@
+import pytest
+from unittest.mock import patch
+
+from src.prefetch import Prefetcher, RateLimiter
+
+
+def test_rate_limiter_blocks_past_budget():
+    limiter = RateLimiter(bytes_per_s=1000)
+    with patch("src.prefetch.time.sleep") as mock_sleep:
+        limiter.consume(500)
+        mock_sleep.assert_not_called()
+        limiter.consume(1000)
+    assert mock_sleep.call_args.args[0] == pytest.approx(0.5, abs=0.05)
+
+
+@patch("src.prefetch.PdfCache")
+def test_prefetch_reports_progress_and_failures(MockCache, tmp_path):
+    def fetch(url):
+        if "bad" in url:
+            raise IOError("timeout")
+        path = tmp_path / url
+        path.write_bytes(b"x" * 10)
+        return path
+    MockCache.return_value.fetch.side_effect = fetch
+
+    with Prefetcher(cache_dir=str(tmp_path), max_concurrency=2) as prefetcher:
+        paths = prefetcher.prefetch([("1", "a.pdf"), ("2", "bad.pdf"), ("3", "c.pdf")])
+
+    assert paths == {"1": tmp_path / "a.pdf", "2": None, "3": tmp_path / "c.pdf"}
+    progress = prefetcher.progress()
+    assert (progress["done"], progress["failed"], progress["bytes"]) == (2, 1, 20)
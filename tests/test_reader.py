@@ -0,0 +1,78 @@
+import pytest
+from unittest.mock import patch
+
+from src.reader import Reader
+
+
+@pytest.fixture
+def reader(tmp_path):
+    reader = Reader(output_dir=str(tmp_path))
+    sizes = {"a": 10, "b": 1000, "c": 20, "d": 2000}
+    reader.read_fn = lambda url: b"x" * sizes[url]
+    return reader
+
+
+@patch("src.reader.do_parse")
+def test_process_docs_batches_by_size(mock_do_parse, reader, tmp_path):
+    outputs = reader.process_docs(
+        [("a", "1"), ("b", "2"), ("c", "3"), ("d", "4")], lang="English", max_batch_docs=2)
+
+    batches = [call.kwargs["pdf_file_names"] for call in mock_do_parse.call_args_list]
+    assert batches == [["1", "3"], ["2", "4"]]
+    assert outputs["4"] == tmp_path / "4" / "auto" / "4_content_list.json"
+
+
+@patch("src.reader.do_parse")
+def test_process_docs_retries_failed_batch_one_by_one(mock_do_parse, reader):
+    def do_parse(**kwargs):
+        if "2" in kwargs["pdf_file_names"]:
+            raise RuntimeError("corrupt PDF")
+    mock_do_parse.side_effect = do_parse
+
+    outputs = reader.process_docs([("a", "1"), ("b", "2")], lang="English")
+
+    assert set(outputs) == {"1"}
+    assert mock_do_parse.call_count == 3
+
+
+def test_output_profile_merges_under_explicit_kwargs(tmp_path):
+    reader = Reader(output_dir=str(tmp_path), output_profile="production", f_dump_md=False)
+
+    assert reader.kwargs["f_draw_layout_bbox"] is False
+    assert reader.kwargs["f_compact_json"] is True
+    assert reader.kwargs["f_dump_md"] is False
+
+
+def test_write_json_compact_roundtrips(tmp_path):
+    import json
+    from src.mineru_demo import _write_json_compact
+
+    obj = [{"type": "text", "text": "Énergie", "page_idx": 0}]
+    path = tmp_path / "out.json"
+    _write_json_compact(str(path), obj)
+
+    text = path.read_text(encoding="utf-8")
+    assert "\n" not in text and "Énergie" in text
+    assert json.loads(text) == obj
+
+
+@patch("src.reader.do_parse")
+def test_parse_bytes_returns_content_list_in_memory(mock_do_parse, tmp_path):
+    content_list = [{"type": "text", "text": "Intro", "page_idx": 0}]
+    mock_do_parse.return_value = {"9": content_list}
+    reader = Reader(output_dir=str(tmp_path), output_profile="production", f_dump_content_list=False)
+
+    assert reader.parse_bytes(b"%PDF", "9", "English", in_memory=True) == content_list
+    assert mock_do_parse.call_args.kwargs["f_dump_content_list"] is False
+
+
+@patch("src.reader.text_layer.extract_content_list")
+@patch("src.reader.text_layer.preflight", return_value={"born_digital": True})
+def test_text_layer_in_memory_still_writes_markdown(mock_preflight, mock_extract, tmp_path):
+    content_list = [{"type": "text", "text": "Intro", "text_level": 1, "page_idx": 0}]
+    mock_extract.return_value = content_list
+    reader = Reader(output_dir=str(tmp_path), text_layer=True, f_dump_content_list=False)
+
+    assert reader.parse_bytes(b"%PDF", "9", "English", in_memory=True) == content_list
+    assert (tmp_path / "9" / "auto" / "9.md").read_text().startswith("# Intro")
+    assert not (tmp_path / "9" / "auto" / "9_content_list.json").exists()
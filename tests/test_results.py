@@ -0,0 +1,61 @@
+import pytest
+from unittest.mock import patch
+
+from src.linker import Wikifier
+from src.ner import EntityExtractor
+from src.results import ResultsStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultsStore(root=str(tmp_path / "results"))
+
+
+RESULTS = {
+    "doc_id": "1",
+    "acronyms": {"AI": "Artificial Intelligence"},
+    "entities": [
+        {"surface": "World Bank", "label": "ORG", "sparql_safe": "World Bank", "qid": "Q7164", "rdf_safe": "Q7164"},
+        {"surface": "AI", "label": "ACRONYM", "sparql_safe": "AI", "qid": None, "rdf_safe": "AI"},
+    ],
+}
+
+
+def test_write_and_read_round_trip(store):
+    store.write("1", RESULTS)
+
+    loaded = store.read("1")
+    assert loaded["acronyms"] == RESULTS["acronyms"]
+    assert loaded["entities"] == RESULTS["entities"]
+    assert loaded["mentions"] == []
+    assert store.read("missing") is None
+
+
+def test_index_is_shared_across_instances(store, tmp_path):
+    store.write("1", RESULTS)
+    store.write("2", {"acronyms": {}, "entities": RESULTS["entities"][:1]})
+
+    reopened = ResultsStore(root=str(tmp_path / "results"))
+    assert reopened.index["1"]["n_entities"] == 2
+    assert reopened.index["2"]["n_acronyms"] == 0
+
+    entities = list(reopened.iter_entities())
+    assert [(e["doc_id"], e["surface"]) for e in entities] == [
+        ("1", "World Bank"), ("1", "AI"), ("2", "World Bank")]
+
+
+@patch.object(Wikifier, "_write_cache")
+@patch.object(Wikifier, "get_qid", side_effect=lambda name: "Q7164" if name == "World Bank" else None)
+def test_round_trip_of_linked_entities(mock_get_qid, mock_write_cache, store):
+    """Entities as the linking stage produces them come back unchanged."""
+    wikifier = Wikifier()
+    wikifier.cache = {"countries": {}, "entities": {}}
+    linked = wikifier.wikify([
+        {"surface": "World Bank", "label": "ORG"},
+        {"surface": "Nairobi", "label": "GPE"},
+    ])
+    entities = EntityExtractor()._normalize_entities(linked)
+
+    store.write("1", {"acronyms": {}, "entities": entities})
+
+    assert store.read("1")["entities"] == entities
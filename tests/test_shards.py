@@ -0,0 +1,60 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+from src import shards
+
+
+def test_shard_ranges_cover_all_pages():
+    assert shards.shard_ranges(120, 50) == [(0, 50), (50, 100), (100, 120)]
+
+
+def test_merge_content_lists_offsets_pages_and_joins_split_paragraphs():
+    first = [
+        {"type": "text", "text": "Introduction", "text_level": 1, "page_idx": 0},
+        {"type": "text", "text": "The project will finance", "page_idx": 1},
+    ]
+    second = [
+        {"type": "text", "text": "wind turbines in Kenya.", "page_idx": 0},
+        {"type": "text", "text": "Costs", "text_level": 1, "page_idx": 1},
+    ]
+
+    merged = shards.merge_content_lists([(0, first), (2, second)])
+
+    assert [item["page_idx"] for item in merged] == [0, 1, 3]
+    assert merged[1]["text"] == "The project will finance wind turbines in Kenya."
+    assert merged[2]["text_level"] == 1
+
+
+def fake_do_parse(output_dir, pdf_file_names, start_page_id, end_page_id, **kwargs):
+    name = pdf_file_names[0]
+    out = Path(output_dir) / name / "auto"
+    (out / "images").mkdir(parents=True)
+    (out / "images" / f"{name}.jpg").write_bytes(b"img")
+    items = [{"type": "text", "text": f"Section {start_page_id}", "text_level": 1, "page_idx": 0}]
+    (out / f"{name}_content_list.json").write_text(json.dumps(items))
+    (out / f"{name}.md").write_text(f"# Section {start_page_id}")
+    pages = [{"page_idx": i, "para_blocks": []} for i in range(end_page_id - start_page_id + 1)]
+    (out / f"{name}_middle.json").write_text(json.dumps({"pdf_info": pages, "_backend": "pipeline"}))
+    return {name: items}
+
+
+@patch("src.shards.ProcessPoolExecutor", ThreadPoolExecutor)
+@patch("src.shards.do_parse", side_effect=fake_do_parse)
+@patch("src.shards.page_count", return_value=5)
+def test_parse_sharded_stitches_outputs(mock_count, mock_do_parse, tmp_path):
+    path = shards.parse_sharded(b"%PDF", "42", str(tmp_path), "en", shard_pages=2, workers=2, parse_kwargs={})
+
+    assert path == tmp_path / "42" / "auto" / "42_content_list.json"
+    items = json.loads(path.read_text())
+    assert [(i["text"], i["page_idx"]) for i in items] == [
+        ("Section 0", 0), ("Section 2", 2), ("Section 4", 4)]
+    assert (tmp_path / "42" / "auto" / "42.md").read_text().startswith("# Section 0")
+    assert len(list((tmp_path / "42" / "auto" / "images").glob("*.jpg"))) == 3
+    assert not (tmp_path / "42" / "shards").exists()
+
+    # One middle JSON for the whole PDF, so debug artifacts can be re-rendered
+    middle = json.loads((tmp_path / "42" / "auto" / "42_middle.json").read_text())
+    assert [page["page_idx"] for page in middle["pdf_info"]] == [0, 1, 2, 3, 4]
+    assert middle["_backend"] == "pipeline"
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+from llama_index.core import Document
+from llama_index.core.text_splitter import SentenceSplitter
+
+from src.parser import CustomParser
+from src.splitters import FastSentenceSplitter, make_splitter, split_sentences
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("It was 2015. The end.", ["It was 2015. ", "The end."]),
+    ("Is it? yes it is! Ok.", ["Is it? ", "yes it is! ", "Ok."]),
+    ("The PIU (i.e. the unit) will act. Then go.", ["The PIU (i.e. the unit) will act. ", "Then go."]),
+    ("Funded by the Govt. of Mexico. See para. 3.", ["Funded by the Govt. of Mexico. ", "See para. 3."]),
+    ("He met J. Smith in the U.S. today. Next.", ["He met J. Smith in the U.S. today. ", "Next."]),
+    ('He said "stop." Then left.\n', ['He said "stop." ', "Then left.\n"]),
+    ("Growth was 2.5. Then it fell.", ["Growth was 2.5. ", "Then it fell."]),
+    ("The answer is no. Next.", ["The answer is no. ", "Next."]),
+    ("See Loan No. 4567. Done.", ["See Loan No. 4567. ", "Done."]),
+])
+def test_split_sentences(text, expected):
+    assert split_sentences(text) == expected
+
+
+def test_split_sentences_keeps_text_like_punkt():
+    text = "  First sentence here.  Second one?\nThird line without a stop"
+    sentences = split_sentences(text)
+    assert "".join(sentences) == text.lstrip()
+    assert len(sentences) == 3
+
+
+def test_fast_splitter_packs_chunks_like_sentence_splitter():
+    text = " ".join(f"Sentence number {i} describes the project." for i in range(200))
+    fast = FastSentenceSplitter(chunk_size=64, chunk_overlap=8)
+    baseline = SentenceSplitter(chunk_size=64, chunk_overlap=8)
+
+    # No abbreviations in the text, so both find the same sentences
+    assert fast.split_text(text) == baseline.split_text(text)
+
+    # Sentences already counted are not tokenized again
+    misses = fast._token_count.cache_info().misses
+    fast.split_text(text)
+    assert fast._token_count.cache_info().misses == misses
+
+
+def test_make_splitter():
+    assert isinstance(make_splitter("fast", chunk_size=128, chunk_overlap=0), FastSentenceSplitter)
+    with pytest.raises(ValueError):
+        make_splitter("unknown")
+
+
+def test_custom_parser_with_fast_splitter_in_parallel():
+    content = [
+        {"type": "text", "text": "Header 1", "text_level": 1},
+        {"type": "text", "text": "The loan (i.e. the credit) is approved. " * 40},
+    ]
+    docs = [Document(text=json.dumps(content), doc_id=f"doc-{i}") for i in range(2)]
+
+    serial = CustomParser.from_defaults(chunk_size=64, chunk_overlap=8, splitter="fast")
+    parallel = CustomParser.from_defaults(chunk_size=64, chunk_overlap=8, splitter="fast", num_workers=2)
+
+    assert isinstance(serial.text_splitter, FastSentenceSplitter)
+    assert [n.text for n in parallel.get_nodes_from_documents(docs)] == [
+        n.text for n in serial.get_nodes_from_documents(docs)]
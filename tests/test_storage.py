@@ -3,6 +3,10 @@ import json
 from unittest.mock import patch, MagicMock, mock_open
 from pathlib import Path
 
+from llama_index.core import Document
+from llama_index.core.schema import NodeRelationship, RelatedNodeInfo, TextNode
+from llama_index.core.vector_stores.utils import node_to_metadata_dict
+
 import src.storage as storage
 
 
@@ -200,3 +204,143 @@ def test_enrich_document_chunks_warns_if_no_info(mock_load_index, caplog):
 
     storage.enrich_document_chunks("BAD_DOC", {}, [])
     assert "No nodes found" in caplog.text
+
+
+# ------------------------------------------------------
+# _store_nodes
+# ------------------------------------------------------
+@patch("src.storage.LlamaStorage")
+def test_store_nodes_inserts_streamed_nodes_in_batches(mock_storage_cls):
+    mock_storage = mock_storage_cls.return_value
+    mock_storage.context.vector_store.client.get.return_value = {"ids": [], "metadatas": []}
+    doc = Document(text="", doc_id="DOC1")
+    consumed = []
+
+    def node_stream():
+        for i in range(5):
+            consumed.append(i)
+            yield TextNode(text=f"chunk {i}")
+
+    # Nodes pulled from the generator so far, at each insert
+    pulled = []
+    mock_storage.index.insert_nodes.side_effect = lambda batch: pulled.append(len(consumed))
+
+    assert storage._store_nodes(doc, node_stream(), batch_size=2) == "DOC1"
+
+    batches = [call.args[0] for call in mock_storage.index.insert_nodes.call_args_list]
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert pulled == [2, 4, 5]
+    assert all(n.ref_doc_id == "DOC1" for batch in batches for n in batch)
+    mock_storage.context.docstore.add_documents.assert_called_once_with([doc])
+
+
+def linked_nodes(texts, doc_id="DOC1"):
+    nodes = [TextNode(id_=f"{doc_id}-{text}", text=text) for text in texts]
+    for prev, node in zip(nodes, nodes[1:]):
+        prev.relationships[NodeRelationship.NEXT] = node.as_related_node_info()
+        node.relationships[NodeRelationship.PREVIOUS] = prev.as_related_node_info()
+    for node in nodes:
+        node.relationships[NodeRelationship.SOURCE] = RelatedNodeInfo(node_id=doc_id)
+    return nodes
+
+
+@patch("src.storage.LlamaStorage")
+def test_store_nodes_only_touches_changed_chunks(mock_storage_cls):
+    mock_storage = mock_storage_cls.return_value
+    collection = mock_storage.context.vector_store.client
+    old = linked_nodes(["a", "b", "c", "d"])
+    stored = {"ids": [n.node_id for n in old], "metadatas": [node_to_metadata_dict(n) for n in old]}
+    collection.get.side_effect = lambda ids=None, **kwargs: (
+        {"ids": ids, "embeddings": [[0.5, 0.5] for _ in ids]} if ids else stored)
+
+    # "c" was revised into "x"; "b" and "d" are now linked to "x"
+    storage._store_nodes(Document(text="", doc_id="DOC1"), iter(linked_nodes(["a", "b", "x", "d"])))
+
+    inserted = mock_storage.index.insert_nodes.call_args.args[0]
+    assert sorted(n.text for n in inserted) == ["b", "d", "x"]
+    assert [n.embedding for n in inserted if n.text != "x"] == [[0.5, 0.5], [0.5, 0.5]]
+    assert next(n for n in inserted if n.text == "x").embedding is None
+    deleted = [call.args[0] for call in mock_storage.index.delete_nodes.call_args_list]
+    assert deleted == [["DOC1-b", "DOC1-d"], ["DOC1-c"]]
+
+
+def test_stored_links_pages_through_chunk_metadata():
+    nodes = linked_nodes(["a", "b", "c", "d", "e"])
+    metadatas = [node_to_metadata_dict(n) for n in nodes]
+    collection = MagicMock()
+    collection.get.side_effect = lambda where, include, limit, offset: {
+        "ids": [n.node_id for n in nodes[offset:offset + limit]],
+        "metadatas": metadatas[offset:offset + limit]}
+
+    links = storage._stored_links(collection, "DOC1", page_size=2)
+
+    assert links["DOC1-a"] == (None, "DOC1-b")
+    assert links["DOC1-e"] == ("DOC1-d", None)
+    assert len(links) == 5
+    assert [call.kwargs["offset"] for call in collection.get.call_args_list] == [0, 2, 4]
+
+
+@pytest.fixture
+def real_storage(tmp_path, monkeypatch):
+    """A real docstore + Chroma store under tmp_path, with a counting embedding model."""
+    from llama_index.core import Settings
+    from llama_index.core.embeddings import MockEmbedding
+
+    class CountingEmbedding(MockEmbedding):
+        calls: int = 0
+
+        def _get_text_embeddings(self, texts):
+            self.calls += len(texts)
+            return super()._get_text_embeddings(texts)
+
+    monkeypatch.setattr(storage, "STORAGE_DIR", tmp_path / "storage")
+    monkeypatch.setattr(storage, "CHROMA_DIR", tmp_path / "chroma")
+    monkeypatch.setattr(storage.LlamaStorage, "_instance", None)
+    monkeypatch.setattr(storage.LlamaStorage, "_initialized", None)
+    embed_model = CountingEmbedding(embed_dim=4)
+    monkeypatch.setattr(Settings, "_embed_model", embed_model)
+    yield embed_model
+    storage.LlamaStorage._instance = None
+
+
+def test_enrich_document_chunks_reuses_stored_embeddings(real_storage, acronyms, entities):
+    """Ingest embeds each chunk once; enrichment only rewrites metadata."""
+    nodes = linked_nodes(["The World Bank funds SEMARNAT.", "STEP tracks IPF.", "Unrelated."])
+    storage._store_nodes(Document(text="", doc_id="DOC1"), iter(nodes))
+    assert real_storage.calls == 3
+
+    storage.enrich_document_chunks("DOC1", acronyms, entities)
+
+    assert real_storage.calls == 3
+    collection = storage.LlamaStorage().context.vector_store.client
+    stored = collection.get(ids=[n.node_id for n in nodes], include=["metadatas", "embeddings"])
+    assert len(stored["ids"]) == 3 and all(len(e) == 4 for e in stored["embeddings"])
+    by_id = dict(zip(stored["ids"], stored["metadatas"]))
+    assert json.loads(by_id[nodes[0].node_id]["entities"])[0]["qid"] == "Q123"
+    assert [a["short"] for a in json.loads(by_id[nodes[1].node_id]["acronyms"])] == ["IPF", "STEP"]
+
+@patch("src.storage._store_nodes")
+@patch("src.storage.CustomParser")
+@patch("src.storage.LlamaStorage")
+def test_rechunk_skips_documents_without_content_list(mock_storage_cls, mock_parser_cls, mock_store_nodes, tmp_path):
+    """Documents whose content list is gone keep their stored chunks."""
+    content = json.dumps([{"type": "text", "text": "Hello"}])
+    stored = {
+        "good": Document(text=content, metadata={"source": ""}, doc_id="good"),
+        "empty": Document(text="", metadata={"source": str(tmp_path / "missing.json")}, doc_id="empty"),
+        "malformed": Document(text="[{not json", metadata={"source": ""}, doc_id="malformed"),
+    }
+    mock_storage_cls.return_value.context.docstore.get_document.side_effect = (
+        lambda doc_id, raise_error: stored[doc_id])
+    node = TextNode(text="Hello", id_="n1")
+    node.relationships[NodeRelationship.SOURCE] = RelatedNodeInfo(node_id="good")
+    mock_parser_cls.from_defaults.return_value.get_nodes_from_documents.return_value = [node]
+
+    rechunked = storage.rechunk_documents(
+        ["good", "empty", "malformed"], manifest_root=str(tmp_path / "output"))
+
+    assert rechunked == ["good"]
+    docs = mock_parser_cls.from_defaults.return_value.get_nodes_from_documents.call_args.args[0]
+    assert [doc.doc_id for doc in docs] == ["good"]
+    mock_store_nodes.assert_called_once()
+    assert mock_store_nodes.call_args.args[0].doc_id == "good"
@@ -0,0 +1,26 @@
+import json
+from unittest.mock import MagicMock, patch
+
+from src.metrics import StageRecorder
+from src.summarize import Summarizer
+
+
+def read_records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+@patch("src.summarize.tiktoken.encoding_for_model")
+def test_openai_backend_counts_call_and_tokens(mock_encoding, stage_metrics_file, tmp_path):
+    client = MagicMock()
+    response = client.chat.completions.create.return_value
+    response.choices = [MagicMock(message=MagicMock(content=" Energy access in Kenya. "))]
+    response.usage.prompt_tokens, response.usage.completion_tokens = 120, 8
+
+    summarizer = Summarizer(
+        MagicMock(), client=client, backend="openai", cache_path=tmp_path / "summaries.json")
+    with StageRecorder("_corpus").stage("summarization"):
+        summary = summarizer._call_summary_model("The project finances mini-grids in Kenya.")
+
+    assert summary == "Energy access in Kenya."
+    [record] = read_records(stage_metrics_file)
+    assert (record["http_calls"], record["prompt_tokens"], record["completion_tokens"]) == (1, 120, 8)
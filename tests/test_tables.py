@@ -0,0 +1,49 @@
+import pytest
+from unittest.mock import patch
+
+from src import tables
+from src.tables import _markdownify, convert_table, table_cache_info, table_to_markdown
+
+TABLES = [
+    "<html><body><table><tr><td>Cell 1</td><td>Cell 2</td></tr><tr><td>3</td><td>4</td></tr></table></body></html>",
+    "<table><tr><th>Component</th><th>US$ m</th></tr><tr><td>IDA_credit</td><td>1*2</td></tr></table>",
+    "<table><thead><tr><th>A</th><th>B</th></tr></thead><tbody><tr><td>1</td><td>2</td></tr></tbody></table>",
+    "<table><thead><tr><td>A</td></tr><tr><td>B</td></tr></thead><tbody><tr><td>1</td></tr></tbody></table>",
+    "<table>\n<tbody>\n<tr><td colspan=\"3\">Total</td></tr>\n<tr><td>a</td><td>b</td><td>c</td></tr>\n</tbody>\n</table>",
+    "<table><tr><td colspan=\"x\"> spaced \n  out </td><td>&amp;&nbsp;12</td></tr><tr></tr></table>",
+    # Fallbacks: inline markup, nested tables, unclosed cells, no table
+    "<table><tr><td><b>Bold</b> and <br/>break</td></tr></table>",
+    "<table><tr><td><table><tr><td>inner</td></tr></table></td></tr></table>",
+    "<table><tr><td>a<td>b</tr></table>",
+    "<p>no table here</p>",
+]
+
+
+@pytest.mark.parametrize("table_body", TABLES)
+def test_convert_table_matches_markdownify(table_body):
+    assert convert_table(table_body) == _markdownify(table_body)
+
+
+def test_table_cache_converts_repeated_tables_once():
+    tables.clear_table_cache()
+    with patch("src.tables.convert_table", wraps=convert_table) as mock_convert:
+        first = table_to_markdown(TABLES[0])
+        second = table_to_markdown(TABLES[0])
+        table_to_markdown(TABLES[1])
+
+    assert first == second
+    assert mock_convert.call_count == 2
+    assert table_cache_info() == {"hits": 1, "misses": 2, "fallbacks": 0, "size": 2}
+
+
+def test_table_cache_evicts_least_recently_used():
+    tables.clear_table_cache()
+    with patch("src.tables.TABLE_CACHE_SIZE", 2):
+        table_to_markdown(TABLES[0])
+        table_to_markdown(TABLES[1])
+        table_to_markdown(TABLES[0])
+        table_to_markdown(TABLES[2])
+
+    assert table_cache_info()["size"] == 2
+    assert tables._cache_key(TABLES[0]) in tables._cache
+    assert tables._cache_key(TABLES[1]) not in tables._cache
@@ -0,0 +1,53 @@
+import json
+
+import pymupdf
+import pytest
+
+from src import text_layer
+
+
+@pytest.fixture
+def pdf_bytes():
+    doc = pymupdf.open()
+    body = "The project supports renewable energy investments in rural areas. " * 6
+    for title in ("Project Description", "Costs and Financing"):
+        page = doc.new_page()
+        page.insert_text((72, 80), title, fontsize=18)
+        page.insert_textbox(pymupdf.Rect(72, 110, 520, 400), body, fontsize=10)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_preflight_detects_text_layer(pdf_bytes):
+    stats = text_layer.preflight(pdf_bytes)
+    assert stats["pages"] == 2
+    assert stats["text_page_ratio"] == 1.0
+    assert stats["born_digital"]
+
+
+def test_preflight_flags_pages_without_text():
+    doc = pymupdf.open()
+    doc.new_page()
+    stats = text_layer.preflight(doc.tobytes())
+    assert not stats["born_digital"]
+
+
+def test_parse_text_layer_writes_mineru_layout(pdf_bytes, tmp_path):
+    path = text_layer.parse_text_layer(pdf_bytes, "7", str(tmp_path))
+
+    assert path == tmp_path / "7" / "auto" / "7_content_list.json"
+    items = json.loads(path.read_text())
+    headers = [(i["text"], i["page_idx"]) for i in items if i.get("text_level") == 1]
+    assert headers == [("Project Description", 0), ("Costs and Financing", 1)]
+    assert any(i["type"] == "text" and "renewable" in i["text"] and "text_level" not in i for i in items)
+    assert (tmp_path / "7" / "auto" / "7.md").read_text().startswith("# Project Description")
+
+
+def test_parse_text_layer_writes_compact_json(pdf_bytes, tmp_path):
+    path = text_layer.parse_text_layer(pdf_bytes, "7", str(tmp_path), compact_json=True)
+
+    raw = path.read_text()
+    assert "\n" not in raw
+    assert json.loads(raw) == json.loads(
+        text_layer.parse_text_layer(pdf_bytes, "8", str(tmp_path)).read_text())
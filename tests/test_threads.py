@@ -0,0 +1,31 @@
+from src import threads
+from src.threads import ThreadBudget
+
+
+def test_budget_splits_cores_by_weight():
+    budget = ThreadBudget({"parse": 2, "nlp": 4}, cores=17)
+
+    # 16 free cores, demand 2*4 + 4*1 = 12 -> parse 16*4/12, nlp 16/12
+    assert budget.threads["parse"] == 5
+    assert budget.threads["nlp"] == 1
+    assert budget.threads["summarize"] == 17
+
+
+def test_budget_gives_each_worker_at_least_one_thread():
+    budget = ThreadBudget({"parse": 8, "nlp": 8}, cores=4)
+
+    assert budget.threads["parse"] == 1
+    assert budget.threads["nlp"] == 1
+
+
+def test_limit_threads_sets_env_and_reports_settings(monkeypatch):
+    for var in threads.THREAD_ENV_VARS:
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.setattr(threads, "_effective", {})
+    monkeypatch.setattr(threads, "threadpool_limits", lambda limits: None)
+
+    settings = threads.limit_threads(3, "parse")
+
+    assert settings["worker"] == "parse" and settings["threads"] == 3
+    assert all(threads.os.environ[var] == "3" for var in threads.THREAD_ENV_VARS)
+    assert threads.current_threads() == 3